@@ -1,11 +1,92 @@
 #!/usr/bin/env python3
-from openpyxl import load_workbook
-from openpyxl.styles import Font, PatternFill, Alignment
+import argparse
+import contextlib
+import os
+from copy import copy
 
-# Load the workbook
-wb = load_workbook('/home/user/Vendor-Analysis-Assessment/Vendor Analysis Assessment - Deeba.xlsx')
-ws = wb.active
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font, PatternFill, Alignment, NamedStyle
+from openpyxl.utils import get_column_letter
 
+import rule_engine
+import xlsx_reader
+from instrumentation import instrumented, recording
+from keyword_matcher import TokenMatcher
+from ledger_reader import DEFAULT_WORKBOOK, RECOMMENDATION_HEADER, VENDOR_HEADER, find_columns
+from result_cache import ResultCache, cached, rules_fingerprint
+from vendor_names import map_unique, normalize_name
+from xlsx_patch import CellStyle, PatchError, patch_column
+
+# TERMINATE - Travel, hotels, restaurants, catering, events, local vendors, non-critical
+TERMINATE_KEYWORDS = [
+    # Travel & hospitality
+    'hotel*', 'resort', 'accommodation', 'inn', 'pastoria', 'intercontinental',
+    'radisson', 'hilton', 'trocadero', 'zonar', 'laguna', 'winery',
+    # Restaurants & food
+    'restaurant', 'cafe', 'coffee', 'catering', 'kitchen', 'dining', 'food*',
+    'bar', 'tattu', 'gaucho', 'mesa verde', 'pret a manger', 'bakery',
+    'cupcake', 'saloon', 'italian', 'del posto', 'harissa', 'pepe',
+    # Events & entertainment
+    'event*', 'comedy', 'entertainment', 'escape art', 'paint&wine', 'paint & fun',
+    'djs for u', 'blink events', 'rishi events', 'urbani eventi',
+    # Parking & transport
+    'parking', 'garage', 'golubica', 'firule', 'uber', 'wolt',
+    # Travel services
+    'travel', 'tour', 'airline', 'croatia airlines', 'hahn air',
+    # Local/one-off vendors
+    'student packers', 'office move', 'moving', 'relocation',
+    # Personal/non-essential
+    'gym*', 'fitness', 'sports club', 'recreation', 'cycle gap', 'athlete service',
+    'wine', 'istra wine', 'vivat fina',
+    # Retail/shopping (non-essential)
+    'pink ribbon', 'regency hampers', 'plant man', 'notino', 'freepik',
+    'snappy snaps', 'vistaprint', 'gift', 'hampers', 'flower', 'floom',
+    # Individual contractors
+    'john smith', 'susan lee', 'george anchor', 'fabiola', 'stipe piric', 'ansar madovic',
+    # Unclear/non-critical
+    'smell', 'decoration', 'canteen', 'vending',
+]
+
+# OPTIMIZE - Mission-critical SaaS platforms and infrastructure
+OPTIMIZE_KEYWORDS = [
+    # Cloud infrastructure (mission-critical)
+    'aws', 'amazon web services', 'microsoft', 'azure', 'google cloud',
+    # Major SaaS platforms
+    'salesforce', 'adobe', 'atlassian', 'figma', 'slack',
+    'docusign', 'smartsheet', 'workato', 'zapier',
+    # Development tools
+    'jetbrains', 'npm', 'github', 'gitlab',
+    # Critical business platforms
+    'hubspot', 'linkedin', 'ariba', 'kimble', 'planful',
+    # Infrastructure & monitoring
+    'solarwinds', 'uptime robot', 'papertrail', 'lastpass',
+    # Training platforms
+    'pluralsight', 'interaction design foundation',
+    # Big 4 / Major professional services
+    'bdo llp', 'grant thornton', 'pricewaterhouse*', 'deloitte', 'kpmg', 'ey',
+    'houlihan lokey', 'crowe horwath',
+    # Essential IT services
+    'infosys', 'dhl', 'fedex',
+    # Primary travel management
+    'navan', 'tripactions',
+    # Primary real estate
+    'cbre', 'jones lang lasalle',
+    # Core HR/benefits
+    'mercer limited', 'benefit systems', 'pluxee', 'sodexo',
+    'granttree limited',  # R&D tax credits
+]
+
+# Terminate is checked before Optimize. Keywords match whole words ('*' lets
+# the last word continue), so 'ey' no longer hits "Journey" nor 'inn'
+# "Terrapinn"; the Config sheet or a sidecar rules file can replace these
+# lists (see rule_engine)
+STRATEGIC_MATCHER = rule_engine.register('strategic', [
+    ('Terminate', TERMINATE_KEYWORDS),
+    ('Optimize', OPTIMIZE_KEYWORDS),
+], TokenMatcher)
+
+@instrumented('strategic', default='Consolidate')
 def get_strategic_recommendation(vendor_name):
     """
     Classify vendor using STRICT rules:
@@ -13,75 +94,10 @@ def get_strategic_recommendation(vendor_name):
     - CONSOLIDATE: Multiple SaaS tools, recruiting agencies, IT consultancies, cloud platforms
     - OPTIMIZE: Mission-critical SaaS (AWS, Salesforce, Microsoft, Adobe, etc.)
     """
-    vendor_lower = vendor_name.lower()
-
-    # TERMINATE - Travel, hotels, restaurants, catering, events, local vendors, non-critical
-    terminate_keywords = [
-        # Travel & hospitality
-        'hotel', 'resort', 'accommodation', 'inn', 'pastoria', 'intercontinental',
-        'radisson', 'hilton', 'trocadero', 'zonar', 'laguna', 'winery',
-        # Restaurants & food
-        'restaurant', 'cafe', 'coffee', 'catering', 'kitchen', 'dining', 'food',
-        'bar', 'tattu', 'gaucho', 'mesa verde', 'pret a manger', 'bakery',
-        'cupcake', 'saloon', 'italian', 'del posto', 'harissa', 'pepe',
-        # Events & entertainment
-        'event', 'comedy', 'entertainment', 'escape art', 'paint&wine', 'paint & fun',
-        'djs for u', 'blink events', 'rishi events', 'urbani eventi',
-        # Parking & transport
-        'parking', 'garage', 'golubica', 'firule', 'uber', 'wolt',
-        # Travel services
-        'travel', 'tour', 'airline', 'croatia airlines', 'hahn air',
-        # Local/one-off vendors
-        'student packers', 'office move', 'moving', 'relocation',
-        # Personal/non-essential
-        'gym', 'fitness', 'sports club', 'recreation', 'cycle gap', 'athlete service',
-        'wine', 'istra wine', 'vivat fina',
-        # Retail/shopping (non-essential)
-        'pink ribbon', 'regency hampers', 'plant man', 'notino', 'freepik',
-        'snappy snaps', 'vistaprint', 'gift', 'hampers', 'flower', 'floom',
-        # Individual contractors
-        'john smith', 'susan lee', 'george anchor', 'fabiola', 'stipe piric', 'ansar madovic',
-        # Unclear/non-critical
-        'smell', 'decoration', 'canteen', 'vending',
-    ]
-
-    for keyword in terminate_keywords:
-        if keyword in vendor_lower:
-            return 'Terminate'
-
-    # OPTIMIZE - Mission-critical SaaS platforms and infrastructure
-    optimize_keywords = [
-        # Cloud infrastructure (mission-critical)
-        'aws', 'amazon web services', 'microsoft', 'azure', 'google cloud',
-        # Major SaaS platforms
-        'salesforce', 'adobe', 'atlassian', 'figma', 'slack',
-        'docusign', 'smartsheet', 'workato', 'zapier',
-        # Development tools
-        'jetbrains', 'npm', 'github', 'gitlab',
-        # Critical business platforms
-        'hubspot', 'linkedin', 'ariba', 'kimble', 'planful',
-        # Infrastructure & monitoring
-        'solarwinds', 'uptime robot', 'papertrail', 'lastpass',
-        # Training platforms
-        'pluralsight', 'interaction design foundation',
-        # Big 4 / Major professional services
-        'bdo llp', 'grant thornton', 'pricewaterhouse', 'deloitte', 'kpmg', 'ey',
-        'houlihan lokey', 'crowe horwath',
-        # Essential IT services
-        'infosys', 'dhl', 'fedex',
-        # Primary travel management
-        'navan', 'tripactions',
-        # Primary real estate
-        'cbre', 'jones lang lasalle',
-        # Core HR/benefits
-        'mercer limited', 'benefit systems', 'pluxee', 'sodexo',
-        'granttree limited',  # R&D tax credits
-    ]
-
-    for keyword in optimize_keywords:
-        if keyword in vendor_lower:
-            return 'Optimize'
+    vendor_lower = normalize_name(vendor_name)
 
+    # TERMINATE keywords win over OPTIMIZE keywords; both are found in one scan
+    #
     # CONSOLIDATE - Everything else (multiple tools, agencies, overlapping services)
     # This includes:
     # - Multiple SaaS tools in same category
@@ -95,69 +111,308 @@ def get_strategic_recommendation(vendor_name):
     # - Multiple telecom providers
     # - Multiple office space providers
     # - All other business services
+    return STRATEGIC_MATCHER.first(vendor_lower, 'Consolidate')
+
+# Header and colour coding for the Strategic Recommendation column
+HEADER_FONT = Font(bold=True, size=12, color="FFFFFF")
+HEADER_FILL = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
+HEADER_ALIGNMENT = Alignment(horizontal='left', vertical='center')
+CELL_ALIGNMENT = Alignment(horizontal='left', vertical='top')
+RECOMMENDATION_STYLES = {
+    'Terminate': (PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid"),  # Light red
+                  Font(color="CC0000", bold=True)),  # Dark red text
+    'Consolidate': (PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid"),  # Light orange
+                    Font(color="CC6600", bold=True)),  # Dark orange text
+    'Optimize': (PatternFill(start_color="E6F4EA", end_color="E6F4EA", fill_type="solid"),  # Light green
+                 Font(color="0D652D", bold=True)),  # Dark green text
+}
 
-    return 'Consolidate'
+# The same styles for xlsx_patch, which writes them into the stylesheet itself
+HEADER_CELL_STYLE = CellStyle(HEADER_FONT, HEADER_FILL, HEADER_ALIGNMENT, None)
+RECOMMENDATION_CELL_STYLES = {recommendation: CellStyle(font, fill, CELL_ALIGNMENT, f'Recommendation {recommendation}')
+                              for recommendation, (fill, font) in RECOMMENDATION_STYLES.items()}
 
-# Check if "Strategic Recommendation" column already exists
-header_row = list(ws[1])
-column_headers = [cell.value for cell in header_row]
+def register_recommendation_styles(wb):
+    """Register one named style per recommendation and return their names.
 
-# Find or create the Strategic Recommendation column
-if 'Strategic Recommendation' in column_headers:
-    rec_col_idx = column_headers.index('Strategic Recommendation') + 1
-    print("Found existing 'Strategic Recommendation' column, updating it...")
-else:
-    # Add new column after the existing columns
-    rec_col_idx = len(column_headers) + 1
-    rec_col_letter = ws.cell(row=1, column=rec_col_idx).column_letter
+    Cells then only reference a style by name, so no Font/PatternFill objects
+    are built per row and the saved stylesheet holds three entries however
+    many rows are coloured.
+    """
+    existing = set(wb.named_styles)
+    style_names = {}
+    for recommendation, (fill, font) in RECOMMENDATION_STYLES.items():
+        name = f'Recommendation {recommendation}'
+        if name not in existing:
+            wb.add_named_style(NamedStyle(name=name, font=copy(font), fill=copy(fill),
+                                          alignment=copy(CELL_ALIGNMENT)))
+        style_names[recommendation] = name
+    return style_names
+
+def recommendation_cache(workbook_path):
+    """Sidecar cache of recommendations made under the current keyword lists"""
+    return ResultCache.for_workbook(workbook_path, 'recommendation', rules_fingerprint(
+        STRATEGIC_MATCHER.matcher_class.__name__, STRATEGIC_MATCHER.rules))
+
+def recommend_many(vendor_names, cache=None):
+    """Recommendations for a sequence of names, evaluating each distinct vendor once"""
+    return map_unique(cached(get_strategic_recommendation, cache), vendor_names)
 
-    # Add header
-    header_cell = ws.cell(row=1, column=rec_col_idx)
-    header_cell.value = 'Strategic Recommendation'
-    header_cell.font = Font(bold=True, size=12, color="FFFFFF")
-    header_cell.fill = PatternFill(start_color="366092", end_color="366092", fill_type="solid")
-    header_cell.alignment = Alignment(horizontal='left', vertical='center')
+def add_recommendations(source_file, output_file, cache=None):
+    """Add the recommendation column by editing the fully loaded workbook.
+
+    Only cells whose value or style differs are rewritten; when nothing
+    differs and the output is the source itself, the save is skipped.
+    Returns (recommendation counts, whether the workbook was saved).
+    """
+    wb = load_workbook(source_file)
+    ws = wb.active
 
-    print(f"Created new 'Strategic Recommendation' column at position {rec_col_letter}")
+    # Check if "Strategic Recommendation" column already exists
+    header_row = list(ws[1])
+    column_headers = [cell.value for cell in header_row]
 
-# Process each vendor and add recommendation
-recommendations_count = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+    # Find or create the Strategic Recommendation column
+    column_created = 'Strategic Recommendation' not in column_headers
+    if not column_created:
+        rec_col_idx = column_headers.index('Strategic Recommendation') + 1
+        print("Found existing 'Strategic Recommendation' column, updating it...")
+    else:
+        # Add new column after the existing columns
+        rec_col_idx = len(column_headers) + 1
+        rec_col_letter = ws.cell(row=1, column=rec_col_idx).column_letter
 
-for row_num in range(2, ws.max_row + 1):
-    vendor_cell = ws.cell(row=row_num, column=1)  # Column A has vendor names
-    vendor_name = vendor_cell.value
+        # Add header
+        header_cell = ws.cell(row=1, column=rec_col_idx)
+        header_cell.value = 'Strategic Recommendation'
+        header_cell.font = HEADER_FONT
+        header_cell.fill = HEADER_FILL
+        header_cell.alignment = HEADER_ALIGNMENT
 
-    if vendor_name:
-        recommendation = get_strategic_recommendation(vendor_name)
+        print(f"Created new 'Strategic Recommendation' column at position {rec_col_letter}")
 
-        # Write recommendation to the new column
+    # Process each vendor and add recommendation
+    recommendations_count = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+    style_names = register_recommendation_styles(wb)
+    changed_cells = 0
+
+    # Column A has vendor names; each distinct vendor is evaluated once
+    vendor_rows = [(row[0].row, row[0].value) for row in ws.iter_rows(min_row=2, max_col=1) if row[0].value]
+    recommendations = recommend_many([vendor_name for _, vendor_name in vendor_rows], cache)
+
+    for (row_num, _), recommendation in zip(vendor_rows, recommendations):
+        # Write recommendation to the new column, color coded by named style
         rec_cell = ws.cell(row=row_num, column=rec_col_idx)
-        rec_cell.value = recommendation
-        rec_cell.alignment = Alignment(horizontal='left', vertical='top')
-
-        # Color code the recommendations
-        if recommendation == 'Terminate':
-            rec_cell.fill = PatternFill(start_color="FFE6E6", end_color="FFE6E6", fill_type="solid")  # Light red
-            rec_cell.font = Font(color="CC0000", bold=True)  # Dark red text
-        elif recommendation == 'Consolidate':
-            rec_cell.fill = PatternFill(start_color="FFF4E6", end_color="FFF4E6", fill_type="solid")  # Light orange
-            rec_cell.font = Font(color="CC6600", bold=True)  # Dark orange text
-        elif recommendation == 'Optimize':
-            rec_cell.fill = PatternFill(start_color="E6F4EA", end_color="E6F4EA", fill_type="solid")  # Light green
-            rec_cell.font = Font(color="0D652D", bold=True)  # Dark green text
+        if rec_cell.value != recommendation or rec_cell.style != style_names[recommendation]:
+            rec_cell.value = recommendation
+            rec_cell.style = style_names[recommendation]
+            changed_cells += 1
 
         recommendations_count[recommendation] += 1
 
-# Adjust column width
-ws.column_dimensions[ws.cell(row=1, column=rec_col_idx).column_letter].width = 25
+    # Adjust column width
+    ws.column_dimensions[ws.cell(row=1, column=rec_col_idx).column_letter].width = 25
+
+    # Save the updated workbook
+    saved = bool(changed_cells or column_created or os.path.abspath(output_file) != os.path.abspath(source_file))
+    if saved:
+        wb.save(output_file)
+        print(f"Updated {changed_cells} recommendation cells")
+    else:
+        print("No recommendation changed; workbook left untouched")
+    return recommendations_count, saved
+
+def patch_recommendations(source_file, output_file, cache=None):
+    """Add the recommendation column by patching it into the workbook's XML.
+
+    Same result as add_recommendations(), but only the sheet, shared strings
+    and stylesheet are rewritten; every other part of the file is copied as
+    it is.  Raises PatchError when the workbook's layout needs a full save.
+    Returns (recommendation counts, whether the workbook was written).
+    """
+    rows = xlsx_reader.iter_rows(source_file)
+    column_headers = list(next(rows, ()))
+    rows.close()
+    columns = find_columns(column_headers)
+    vendor_idx = columns.get(VENDOR_HEADER, 0)
+
+    cells = {}
+    rec_idx = columns.get(RECOMMENDATION_HEADER)
+    if rec_idx is None:
+        rec_idx = len(column_headers)
+        cells[1] = (RECOMMENDATION_HEADER, HEADER_CELL_STYLE)
+        print(f"Created new 'Strategic Recommendation' column at position {get_column_letter(rec_idx + 1)}")
+    else:
+        print("Found existing 'Strategic Recommendation' column, updating it...")
+
+    vendor_rows = [(row_num, vendor_name) for row_num, (vendor_name,)
+                   in enumerate(xlsx_reader.iter_rows(source_file, min_row=2, columns=[vendor_idx]), start=2) if vendor_name]
+    recommendations = recommend_many([vendor_name for _, vendor_name in vendor_rows], cache)
+
+    recommendations_count = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+    for (row_num, _), recommendation in zip(vendor_rows, recommendations):
+        cells[row_num] = (recommendation, RECOMMENDATION_CELL_STYLES[recommendation])
+        recommendations_count[recommendation] += 1
+
+    changed_cells = patch_column(source_file, output_file, rec_idx + 1, cells, width=25)
+    if 1 in cells:
+        # The new column's header is not a recommendation cell
+        changed_cells -= 1
+    saved = bool(changed_cells or 1 in cells or os.path.abspath(output_file) != os.path.abspath(source_file))
+    if saved:
+        print(f"Updated {changed_cells} recommendation cells")
+    else:
+        print("No recommendation changed; workbook left untouched")
+    return recommendations_count, saved
+
+def _style_template(ws, font=None, fill=None, alignment=None, source=None):
+    """Build a write-only cell whose style array can be copied onto other cells"""
+    template = WriteOnlyCell(ws)
+    if source is not None:
+        template.font = copy(source.font)
+        template.fill = copy(source.fill)
+        template.border = copy(source.border)
+        template.alignment = copy(source.alignment)
+        template.protection = copy(source.protection)
+        template.number_format = source.number_format
+    if font is not None:
+        template.font = font
+    if fill is not None:
+        template.fill = fill
+    if alignment is not None:
+        template.alignment = alignment
+    return template
+
+def _copy_row(ws, row, style_cache, overrides=None):
+    """Turn a read-only row into write-only cells, reusing one style per source style id"""
+    out = []
+    for idx, cell in enumerate(row):
+        if overrides and idx in overrides:
+            out.append(overrides[idx])
+            continue
+        new_cell = WriteOnlyCell(ws, value=cell.value)
+        style_id = getattr(cell, '_style_id', None)
+        if style_id:
+            template = style_cache.get(style_id)
+            if template is None:
+                template = style_cache[style_id] = _style_template(ws, source=cell)
+            new_cell._style = copy(template._style)
+        out.append(new_cell)
+    return out
+
+def stream_recommendations(source_file, output_file, cache=None):
+    """Add the recommendation column by streaming rows into a new workbook.
+
+    The source is read with openpyxl's read-only mode and the result is written
+    in write-only mode, so memory stays constant however long the ledger is.
+    Header styling, the recommendation colour coding and the other sheets are
+    carried over; column widths and merged cells are not available in
+    read-only mode and are left at their defaults.
+    """
+    recommend = cached(get_strategic_recommendation, cache)
+    src = load_workbook(source_file, read_only=True)
+    out = Workbook(write_only=True)
+    recommendations_count = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+
+    try:
+        for src_ws in src.worksheets:
+            ws = out.create_sheet(src_ws.title)
+            style_cache = {}
+            rows = src_ws.iter_rows()
+
+            if src_ws.title != src.active.title:
+                for row in rows:
+                    ws.append(_copy_row(ws, row, style_cache))
+                continue
+
+            header = next(rows, ())
+            column_headers = [cell.value for cell in header]
+            columns = find_columns(column_headers)
+            vendor_idx = columns.get(VENDOR_HEADER, 0)
+
+            # Find or create the Strategic Recommendation column
+            rec_idx = columns.get(RECOMMENDATION_HEADER)
+            header_out = _copy_row(ws, header, style_cache)
+            if rec_idx is None:
+                rec_idx = len(header_out)
+                header_cell = WriteOnlyCell(ws, value=RECOMMENDATION_HEADER)
+                header_cell._style = copy(_style_template(ws, HEADER_FONT, HEADER_FILL, HEADER_ALIGNMENT)._style)
+                header_out.append(header_cell)
+                print(f"Created new 'Strategic Recommendation' column at position {get_column_letter(rec_idx + 1)}")
+            else:
+                print("Found existing 'Strategic Recommendation' column, updating it...")
+            ws.column_dimensions[get_column_letter(rec_idx + 1)].width = 25
+            ws.append(header_out)
+
+            style_names = register_recommendation_styles(out)
+
+            for row in rows:
+                vendor_name = row[vendor_idx].value if vendor_idx < len(row) else None
+                if not vendor_name:
+                    ws.append(_copy_row(ws, row, style_cache))
+                    continue
+
+                recommendation = recommend(vendor_name)
+                rec_cell = WriteOnlyCell(ws, value=recommendation)
+                rec_cell.style = style_names[recommendation]
+                row_out = _copy_row(ws, row, style_cache, {rec_idx: rec_cell})
+                while len(row_out) < rec_idx:
+                    row_out.append(None)
+                if rec_idx >= len(row_out):
+                    row_out.append(rec_cell)
+                ws.append(row_out)
+
+                recommendations_count[recommendation] += 1
+    finally:
+        src.close()
+
+    out.save(output_file)
+    return recommendations_count
+
+def print_summary(output_file, recommendations_count, saved=True):
+    if saved:
+        print(f"\n✓ Updated spreadsheet saved: {output_file}")
+    else:
+        print(f"\n✓ Spreadsheet already up to date: {output_file}")
+    print(f"\nRecommendations Summary:")
+    print(f"  Terminate:    {recommendations_count['Terminate']} vendors")
+    print(f"  Consolidate:  {recommendations_count['Consolidate']} vendors")
+    print(f"  Optimize:     {recommendations_count['Optimize']} vendors")
+    print(f"  Total:        {sum(recommendations_count.values())} vendors")
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Add the Strategic Recommendation column to the vendor ledger')
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--stream', metavar='OUTPUT',
+                        help='stream rows into a new workbook at OUTPUT instead of editing in place')
+    parser.add_argument('--full-save', action='store_true',
+                        help='load and re-save the whole workbook instead of patching the column into it')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-evaluate every vendor instead of reusing cached recommendations')
+    parser.add_argument('--instrument', metavar='JSON',
+                        help='record matched rules, keyword hits and timings to this file')
+    args = parser.parse_args()
 
-# Save the updated workbook
-output_file = '/home/user/Vendor-Analysis-Assessment/Vendor Analysis Assessment - Deeba.xlsx'
-wb.save(output_file)
+    rule_engine.configure(args.workbook)
+    # A cache hit skips the classifier, so recording runs every vendor
+    cache = None if args.no_cache or args.instrument else recommendation_cache(args.workbook)
+    with recording(args.instrument) if args.instrument else contextlib.nullcontext():
+        if args.stream:
+            output_file = args.stream
+            recommendations_count = stream_recommendations(args.workbook, output_file, cache)
+            saved = True
+        else:
+            # Save the updated workbook over the source
+            output_file = args.workbook
+            recommendations_count = None
+            if not args.full_save:
+                try:
+                    recommendations_count, saved = patch_recommendations(args.workbook, output_file, cache)
+                except PatchError as e:
+                    print(f"Cannot patch the workbook ({e}); saving it in full")
+            if recommendations_count is None:
+                recommendations_count, saved = add_recommendations(args.workbook, output_file, cache)
+    if cache is not None:
+        cache.save()
 
-print(f"\n✓ Updated spreadsheet saved: {output_file}")
-print(f"\nRecommendations Summary:")
-print(f"  Terminate:    {recommendations_count['Terminate']} vendors")
-print(f"  Consolidate:  {recommendations_count['Consolidate']} vendors")
-print(f"  Optimize:     {recommendations_count['Optimize']} vendors")
-print(f"  Total:        {sum(recommendations_count.values())} vendors")
+    print_summary(output_file, recommendations_count, saved)
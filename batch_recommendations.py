@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Add strategic recommendations to many vendor workbooks in parallel.
+
+Usage:
+    python batch_recommendations.py "ledgers/*.xlsx"
+    python batch_recommendations.py ledgers/ --output-dir out/ --workers 4
+    python batch_recommendations.py ledgers/ --scaling
+
+Each workbook is handled by a process-pool worker.  Workers import the rule
+module once when they start, so keyword matchers are compiled once per
+process rather than once per workbook.  Workbooks edited in place have the
+column patched into their XML (see xlsx_patch), as the single-workbook
+script does.  With --output-dir, outputs keep their paths below the inputs'
+common directory, so same-named workbooks from different directories do not
+overwrite each other.  The run ends with the per-file and merged
+recommendation counts.
+"""
+import argparse
+import contextlib
+import glob
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+_rules = None
+
+
+def find_workbooks(pattern):
+    """Expand a directory or glob pattern into the .xlsx files it names"""
+    if os.path.isdir(pattern):
+        pattern = os.path.join(pattern, '*.xlsx')
+    return sorted(path for path in glob.glob(pattern)
+                  if path.endswith('.xlsx') and not os.path.basename(path).startswith('~$'))
+
+
+def _init_worker():
+    # Importing compiles the keyword matchers; done once per worker process
+    global _rules
+    import add_strategic_recommendations
+    _rules = add_strategic_recommendations
+
+
+def output_paths(paths, output_dir):
+    """Output file per input under output_dir, keeping each input's path below their common directory.
+
+    Inputs from different directories can share a file name; mirroring the
+    directories keeps their outputs apart.
+    """
+    inputs = [os.path.abspath(path) for path in paths]
+    root = os.path.commonpath([os.path.dirname(path) for path in inputs])
+    return [os.path.join(output_dir, os.path.relpath(path, root)) for path in inputs]
+
+
+def _process_workbook(path, output_file, use_cache):
+    if _rules is None:
+        _init_worker()
+    start = time.perf_counter()
+    # Each workbook may carry its own rule tables; unchanged tables are not recompiled
+    _rules.rule_engine.configure(path)
+    cache = _rules.recommendation_cache(path) if use_cache else None
+
+    # The single-workbook functions report progress on stdout; keep the
+    # batch output to one line per file
+    with contextlib.redirect_stdout(io.StringIO()):
+        if output_file:
+            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+            counts = _rules.stream_recommendations(path, output_file, cache)
+        else:
+            output_file = path
+            try:
+                counts, _ = _rules.patch_recommendations(path, output_file, cache)
+            except _rules.PatchError:
+                # Layouts the patcher does not handle get a full save
+                counts, _ = _rules.add_recommendations(path, output_file, cache)
+    if cache is not None:
+        cache.save()
+    return output_file, counts, time.perf_counter() - start
+
+
+def run_batch(paths, workers=None, output_dir=None, use_cache=True):
+    """Process every workbook and return [(output_file, counts, seconds)] in input order"""
+    outputs = output_paths(paths, output_dir) if output_dir else [None] * len(paths)
+    workers = max(1, min(workers or os.cpu_count() or 1, len(paths)))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_process_workbook, path, output_file, use_cache)
+                   for path, output_file in zip(paths, outputs)]
+        return [future.result() for future in futures]
+
+
+def merge_counts(results):
+    merged = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+    for _, counts, _ in results:
+        for recommendation, count in counts.items():
+            merged[recommendation] = merged.get(recommendation, 0) + count
+    return merged
+
+
+def measure_scaling(paths, copies=4, max_workers=None):
+    """Time the batch at 1..max_workers workers on copies of the given workbooks.
+
+    Outputs go to a scratch directory and the cache is disabled so every run
+    does the full amount of work.
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    scratch = tempfile.mkdtemp(prefix='batch_scaling_')
+    try:
+        inputs = []
+        for i in range(copies):
+            for path in paths:
+                target = os.path.join(scratch, f'{i}_{os.path.basename(path)}')
+                shutil.copyfile(path, target)
+                inputs.append(target)
+        output_dir = os.path.join(scratch, 'out')
+
+        timings = []
+        for workers in range(1, max_workers + 1):
+            start = time.perf_counter()
+            run_batch(inputs, workers=workers, output_dir=output_dir, use_cache=False)
+            timings.append((workers, time.perf_counter() - start))
+        return len(inputs), timings
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Add strategic recommendations to many vendor workbooks in parallel')
+    parser.add_argument('pattern', help='directory or glob pattern of .xlsx workbooks')
+    parser.add_argument('--workers', type=int, help='worker processes (default: one per core)')
+    parser.add_argument('--output-dir', help='stream results into this directory instead of editing in place')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-evaluate every vendor instead of reusing cached recommendations')
+    parser.add_argument('--scaling', action='store_true',
+                        help='benchmark wall-clock time for 1..N workers instead of processing')
+    args = parser.parse_args()
+
+    paths = find_workbooks(args.pattern)
+    if not paths:
+        parser.error(f'no workbooks match {args.pattern}')
+
+    if args.scaling:
+        total, timings = measure_scaling(paths, max_workers=args.workers)
+        base = timings[0][1]
+        print(f"Scaling over {total} workbooks ({os.cpu_count()} cores available):")
+        print("| Workers | Seconds | Speed-up | Efficiency |")
+        print("|---------|---------|----------|------------|")
+        for workers, seconds in timings:
+            print(f"| {workers} | {seconds:.2f} | {base / seconds:.2f}x | {base / seconds / workers:.0%} |")
+    else:
+        results = run_batch(paths, workers=args.workers, output_dir=args.output_dir,
+                            use_cache=not args.no_cache)
+        for output_file, counts, seconds in results:
+            print(f"✓ {output_file}: {sum(counts.values())} vendors in {seconds:.2f}s")
+
+        merged = merge_counts(results)
+        print(f"\nMerged Recommendations Summary ({len(results)} workbooks):")
+        print(f"  Terminate:    {merged['Terminate']} vendors")
+        print(f"  Consolidate:  {merged['Consolidate']} vendors")
+        print(f"  Optimize:     {merged['Optimize']} vendors")
+        print(f"  Total:        {sum(merged.values())} vendors")
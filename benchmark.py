@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""Benchmark the ledger scripts on synthetic vendor ledgers.
+
+Synthetic workbooks use the real ledger's column layout.  Names are drawn
+from the real vendor list with a long-tailed (Zipf) frequency, as ledgers
+repeat their big vendors heavily, and mixed with generated Croatian d.o.o.
+entities, UK Ltds, hotels and SaaS vendors.  Some names carry the
+Windows-1252 mojibake the real exports have.  Costs follow a log-normal
+spread similar to the real ledger.
+
+Each size runs in a fresh process and times the phases separately:
+
+    load       parse the workbook (ledger cache bypassed)
+    classify   classify_vendor() for every row
+    describe   get_vendor_description() for every row
+    recommend  get_strategic_recommendation() for every row
+    save       write the ledger with the derived columns (write-only workbook)
+
+Memory is reported as the process's peak RSS after each phase, which is
+cumulative: a phase that stays below an earlier phase's peak shows that
+earlier peak.  The growth column is how far the phase raised it, so it is
+zero for phases that needed no more memory than the ones before.  Results are
+appended as one JSON object per size to the output file, tagged with the
+git commit, so runs can be compared over time.
+
+Usage:
+    python benchmark.py                                # 1k, 10k and 100k rows
+    python benchmark.py --sizes 1000 1000000 --output bench_results.jsonl
+    python benchmark.py --baseline bench_results.jsonl  # compare with the last recorded run
+"""
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from openpyxl import Workbook
+
+DEFAULT_SIZES = [1_000, 10_000, 100_000]
+PHASES = ['load', 'classify', 'describe', 'recommend', 'save']
+
+# Column layout of the real ledger
+LEDGER_HEADER = [
+    'Vendor Name', 'Department', 'Last 12 months Cost (USD)',
+    '1-line Description on what the Vendor does',
+    'Suggestions (Consolidate / Terminate / Optimize costs)',
+]
+OUTPUT_HEADER = LEDGER_HEADER[:4] + ['Strategic Recommendation']
+
+# Share of rows drawn from the real vendor list; the rest are generated
+REAL_NAME_SHARE = 0.7
+# Share of names exported with UTF-8 read as Windows-1252
+MOJIBAKE_SHARE = 0.05
+# Log-normal cost parameters (USD), close to the real ledger's spread
+COST_MU, COST_SIGMA = 7.5, 2.0
+
+CROATIAN_WORDS = ['Adria', 'Jadran', 'Zagreb', 'Split', 'Dalmacija', 'Sveti Duje', 'Marjan', 'Lipa',
+                  'Kvarner', 'Sava', 'Drava', 'Velebit', 'Hrvatska', 'Plitvice', 'Ribarnica', 'Čistoća',
+                  'Građevina', 'Šibenik', 'Žitnjak', 'Maslina', 'Obrt', 'Tisak', 'Usluge', 'Savjetovanje']
+UK_WORDS = ['Albion', 'Thames', 'Crown', 'Kingsway', 'Pennine', 'Harbour', 'Oakwood', 'Northgate',
+            'Consulting', 'Solutions', 'Recruitment', 'Legal', 'Partners', 'Services', 'Trading']
+HOTEL_WORDS = ['Grand', 'Park', 'Palace', 'Central', 'Riviera', 'Marina', 'Bellevue', 'Royal']
+SAAS_WORDS = ['Cloud', 'Data', 'Stack', 'Flow', 'Sync', 'Pulse', 'Metric', 'Signal', 'Forge', 'Loop']
+
+TEMPLATES = [
+    (0.35, lambda r: f"{r.choice(CROATIAN_WORDS)} {r.choice(CROATIAN_WORDS)} d.o.o."),
+    (0.25, lambda r: f"{r.choice(UK_WORDS)} {r.choice(UK_WORDS)} Ltd"),
+    (0.15, lambda r: f"Hotel {r.choice(HOTEL_WORDS)} {r.choice(CROATIAN_WORDS + UK_WORDS)}"),
+    (0.25, lambda r: f"{r.choice(SAAS_WORDS)}{r.choice(SAAS_WORDS).lower()} Inc"),
+]
+
+
+def _mojibake(name):
+    return name.encode('utf-8').decode('cp1252', errors='replace')
+
+
+def synthetic_names(count, seed=0):
+    """Vendor names with the real ledger's mix of spellings and repetition"""
+    from vendor_descriptions import VENDOR_DESCRIPTIONS
+
+    rng = random.Random(seed)
+    real = [name.title() for name in VENDOR_DESCRIPTIONS]
+    rng.shuffle(real)
+    zipf = [1 / (rank + 1) for rank in range(len(real))]
+    template_weights = [weight for weight, _ in TEMPLATES]
+
+    names = []
+    for _ in range(count):
+        if rng.random() < REAL_NAME_SHARE:
+            name = rng.choices(real, zipf)[0]
+        else:
+            name = rng.choices(TEMPLATES, template_weights)[0][1](rng)
+        if rng.random() < MOJIBAKE_SHARE:
+            name = _mojibake(name)
+        names.append(name)
+    return names
+
+
+def generate_workbook(path, rows, seed=0):
+    """Write a synthetic ledger with the real column layout"""
+    rng = random.Random(seed + 1)
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet('Vendor Analysis Assessment')
+    ws.append(LEDGER_HEADER)
+    for name in synthetic_names(rows, seed):
+        ws.append([name, None, round(math.exp(rng.gauss(COST_MU, COST_SIGMA)), 2), None, None])
+    wb.save(path)
+
+
+def _peak_rss_mb():
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+
+def _run_phases(workbook_path, output_path):
+    """Time each phase in this process; returns {phase: {seconds, peak_rss_mb, rss_growth_mb}}
+
+    peak_rss_mb is the process's peak RSS so far, not the phase's own peak.
+    """
+    import rule_engine
+    from add_strategic_recommendations import get_strategic_recommendation
+    from classify_vendors import classify_vendor
+    from generate_descriptions import get_vendor_description
+    from ledger_reader import parse_vendors
+
+    results = {}
+
+    def timed(phase, func):
+        peak_before = _peak_rss_mb()
+        start = time.perf_counter()
+        value = func()
+        seconds = time.perf_counter() - start
+        peak = _peak_rss_mb()
+        results[phase] = {'seconds': round(seconds, 4), 'peak_rss_mb': peak,
+                          'rss_growth_mb': round(peak - peak_before, 1)}
+        return value
+
+    rule_engine.configure(workbook_path)
+    records = timed('load', lambda: list(parse_vendors(workbook_path)))
+    departments = timed('classify', lambda: [classify_vendor(r.name) for r in records])
+    descriptions = timed('describe', lambda: [get_vendor_description(r.name) for r in records])
+    recommendations = timed('recommend', lambda: [get_strategic_recommendation(r.name) for r in records])
+
+    def save():
+        wb = Workbook(write_only=True)
+        ws = wb.create_sheet('Vendor Analysis Assessment')
+        ws.append(OUTPUT_HEADER)
+        for record, department, description, recommendation in zip(
+                records, departments, descriptions, recommendations):
+            ws.append([record.name, department, record.cost, description, recommendation])
+        wb.save(output_path)
+
+    timed('save', save)
+    return len(records), results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_benchmark(sizes, data_dir, seed=0):
+    """Generate (or reuse) a workbook per size and time it in a fresh process"""
+    os.makedirs(data_dir, exist_ok=True)
+    commit = git_commit()
+    for size in sizes:
+        workbook_path = os.path.join(data_dir, f'ledger_{size}_{seed}.xlsx')
+        if not os.path.exists(workbook_path):
+            generate_workbook(workbook_path, size, seed)
+        output_path = os.path.join(data_dir, f'ledger_{size}_{seed}_out.xlsx')
+
+        # A fresh process per size keeps memoisation and peak RSS independent
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            rows, phases = pool.submit(_run_phases, workbook_path, output_path).result()
+        os.remove(output_path)
+
+        yield {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': commit,
+            'python': platform.python_version(),
+            'size': size,
+            'rows': rows,
+            'seed': seed,
+            'phases': phases,
+            'total_seconds': round(sum(p['seconds'] for p in phases.values()), 4),
+        }
+
+
+def load_baseline(path):
+    """Last recorded result per size in a results file"""
+    baseline = {}
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                result = json.loads(line)
+                baseline[result['size']] = result
+    return baseline
+
+
+def print_result(result, baseline=None):
+    before = (baseline or {}).get(result['size'])
+    print(f"\n{result['rows']:,} rows (commit {result['commit'] or 'unknown'}):")
+    print("| Phase | Seconds | Rows/s | Cumulative peak RSS (MB) | Peak growth (MB) |"
+          + (" vs baseline |" if before else ""))
+    print("|---|---|---|---|---|" + ("---|" if before else ""))
+    for phase in PHASES:
+        stats = result['phases'][phase]
+        rate = result['rows'] / stats['seconds'] if stats['seconds'] else float('inf')
+        line = (f"| {phase} | {stats['seconds']:.3f} | {rate:,.0f} | {stats['peak_rss_mb']:.1f} | "
+                f"{stats['rss_growth_mb']:.1f} |")
+        if before:
+            old = before['phases'][phase]['seconds']
+            line += f" {stats['seconds'] / old - 1:+.1%} |" if old else " n/a |"
+        print(line)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark the ledger scripts on synthetic ledgers')
+    parser.add_argument('--sizes', type=int, nargs='+', default=DEFAULT_SIZES, help='ledger sizes in rows')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--data-dir', default=os.path.join(tempfile.gettempdir(), 'vendor_benchmark'),
+                        help='where synthetic workbooks are generated and reused')
+    parser.add_argument('--output', help='append results as JSON lines to this file')
+    parser.add_argument('--baseline', help='JSON-lines results file to compare against')
+    args = parser.parse_args()
+
+    baseline = load_baseline(args.baseline) if args.baseline else None
+    for result in run_benchmark(args.sizes, args.data_dir, args.seed):
+        print_result(result, baseline)
+        if args.output:
+            with open(args.output, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(result) + '\n')
@@ -1,89 +1,102 @@
 #!/usr/bin/env python3
-from openpyxl import load_workbook
-
-# Load the workbook
-wb = load_workbook('/home/user/Vendor-Analysis-Assessment/Vendor Analysis Assessment - Deeba.xlsx')
-ws = wb.active
-
-# Get vendor names from the spreadsheet
-vendors = []
-for row in ws.iter_rows(min_row=2, values_only=True):  # Skip header
-    if row[0]:  # If vendor name exists
-        vendors.append(row[0])
-
-# Classification rules based on vendor name and business type
-def classify_vendor(vendor_name):
-    vendor_lower = vendor_name.lower()
+import rule_engine
+from instrumentation import instrumented
+from keyword_matcher import TokenMatcher
+from ledger_reader import DEFAULT_WORKBOOK, read_vendors
+from result_cache import ResultCache, cached, rules_fingerprint
+from vendor_names import map_unique, normalize_name
+from vendor_table import VendorTable
 
+# Classification rules based on vendor name and business type.
+# Order matters: the first department whose keywords match wins.
+DEPARTMENT_RULES = [
     # Legal - must come before checking LLP
-    if any(keyword in vendor_lower for keyword in ['law', 'legal', 'solicitor', 'odvjetnicko', 'notary',
-                                                     'pinsent masons', 'kilgannon & partners']):
-        return 'Legal'
+    ('Legal', [
+        'law', 'lawyer', 'induslaw', 'legal', 'solicitor', 'odvjetnicko', 'notary',
+        'pinsent masons', 'kilgannon & partners'
+    ]),
 
     # Finance - check before generic LLP
-    if any(keyword in vendor_lower for keyword in [
-        'insurance', 'osiguranje', 'bdo', 'rsm', 'grant thornton', 'pricewaterhouse', 'pwc',
+    ('Finance', [
+        'insurance', 'osiguranje', 'bdo', 'rsm', 'grant thornton', 'pricewaterhouse*', 'pwc',
         'chartered accountant', 'finance', 'houlihan lokey', 'vector capital',
         'sage', 'planful', 'collards', 'mcburney', 'shastri', 'mercer limited',
-        'crowe horwath', 'tax', 'cigna', 'bupa', 'aetna', 'icare', 'allianz', 'icici lombard',
+        'crowe horwath', 'tax', 'taxstudio', 'cigna', 'bupa', 'aetna', 'icare', 'allianz', 'icici lombard',
         'taxation office', 'australian taxation office'
-    ]):
-        return 'Finance'
+    ]),
 
     # Marketing - check before Engineering for tools that could be both
-    if any(keyword in vendor_lower for keyword in [
+    ('Marketing', [
         'salesforce', 'linkedin', 'hubspot', 'cognism', 'uberflip', 'google ireland', 'mightyhive',
         'semrush', 'lusha', 'outreach corporation', 'cision', 'terrapinn'
-    ]):
-        return 'Marketing'
+    ]),
 
     # Engineering (Cloud, IT, Software Development)
-    if any(keyword in vendor_lower for keyword in [
-        'aws', 'amazon web services', 'cloud', 'intralinks', 'infosys', 'workato',
+    ('Engineering', [
+        'aws', 'amazon web services', 'cloud*', 'intralinks', 'infosys', 'workato',
         'kimble', 'jetbrains', 'adobe', 'microsoft', 'npm', 'github', 'gitlab',
         'tech solutions', 'it solutions', 'smartsheet', 'trello', 'jira', 'aha!',
         'docusign', 'fastspring', 'ariba', 'tmforum', 'tm forum', 'new star networks',
         'shree info', 'telefonica', 'kryterion', 'yoxel', 'radius group',
         'trending technology', 'epignosis', 'papertrail', 'atlassian', 'zapier',
         'solarwinds', 'figma', 'lastpass', 'pluralsight', 'uptime robot'
-    ]):
-        return 'Engineering'
+    ]),
 
     # Support (Customer support, Help desk)
-    if any(keyword in vendor_lower for keyword in [
+    ('Support', [
         'peakon', 'zendesk', 'freshdesk', 'intercom', 'support'
-    ]):
-        return 'Support'
+    ]),
 
     # G&A (General & Administrative - HR, Travel, Office, Facilities, Recruiting, etc.)
-    if any(keyword in vendor_lower for keyword in [
-        'navan', 'tripaction', 'properties', 'tower', 'spaces', 'wework', 'office',
+    ('G&A', [
+        'navan', 'tripaction*', 'properties', 'tower', 'spaces', 'wework', 'office*',
         'tog uk', 'zagrebtower', 'innovent spaces', 'weking', 'gpt space', 'recruitment',
         'hr solution', 'accutrainee', 'mason frank', 'cedar recruitment', 'technet',
-        'hotel', 'resort', 'catering', 'restaurant', 'travel', 'sodexo', 'benefit systems',
-        'studentski', 'recreation', 'gym', 'parking', 'telekom', 'telecom', 'starhub',
+        'hotel*', 'resort', 'catering', 'restaurant', 'travel', 'sodexo', 'benefit systems',
+        'studentski', 'recreation', 'gym*', 'parking', 'telekom', 'telecom', 'starhub',
         't-mobile', 'vodafone', 'british telecommunications', 'goto', 'slack',
-        'konzum', 'ikea', 'transport', 'fakultet', 'university', 'grad ', 'city ',
+        'konzum', 'ikea', 'transport*', 'fakultet', 'university', 'grad', 'city',
         'uber', 'office move', 'blink events', 'acclime', 'intertrust', 'cbre',
         'jones lang', 'plus your business', 'work easy', 'backoffice', 'integrated personnel',
-        'visalogic', 'green commute', 'pluxee', 'event', 'golubica parking', 'aquila remete',
-        'dsv solutions', 'computershare', 'winmaxi tours', 'lunch nutrition', 'food', 'cafe',
+        'visalogic', 'green commute', 'pluxee', 'event*', 'golubica parking', 'aquila remete',
+        'dsv solutions', 'computershare', 'winmaxi tours', 'lunch nutrition', 'food*', 'cafe',
         'stipe piric', 'ansar madovic', 'susan lee', 'john smith', 'fabiola', 'george anchor',
         'anchor recruitment'
-    ]):
-        return 'G&A'
+    ]),
+]
+
+# Keywords match whole words ('*' lets the last word continue: 'hotel*' also
+# matches "Hoteli"). Compiled once; the Config sheet or a sidecar rules file
+# can replace these lists (see rule_engine)
+DEPARTMENT_MATCHER = rule_engine.register('department', DEPARTMENT_RULES, TokenMatcher)
+
+@instrumented('department', default='G&A')
+def classify_vendor(vendor_name):
+    vendor_lower = normalize_name(vendor_name)
 
     # Default to G&A for facilities, catering, and general services
-    return 'G&A'
+    return DEPARTMENT_MATCHER.first(vendor_lower, 'G&A')
+
+def classify_many(vendor_names, cache=None):
+    """Departments for a sequence of names, classifying each distinct vendor once"""
+    return map_unique(cached(classify_vendor, cache), vendor_names)
+
+def department_cache(workbook_path):
+    """Sidecar cache of departments assigned under the current rules"""
+    return ResultCache.for_workbook(workbook_path, 'department', rules_fingerprint(
+        DEPARTMENT_MATCHER.matcher_class.__name__, DEPARTMENT_MATCHER.rules))
 
-# Classify all vendors
-classified_vendors = []
-for vendor in vendors:
-    department = classify_vendor(vendor)
-    classified_vendors.append((vendor, department))
+if __name__ == '__main__':
+    # Classify all vendors, streaming names from the ledger; only names not
+    # seen under the current rules are evaluated
+    rule_engine.configure(DEFAULT_WORKBOOK)
+    cache = department_cache(DEFAULT_WORKBOOK)
+    vendors = VendorTable.from_records(read_vendors(DEFAULT_WORKBOOK))
+    vendors.derive('department', cached(classify_vendor, cache))
+    cache.save()
 
-# Print table
-print("| Vendor Name | Department |")
-print("|-------------|------------|")
-for vendor, dept in classified_vendors:
-    print(f"| {vendor} | {dept} |")
+    # Print table
+    print("| Vendor Name | Department |")
+    print("|-------------|------------|")
+    for i in range(len(vendors)):
+        print(f"| {vendors.name(i)} | {vendors.department(i)} |")
@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""Currency normalisation of ledger costs to USD.
+
+The ledger mixes UK, Croatian, Indian, Australian and Singaporean entities,
+but its cost column is read as if every amount were in USD.  This stage
+finds each row's invoice currency and converts the amount with a local rate
+file.
+
+A row's currency is taken from a "Currency" column when the sheet has one,
+and otherwise inferred from the vendor name: legal forms and place names
+("d.o.o.", "Pvt Ltd", "Pty Ltd", "Pte Ltd", "Ltd", "Inc", "Zagreb") are a
+whole-word rule set like the department rules, so a Config sheet or sidecar
+rules file can override them (see rule_engine).  Inference runs once per
+distinct vendor and is kept in the workbook's result cache, so a re-run only
+infers vendors it has not seen.  A row's period is its "Period" column, or
+the period given for the run.
+
+The rate file is a CSV with the columns "Currency", "Period" (YYYY-MM) and
+"USD Rate" (USD per unit of the currency).  Periods in other common forms
+("2024-6", "Jun 2024", a date) are read as their year and month; a period
+that cannot be read is an error, not a string compared out of order.  A period without its own rate
+uses the currency's latest earlier one.  Rates are looked up once per
+distinct (currency, period) pair; conversion is one vectorised multiply.
+Rows whose currency cannot be inferred, or has no rate, are left blank and
+their vendors are reported.
+
+Requires numpy and pandas.
+
+Usage:
+    python fx_rates.py [WORKBOOK] [--rates RATES.csv] [--period 2024-06] [--write]
+"""
+import argparse
+import csv
+import datetime
+import math
+import numbers
+import os
+import re
+import time
+from bisect import bisect_right
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import rule_engine
+import xlsx_reader
+from instrumentation import instrumented
+from keyword_matcher import TokenMatcher
+from ledger_cache import load_columns
+from ledger_reader import DEFAULT_WORKBOOK, find_columns
+from result_cache import ResultCache, cached, rules_fingerprint
+from vendor_names import map_unique, normalize_name
+
+BASE_CURRENCY = 'USD'
+
+# Sidecar rate file next to the workbook, like the <workbook>.rules.csv table
+RATES_SUFFIX = '.fx.csv'
+
+CURRENCY_HEADER = 'Currency'
+PERIOD_HEADER = 'Period'
+RATE_HEADER = 'USD Rate'
+CONVERTED_HEADER = 'Cost (USD, converted)'
+
+# Stored in the result cache for vendors whose currency cannot be inferred
+UNRESOLVED = ''
+
+# Excel's day zero for serial dates
+EXCEL_EPOCH = datetime.date(1899, 12, 30)
+
+# Numeric periods: integers in YYYYMM_RANGE are read as YYYYMM, numbers in
+# [EXCEL_SERIAL_RANGE) as serial dates (1900-01-01 up to 2100); anything else
+# is rejected rather than turned into a date centuries away
+YYYYMM_RANGE = (190001, 299912)
+EXCEL_SERIAL_RANGE = (2, (datetime.date(2100, 1, 1) - EXCEL_EPOCH).days)
+
+# Period texts: (pattern, year group, month group)
+_PERIOD_FORMATS = [
+    (re.compile(r'(\d{4})[-/.](\d{1,2})(?:[-/.]\d{1,2})?(?:[ T].*)?'), 1, 2),
+    (re.compile(r'(\d{4})(\d{2})'), 1, 2),
+    (re.compile(r'(\d{1,2})[-/.](\d{4})'), 2, 1),
+    (re.compile(r'([A-Za-z]{3,})\.?[-\s,]*(\d{4})'), 2, 1),
+]
+_MONTH_NAMES = {name: number for number, name in enumerate(
+    ['january', 'february', 'march', 'april', 'may', 'june', 'july', 'august', 'september', 'october',
+     'november', 'december'], start=1)}
+_MONTH_NAMES.update({name[:3]: number for name, number in list(_MONTH_NAMES.items())}, sept=9)
+
+# The first currency whose keywords match wins: the specific legal forms
+# ('pvt ltd', 'pty ltd', 'pte ltd') come before the generic 'ltd'
+CURRENCY_RULES = [
+    ('INR', ['pvt', 'private limited', 'india', 'bangalore', 'bengaluru', 'mumbai', 'new delhi', 'pune']),
+    ('AUD', ['pty', 'australia', 'australian', 'aus', 'melbourne', 'sydney', 'nsw']),
+    ('SGD', ['pte', 'singapore', 'sg']),
+    ('EUR', ['d o o', 'j d o o', 'd d', 'obrt', 'zagreb', 'split', 'hrvatska', 'croatia', 'gmbh',
+             'bv', 'bvba', 'oy', 'ireland']),
+    ('DKK', ['a s', 'aps', 'denmark']),
+    ('GBP', ['ltd', 'limited', 'llp', 'plc', 'uk', 'co uk', 'british', 'london', 'manchester']),
+    ('USD', ['inc', 'llc', 'corp', 'corporation', 'usa', 'amer']),
+]
+CURRENCY_MATCHER = rule_engine.register('currency', CURRENCY_RULES, TokenMatcher)
+
+Conversion = namedtuple('Conversion', ['usd', 'rates', 'unresolved'])
+
+
+@instrumented('currency', default=None)
+def infer_currency(vendor_name):
+    """ISO code of the vendor's likely invoice currency, or None"""
+    return CURRENCY_MATCHER.first(normalize_name(vendor_name))
+
+
+def currency_cache(workbook_path):
+    """Sidecar cache of currencies inferred under the current rules"""
+    return ResultCache.for_workbook(workbook_path, 'currency', rules_fingerprint(
+        CURRENCY_MATCHER.matcher_class.__name__, CURRENCY_MATCHER.rules))
+
+
+def _infer_or_flag(vendor_name):
+    # Unresolved vendors are cached too, as UNRESOLVED rather than None
+    return infer_currency(vendor_name) or UNRESOLVED
+
+
+def currencies_for(names, stated=None, cache=None):
+    """Currency per row: the stated one where given, else inferred once per distinct vendor"""
+    inferred = map_unique(cached(_infer_or_flag, cache), names)
+    if stated is None:
+        return inferred
+    return [str(given).strip().upper() if given else currency for given, currency in zip(stated, inferred)]
+
+
+def parse_period(value):
+    """(year, month) of a period cell: text, a date, a YYYYMM number or an Excel
+    serial date; None if blank or NaN.
+
+    Text may be "2024-06", "2024-6", "2024/06/15", "06/2024", "202406" or
+    "Jun 2024"; anything else raises ValueError rather than being compared
+    as text and matched to the wrong rate.
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.year, value.month
+    if isinstance(value, (bool, np.bool_)):
+        raise ValueError(f"Unrecognised period {value!r}; expected YYYY-MM")
+    if isinstance(value, numbers.Real):
+        if math.isnan(value):
+            return None
+        if float(value).is_integer() and YYYYMM_RANGE[0] <= value <= YYYYMM_RANGE[1]:
+            text = str(int(value))
+        elif EXCEL_SERIAL_RANGE[0] <= value < EXCEL_SERIAL_RANGE[1]:
+            value = EXCEL_EPOCH + datetime.timedelta(days=int(value))
+            return value.year, value.month
+        else:
+            raise ValueError(f"Unrecognised period {value!r}; expected YYYY-MM")
+    else:
+        text = str(value).strip()
+    if not text:
+        return None
+    for pattern, year_group, month_group in _PERIOD_FORMATS:
+        match = pattern.fullmatch(text)
+        if match:
+            month = match.group(month_group)
+            month = int(month) if month.isdigit() else _MONTH_NAMES.get(month.lower())
+            if month is not None and 1 <= month <= 12:
+                return int(match.group(year_group)), month
+            break
+    raise ValueError(f"Unrecognised period {value!r}; expected YYYY-MM")
+
+
+def period_key(value):
+    """'YYYY-MM' of a period cell (see parse_period); None if blank"""
+    period = parse_period(value)
+    return None if period is None else f'{period[0]:04d}-{period[1]:02d}'
+
+
+class FxTable:
+    """USD rates by currency and period, memoised per (currency, period)"""
+
+    def __init__(self, rates):
+        # {currency: ([period, ...] ascending, [rate, ...])}
+        self._series = {}
+        for currency, by_period in rates.items():
+            periods = sorted(by_period)
+            self._series[currency] = (periods, [by_period[period] for period in periods])
+        self._memo = {}
+
+    @classmethod
+    def read(cls, path):
+        rates = {}
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                currency = (row.get(CURRENCY_HEADER) or '').strip().upper()
+                try:
+                    period = period_key((row.get(PERIOD_HEADER) or '').strip())
+                except ValueError as e:
+                    raise ValueError(f"{path}, line {reader.line_num}: {e}") from None
+                rate = (row.get(RATE_HEADER) or '').strip()
+                if currency and period and rate:
+                    rates.setdefault(currency, {})[period] = float(rate)
+        return cls(rates)
+
+    @property
+    def latest_period(self):
+        return max((periods[-1] for periods, _ in self._series.values()), default=None)
+
+    def rate(self, currency, period):
+        """USD per unit of currency in period (or its latest earlier rate); None if unknown"""
+        key = (currency, period)
+        if key in self._memo:
+            return self._memo[key]
+        rate = None
+        if currency == BASE_CURRENCY:
+            rate = 1.0
+        elif currency in self._series and period is not None:
+            periods, rates = self._series[currency]
+            position = bisect_right(periods, period)
+            if position:
+                rate = rates[position - 1]
+        self._memo[key] = rate
+        return rate
+
+    def convert(self, amounts, currencies, periods):
+        """Conversion of amounts to USD; rows without a currency or rate are unresolved (NaN).
+
+        periods is one period for every row or a sequence with one per row.
+        """
+        amounts = np.asarray(amounts, dtype=np.float64)
+        currency_codes, currency_values = pd.factorize(np.asarray(currencies, dtype=object))
+        if isinstance(periods, str) or periods is None:
+            period_codes, period_values = np.zeros(len(amounts), dtype=np.intp), [periods]
+        else:
+            period_codes, period_values = pd.factorize(np.asarray(periods, dtype=object))
+
+        # Blank currencies or periods factorise to -1; they map to the extra last slot
+        currency_values = list(currency_values) + [None]
+        period_values = list(period_values) + [None]
+        width = len(period_values)
+        pair_codes = (currency_codes % len(currency_values)) * width + period_codes % width
+        pairs, inverse = np.unique(pair_codes, return_inverse=True)
+        pair_rates = np.array([
+            self.rate(currency_values[pair // width], period_values[pair % width])
+            for pair in pairs.tolist()], dtype=np.float64)
+        rates = pair_rates[inverse]
+        return Conversion(amounts * rates, rates, np.isnan(rates))
+
+
+def rates_path_for(workbook_path):
+    root, _ = os.path.splitext(workbook_path)
+    return root + RATES_SUFFIX
+
+
+def _optional_column(workbook_path, header, rows):
+    """Values of the column headed header on the given worksheet rows, or None"""
+    column = find_columns(next(xlsx_reader.iter_rows(workbook_path), ())).get(header)
+    if column is None:
+        return None
+    values = [value for value, in xlsx_reader.iter_rows(workbook_path, min_row=2, columns=[column])]
+    return [values[row - 2] if row - 2 < len(values) else None for row in rows]
+
+
+def convert_ledger(workbook_path, table, period=None, cache=None):
+    """(LedgerColumns, currencies, Conversion) of the ledger's cost column"""
+    columns = load_columns(workbook_path)
+    rows = columns.row.tolist()
+    names = columns.name.tolist()
+    currencies = currencies_for(names, _optional_column(workbook_path, CURRENCY_HEADER, rows), cache)
+    stated_periods = _optional_column(workbook_path, PERIOD_HEADER, rows)
+    if stated_periods is not None:
+        periods = []
+        for row, value in zip(rows, stated_periods):
+            try:
+                periods.append(period_key(value) or period)
+            except ValueError as e:
+                raise ValueError(f"{workbook_path}, row {row}: {e}") from None
+    else:
+        periods = period
+    return columns, currencies, table.convert(columns.cost, currencies, periods)
+
+
+def write_converted(workbook_path, rows, usd):
+    """Patch the converted costs into the workbook's CONVERTED_HEADER column"""
+    from xlsx_patch import patch_column
+
+    header = list(next(xlsx_reader.iter_rows(workbook_path), ()))
+    column = find_columns(header).get(CONVERTED_HEADER)
+    cells = {row: (None if value != value else round(value, 2), None) for row, value in zip(rows, usd.tolist())}
+    if column is None:
+        column = len(header)
+        cells[1] = (CONVERTED_HEADER, None)
+    return patch_column(workbook_path, workbook_path, column + 1, cells, width=18)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Convert ledger costs to USD with a local FX rate file')
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--rates', help=f'rate CSV (default: <workbook>{RATES_SUFFIX})')
+    parser.add_argument('--period', type=period_key,
+                        help='YYYY-MM of rows without a Period column (default: latest rate period)')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-infer every vendor instead of reusing cached currencies')
+    parser.add_argument('--write', action='store_true',
+                        help=f"write the converted costs to a '{CONVERTED_HEADER}' column")
+    args = parser.parse_args()
+
+    rates_path = args.rates or rates_path_for(args.workbook)
+    if not os.path.exists(rates_path):
+        raise SystemExit(f"No FX rate file at {rates_path} "
+                         f"(columns: {CURRENCY_HEADER}, {PERIOD_HEADER}, {RATE_HEADER})")
+    table = FxTable.read(rates_path)
+    period = args.period or table.latest_period
+
+    rule_engine.configure(args.workbook)
+    cache = None if args.no_cache else currency_cache(args.workbook)
+    start = time.perf_counter()
+    columns, currencies, conversion = convert_ledger(args.workbook, table, period, cache)
+    elapsed = time.perf_counter() - start
+    if cache is not None:
+        cache.save()
+
+    costs = np.nan_to_num(np.asarray(columns.cost, dtype=np.float64))
+    currencies = np.asarray(currencies, dtype=object)
+    print("| Currency | Rows | Amount | USD |")
+    print("|---|---|---|---|")
+    for currency in sorted(set(currencies.tolist()) - {UNRESOLVED}):
+        rows = currencies == currency
+        print(f"| {currency} | {int(rows.sum())} | {costs[rows].sum():,.2f} | {np.nansum(conversion.usd[rows]):,.2f} |")
+
+    unresolved = conversion.unresolved
+    flagged = {}
+    for name, currency in zip(columns.name[unresolved].tolist(), currencies[unresolved].tolist()):
+        flagged.setdefault(name, currency)
+    if flagged:
+        print(f"\n{len(flagged)} vendors not converted:")
+        for name, currency in sorted(flagged.items()):
+            print(f"  {name}: " + (f"no {currency} rate on or before {period}" if currency else "currency unknown"))
+    print(f"\nConverted {int((~unresolved).sum())} of {len(unresolved)} rows to USD in {elapsed * 1000:.0f} ms")
+
+    if args.write:
+        changed = write_converted(args.workbook, columns.row.tolist(), conversion.usd)
+        print(f"Updated {changed} '{CONVERTED_HEADER}' cells")
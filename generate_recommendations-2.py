@@ -1,195 +1,203 @@
 #!/usr/bin/env python3
-from openpyxl import load_workbook
-
-# Load the workbook
-wb = load_workbook('/home/user/Vendor-Analysis-Assessment/Vendor Analysis Assessment - Deeba.xlsx')
-ws = wb.active
-
-# Vendor descriptions dictionary (imported from generate_descriptions.py)
-VENDOR_DESCRIPTIONS = {
-    'salesforce uk ltd-uk': 'Cloud-based CRM and sales automation platform',
-    'navan (tripactions inc)': 'Corporate travel and expense management platform',
-    'bdo llp': 'Accounting, audit, and advisory services firm',
-    'tog uk properties limited': 'Office space and coworking facilities provider',
-    'cloudcrossing bvba': 'Cloud infrastructure and IT services provider',
-    'amazon web services llc': 'Cloud computing infrastructure and platform services',
-    'infosys': 'IT consulting and software development services',
-    'linkedin ireland limited': 'Professional networking and recruitment platform',
-    'hubspot ireland limited': 'Marketing automation and CRM software platform',
-    'google ireland limited': 'Online advertising, cloud services, and workspace tools',
-    'workato, inc.': 'Integration and workflow automation platform',
-    'microsoft ireland operations limited': 'Enterprise software and cloud computing services',
-    'atlassian pty ltd': 'Collaboration and software development tools',
-    'figma, inc.': 'Collaborative design and prototyping platform',
-    'adobe systems software': 'Creative software and digital marketing tools',
-    'docusign': 'Electronic signature and document management platform',
-    'smartsheet inc.': 'Work management and collaboration platform',
-    'trello': 'Project management and collaboration software',
-    'slack technologies limited': 'Team collaboration and messaging platform',
-    'zapier inc.': 'Workflow automation and app integration platform',
-    # Add more key vendors as needed
-}
+import rule_engine
+from instrumentation import instrumented
+from ledger_reader import DEFAULT_WORKBOOK, read_vendors
+from result_cache import ResultCache, cached, rules_fingerprint
+from vendor_descriptions import VENDOR_DESCRIPTIONS, lookup_description
+from vendor_names import map_unique, normalize_name
+
+# Generic descriptions by name keyword, checked in order. Every rule set in
+# this script can be replaced from the Config sheet (see rule_engine)
+GENERIC_DESCRIPTION_MATCHER = rule_engine.register('suggestion_generic_description', [
+    ('Hotel accommodation and hospitality services', ['hotel', 'resort']),
+    ('Catering and food services provider', ['catering', 'kitchen']),
+    ('Restaurant and dining services', ['restaurant', 'cafe', 'bar']),
+    ('Legal services and law firm', ['law', 'legal', 'solicitor']),
+    ('Recruitment and staffing services', ['recruitment', 'staffing']),
+    ('Insurance and risk management services', ['insurance']),
+    ('Accounting and financial services', ['accounting', 'accountant']),
+    ('Coworking and office space provider', ['coworking', 'office space', 'wework']),
+    ('Event planning and management services', ['event']),
+    ('Parking facility management services', ['parking']),
+    ('Fitness and recreation services', ['gym', 'fitness', 'sports club']),
+    ('Telecommunications services provider', ['telecom', 'telekom', 'mobile']),
+    ('Cloud infrastructure and services', ['cloud']),
+    ('Business consulting and advisory services', ['consulting', 'advisory']),
+])
+
+# The vendors this script's description keywords were written against.  Only
+# these get a specific description from the shared index before the generic
+# fallback: the rest of the index would feed its descriptions into
+# get_recommendation's keyword checks and move recommendations
+DESCRIBED_VENDORS = frozenset(normalize_name(name) for name in [
+    'salesforce uk ltd-uk', 'navan (tripactions inc)', 'bdo llp', 'tog uk properties limited',
+    'cloudcrossing bvba', 'amazon web services llc', 'infosys', 'linkedin ireland limited',
+    'hubspot ireland limited', 'google ireland limited', 'workato, inc.',
+    'microsoft ireland operations limited', 'atlassian pty ltd', 'figma, inc.', 'adobe systems software',
+    'docusign', 'smartsheet inc.', 'trello', 'slack technologies limited', 'zapier inc.',
+])
 
 def get_vendor_description(vendor_name):
     """Get description for a vendor (using lowercase matching)"""
-    vendor_lower = vendor_name.lower()
+    vendor_lower = normalize_name(vendor_name)
 
-    # Try exact match first
-    if vendor_lower in VENDOR_DESCRIPTIONS:
-        return VENDOR_DESCRIPTIONS[vendor_lower]
+    # Try the shared description index first
+    if vendor_lower in DESCRIBED_VENDORS:
+        description = lookup_description(vendor_name)
+        if description is not None:
+            return description
 
     # Generate generic description based on vendor name
-    if 'hotel' in vendor_lower or 'resort' in vendor_lower:
-        return 'Hotel accommodation and hospitality services'
-    elif 'catering' in vendor_lower or 'kitchen' in vendor_lower:
-        return 'Catering and food services provider'
-    elif 'restaurant' in vendor_lower or 'cafe' in vendor_lower or 'bar' in vendor_lower:
-        return 'Restaurant and dining services'
-    elif 'law' in vendor_lower or 'legal' in vendor_lower or 'solicitor' in vendor_lower:
-        return 'Legal services and law firm'
-    elif 'recruitment' in vendor_lower or 'staffing' in vendor_lower:
-        return 'Recruitment and staffing services'
-    elif 'insurance' in vendor_lower:
-        return 'Insurance and risk management services'
-    elif 'accounting' in vendor_lower or 'accountant' in vendor_lower:
-        return 'Accounting and financial services'
-    elif 'coworking' in vendor_lower or 'office space' in vendor_lower or 'wework' in vendor_lower:
-        return 'Coworking and office space provider'
-    elif 'event' in vendor_lower:
-        return 'Event planning and management services'
-    elif 'parking' in vendor_lower:
-        return 'Parking facility management services'
-    elif 'gym' in vendor_lower or 'fitness' in vendor_lower or 'sports club' in vendor_lower:
-        return 'Fitness and recreation services'
-    elif 'telecom' in vendor_lower or 'telekom' in vendor_lower or 'mobile' in vendor_lower:
-        return 'Telecommunications services provider'
-    elif 'cloud' in vendor_lower:
-        return 'Cloud infrastructure and services'
-    elif 'consulting' in vendor_lower or 'advisory' in vendor_lower:
-        return 'Business consulting and advisory services'
-    else:
-        return 'Business services provider'
-
+    return GENERIC_DESCRIPTION_MATCHER.first(vendor_lower, 'Business services provider')
+
+# TERMINATE — Non-essential, discretionary, or easily replaced services
+TERMINATE_INDICATORS = [
+    # Individual contractors
+    'individual contractor', 'john smith', 'susan lee', 'george anchor',
+    'fabiola thistlewhaite', 'stipe piric', 'ansar madovic',
+    # Non-essential retail/gifts
+    'pink ribbon shop', 'regency hampers', 'cupcake central', 'the plant man',
+    # Entertainment (non-core)
+    'djs for u', 'paint & fun', 'paint&wine', 'lajnap comedy', 'escape art',
+    # Recreation/dining (discretionary)
+    'gym', 'fitness center', 'sports club', 'recreation club', 'wine retail',
+    'istra wine', 'vivat fina vina', 'notino s.r.o.', 'freepik company',
+    'magic mountain saloon', 'pepe\'s italian', 'friends sports club',
+    'chamiers recreation', 'p s recreation', 'the cycle gap',
+]
+
+# Description keywords that also mean TERMINATE
+TERMINATE_DESC_KEYWORDS = [
+    'individual contractor', 'gym membership', 'recreation club',
+    'sports club', 'wine retail', 'entertainment booking',
+    'creative workshop', 'escape room'
+]
+
+# CONSOLIDATE — Overlapping services, discretionary travel/events, duplicate tools
+CONSOLIDATE_DESC_KEYWORDS = [
+    # Travel & hospitality (use corporate travel platform instead)
+    'hotel', 'resort', 'accommodation', 'hospitality',
+    # Food services (consolidate to fewer providers)
+    'catering', 'restaurant', 'dining', 'food services', 'meal services',
+    # Events (consolidate event vendors)
+    'event planning', 'event management', 'conference',
+    # Parking (consolidate to fewer providers)
+    'parking', 'garage management',
+    # Office space (consolidate to primary provider)
+    'coworking', 'office space', 'workspace', 'flexible office',
+    # Overlapping SaaS/cloud tools
+    'saas', 'platform', 'software as a service',
+    # Professional services with multiple vendors
+    'consulting', 'advisory services', 'recruitment', 'staffing',
+    'legal services', 'law firm', 'accounting services',
+    # Insurance (consolidate policies)
+    'insurance', 'risk management',
+    # Telecom (consolidate providers)
+    'telecommunications', 'mobile services', 'internet services',
+    # Marketing tools (many overlapping)
+    'marketing automation', 'sales intelligence', 'digital marketing',
+]
+
+# OPTIMIZE — Core strategic platforms and essential services
+OPTIMIZE_INDICATORS = [
+    # Major strategic platforms (keep but negotiate)
+    'salesforce', 'aws', 'amazon web services', 'microsoft', 'google ireland',
+    'hubspot', 'linkedin', 'workato', 'atlassian', 'figma', 'adobe',
+    'docusign', 'smartsheet', 'trello', 'slack', 'zapier',
+    # Critical professional services (Big 4, etc.)
+    'bdo llp', 'grant thornton', 'pricewaterhousecoopers', 'rsm uk corporate',
+    'houlihan lokey', 'crowe horwath',
+    # Core IT/Engineering
+    'infosys', 'jetbrains', 'ariba', 'kimble', 'pluralsight',
+    # Essential infrastructure
+    'dhl', 'fedex', 'british telecommunications',
+    # Primary providers
+    'navan (tripactions inc)', 'navan, inc', 'cbre limited', 'jones lang lasalle',
+    'benefit systems', 'mercer limited', 'pluxee india', 'sodexo', 'granttree limited',
+    'lastpass', 'solarwinds', 'uptime robot', 'papertrail',
+]
+
+OPTIMIZE_DESC_KEYWORDS = [
+    'cloud computing infrastructure', 'crm and sales automation',
+    'enterprise software', 'workflow automation', 'collaboration and software development',
+    'it consulting', 'audit, tax, and consulting', 'investment banking',
+    'logistics and international shipping', 'r&d tax credits',
+    'password management', 'it management and monitoring',
+]
+
+# Name and description are each scanned once; get_recommendation applies the
+# original interleaved order on the results
+VENDOR_INDICATOR_MATCHER = rule_engine.register('suggestion_vendor', [
+    ('Terminate', TERMINATE_INDICATORS),
+    ('Optimize', OPTIMIZE_INDICATORS),
+])
+DESCRIPTION_KEYWORD_MATCHER = rule_engine.register('suggestion_description', [
+    ('Terminate', TERMINATE_DESC_KEYWORDS),
+    ('Consolidate', CONSOLIDATE_DESC_KEYWORDS),
+    ('Optimize', OPTIMIZE_DESC_KEYWORDS),
+])
+
+# Croatian local business markers and the description words that tip them
+LOCAL_BUSINESS_MATCHER = rule_engine.register('suggestion_local_business', [
+    ('local', ['d.o.o.', 'j.d.o.o.', 'obrt']),
+])
+LOCAL_BUSINESS_TYPE_MATCHER = rule_engine.register('suggestion_local_type', [
+    ('Consolidate', ['restaurant', 'bar', 'cafe', 'catering', 'food']),
+    ('Consolidate', ['retail', 'grocery', 'shop']),
+])
+
+@instrumented('suggestion', default='Consolidate')
 def get_recommendation(vendor_name, description):
     """Generate recommendation based on vendor name AND description"""
-    vendor_lower = vendor_name.lower()
+    vendor_lower = normalize_name(vendor_name)
     desc_lower = description.lower()
 
+    vendor_match = VENDOR_INDICATOR_MATCHER.first(vendor_lower)
+    desc_match = DESCRIPTION_KEYWORD_MATCHER.first(desc_lower)
+
     # TERMINATE — Non-essential, discretionary, or easily replaced services
-    terminate_indicators = [
-        # Individual contractors
-        'individual contractor', 'john smith', 'susan lee', 'george anchor',
-        'fabiola thistlewhaite', 'stipe piric', 'ansar madovic',
-        # Non-essential retail/gifts
-        'pink ribbon shop', 'regency hampers', 'cupcake central', 'the plant man',
-        # Entertainment (non-core)
-        'djs for u', 'paint & fun', 'paint&wine', 'lajnap comedy', 'escape art',
-        # Recreation/dining (discretionary)
-        'gym', 'fitness center', 'sports club', 'recreation club', 'wine retail',
-        'istra wine', 'vivat fina vina', 'notino s.r.o.', 'freepik company',
-        'magic mountain saloon', 'pepe\'s italian', 'friends sports club',
-        'chamiers recreation', 'p s recreation', 'the cycle gap',
-    ]
-
-    # Check description for terminate keywords
-    terminate_desc_keywords = [
-        'individual contractor', 'gym membership', 'recreation club',
-        'sports club', 'wine retail', 'entertainment booking',
-        'creative workshop', 'escape room'
-    ]
-
-    for keyword in terminate_indicators:
-        if keyword in vendor_lower:
-            return 'Terminate'
-
-    for keyword in terminate_desc_keywords:
-        if keyword in desc_lower:
-            return 'Terminate'
-
-    # CONSOLIDATE — Overlapping services, discretionary travel/events, duplicate tools
-    consolidate_desc_keywords = [
-        # Travel & hospitality (use corporate travel platform instead)
-        'hotel', 'resort', 'accommodation', 'hospitality',
-        # Food services (consolidate to fewer providers)
-        'catering', 'restaurant', 'dining', 'food services', 'meal services',
-        # Events (consolidate event vendors)
-        'event planning', 'event management', 'conference',
-        # Parking (consolidate to fewer providers)
-        'parking', 'garage management',
-        # Office space (consolidate to primary provider)
-        'coworking', 'office space', 'workspace', 'flexible office',
-        # Overlapping SaaS/cloud tools
-        'saas', 'platform', 'software as a service',
-        # Professional services with multiple vendors
-        'consulting', 'advisory services', 'recruitment', 'staffing',
-        'legal services', 'law firm', 'accounting services',
-        # Insurance (consolidate policies)
-        'insurance', 'risk management',
-        # Telecom (consolidate providers)
-        'telecommunications', 'mobile services', 'internet services',
-        # Marketing tools (many overlapping)
-        'marketing automation', 'sales intelligence', 'digital marketing',
-    ]
-
-    for keyword in consolidate_desc_keywords:
-        if keyword in desc_lower:
-            return 'Consolidate'
+    if vendor_match == 'Terminate':
+        return 'Terminate'
+
+    # Description terminate keywords, then CONSOLIDATE — overlapping services,
+    # discretionary travel/events, duplicate tools
+    if desc_match in ('Terminate', 'Consolidate'):
+        return desc_match
 
     # OPTIMIZE — Core strategic platforms and essential services
-    optimize_indicators = [
-        # Major strategic platforms (keep but negotiate)
-        'salesforce', 'aws', 'amazon web services', 'microsoft', 'google ireland',
-        'hubspot', 'linkedin', 'workato', 'atlassian', 'figma', 'adobe',
-        'docusign', 'smartsheet', 'trello', 'slack', 'zapier',
-        # Critical professional services (Big 4, etc.)
-        'bdo llp', 'grant thornton', 'pricewaterhousecoopers', 'rsm uk corporate',
-        'houlihan lokey', 'crowe horwath',
-        # Core IT/Engineering
-        'infosys', 'jetbrains', 'ariba', 'kimble', 'pluralsight',
-        # Essential infrastructure
-        'dhl', 'fedex', 'british telecommunications',
-        # Primary providers
-        'navan (tripactions inc)', 'navan, inc', 'cbre limited', 'jones lang lasalle',
-        'benefit systems', 'mercer limited', 'pluxee india', 'sodexo', 'granttree limited',
-        'lastpass', 'solarwinds', 'uptime robot', 'papertrail',
-    ]
-
-    optimize_desc_keywords = [
-        'cloud computing infrastructure', 'crm and sales automation',
-        'enterprise software', 'workflow automation', 'collaboration and software development',
-        'it consulting', 'audit, tax, and consulting', 'investment banking',
-        'logistics and international shipping', 'r&d tax credits',
-        'password management', 'it management and monitoring',
-    ]
-
-    for keyword in optimize_indicators:
-        if keyword in vendor_lower:
-            return 'Optimize'
-
-    for keyword in optimize_desc_keywords:
-        if keyword in desc_lower:
-            return 'Optimize'
+    if vendor_match == 'Optimize' or desc_match == 'Optimize':
+        return 'Optimize'
 
     # Default logic based on vendor type
-    if any(word in vendor_lower for word in ['d.o.o.', 'j.d.o.o.', 'obrt']):
+    if LOCAL_BUSINESS_MATCHER.first(vendor_lower):
         # Croatian local businesses
-        if any(word in desc_lower for word in ['restaurant', 'bar', 'cafe', 'catering', 'food']):
-            return 'Consolidate'
-        elif any(word in desc_lower for word in ['retail', 'grocery', 'shop']):
-            return 'Consolidate'
-        else:
-            return 'Optimize'
+        return LOCAL_BUSINESS_TYPE_MATCHER.first(desc_lower, 'Optimize')
 
     # Default: Consolidate for most remaining vendors
     return 'Consolidate'
 
-# Print table
-print("| Vendor Name | Recommendation |")
-print("|-------------|----------------|")
+def suggest(vendor_name):
+    """Recommendation for a vendor, using its own description"""
+    return get_recommendation(vendor_name, get_vendor_description(vendor_name))
+
+def suggest_many(vendor_names, cache=None):
+    """Suggestions for a sequence of names, evaluating each distinct vendor once"""
+    return map_unique(cached(suggest, cache), vendor_names)
+
+def suggestion_cache(workbook_path):
+    """Sidecar cache of suggestions made under the current rules"""
+    return ResultCache.for_workbook(workbook_path, 'suggestion', rules_fingerprint(
+        sorted(VENDOR_DESCRIPTIONS.items()), sorted(DESCRIBED_VENDORS), GENERIC_DESCRIPTION_MATCHER.rules,
+        VENDOR_INDICATOR_MATCHER.rules, DESCRIPTION_KEYWORD_MATCHER.rules,
+        LOCAL_BUSINESS_MATCHER.rules, LOCAL_BUSINESS_TYPE_MATCHER.rules))
+
+if __name__ == '__main__':
+    rule_engine.configure(DEFAULT_WORKBOOK)
+
+    # Print table
+    print("| Vendor Name | Recommendation |")
+    print("|-------------|----------------|")
 
-for row in ws.iter_rows(min_row=2, values_only=True):
-    if row[0]:
-        vendor_name = row[0]
-        description = get_vendor_description(vendor_name)
-        recommendation = get_recommendation(vendor_name, description)
+    names = [record.name for record in read_vendors(DEFAULT_WORKBOOK)]
+    for vendor_name, recommendation in zip(names, suggest_many(names)):
         print(f"| {vendor_name} | {recommendation} |")
@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""Opt-in instrumentation of the classifiers.
+
+While a Recorder is active, every classifier decorated with @instrumented
+records, per call: the vendor, the result, the rule set matches (outcome and
+keyword) that were made on the way, the time taken and whether the result
+fell through to the classifier's default.  Keyword hits are also counted per
+rule set.  Results are exported as JSON.
+
+Batch classification (vendor_names.map_unique) evaluates each distinct
+vendor once; it tells the Recorder how many rows that vendor stands for, so
+'calls', results, defaults and keyword hits count ledger rows while
+'evaluations', 'seconds' and 'mean_us' describe the evaluations actually
+run.  A result cache hit skips the evaluation altogether, so the scripts
+turn their caches off while recording.
+
+When no Recorder is active the rule sets run untraced and a decorated
+classifier costs one global lookup on top of the plain call, so the
+decorators stay in place in production.
+
+    with recording('instrumentation.json'):
+        run_pipeline(workbook, output)
+"""
+import json
+import time
+from collections import Counter
+from contextlib import contextmanager
+from functools import wraps
+
+import rule_engine
+
+_recorder = None
+
+
+class Recorder:
+    """Collects per-call traces, keyword hit counts and stage timings"""
+
+    def __init__(self, keep_rows=True):
+        self.keep_rows = keep_rows
+        self.stages = {}
+        self.keyword_hits = {}
+        self.misses = Counter()
+        self.rows = []
+        # Matches made by the stage calls currently on the stack
+        self._calls = []
+        # Ledger rows the current evaluation stands for
+        self._weight = 1
+
+    @contextmanager
+    def weighted(self, rows):
+        """Count the evaluations inside the block once per row of the vendor"""
+        previous, self._weight = self._weight, rows
+        try:
+            yield
+        finally:
+            self._weight = previous
+
+    def rule_hit(self, rule_set, hit):
+        if hit is None:
+            self.misses[rule_set] += self._weight
+            return
+        outcome, keyword = hit
+        self.keyword_hits.setdefault(rule_set, Counter())[(outcome, keyword)] += self._weight
+        if self._calls:
+            self._calls[-1].append((rule_set, outcome, keyword))
+
+    def call(self, stage, default, func, args, kwargs=None):
+        matches = []
+        self._calls.append(matches)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **(kwargs or {}))
+        finally:
+            seconds = time.perf_counter() - start
+            self._calls.pop()
+
+        # A default result that no rule produced means the vendor fell through
+        fell_through = result == default and all(outcome != result for _, outcome, _ in matches)
+        weight = self._weight
+        stats = self.stages.get(stage)
+        if stats is None:
+            stats = self.stages[stage] = {'calls': 0, 'evaluations': 0, 'seconds': 0.0, 'defaults': 0,
+                                          'results': Counter()}
+        stats['calls'] += weight
+        stats['evaluations'] += 1
+        stats['seconds'] += seconds
+        stats['defaults'] += fell_through * weight
+        stats['results'][result] += weight
+
+        if self.keep_rows:
+            self.rows.append({
+                'stage': stage,
+                'vendor': str(args[0] if args else next(iter((kwargs or {}).values()), '')),
+                'ledger_rows': weight,
+                'result': result,
+                'default': fell_through,
+                'matches': [list(match) for match in matches],
+                'seconds': round(seconds, 7),
+            })
+        return result
+
+    def to_dict(self):
+        keywords = {}
+        for rule_set, counts in sorted(self.keyword_hits.items()):
+            by_outcome = keywords[rule_set] = {}
+            for (outcome, keyword), count in counts.most_common():
+                by_outcome.setdefault(outcome, {})[keyword] = count
+        return {
+            'stages': {
+                stage: {
+                    'calls': stats['calls'],
+                    'evaluations': stats['evaluations'],
+                    'seconds': round(stats['seconds'], 6),
+                    'mean_us': round(stats['seconds'] / stats['evaluations'] * 1e6, 2),
+                    'defaults': stats['defaults'],
+                    'default_rate': round(stats['defaults'] / stats['calls'], 4),
+                    'results': dict(stats['results'].most_common()),
+                }
+                for stage, stats in self.stages.items()
+            },
+            'keyword_hits': keywords,
+            'rule_set_misses': dict(sorted(self.misses.items())),
+            'rows': self.rows if self.keep_rows else None,
+        }
+
+    def save(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.to_dict(), f, ensure_ascii=False, indent=1)
+
+
+def instrumented(stage, default):
+    """Record calls of a classifier whose fall-through result is default"""
+    def decorate(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _recorder is None:
+                return func(*args, **kwargs)
+            return _recorder.call(stage, default, func, args, kwargs)
+        return wrapper
+    return decorate
+
+
+def active():
+    return _recorder
+
+
+def enable(keep_rows=True):
+    """Start recording into a new Recorder and return it"""
+    global _recorder
+    _recorder = Recorder(keep_rows)
+    rule_engine.trace(_recorder)
+    return _recorder
+
+
+def disable():
+    """Stop recording and return the Recorder that was active"""
+    global _recorder
+    recorder, _recorder = _recorder, None
+    rule_engine.trace(None)
+    return recorder
+
+
+@contextmanager
+def recording(path=None, keep_rows=True):
+    """Record for the duration of the block, then save to path (if given)"""
+    recorder = enable(keep_rows)
+    try:
+        yield recorder
+    finally:
+        disable()
+        if path:
+            recorder.save(path)
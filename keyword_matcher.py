@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Compiled multi-keyword matcher shared by the classification scripts.
+
+The scripts used to test every keyword with ``keyword in vendor_lower``, list
+after list.  KeywordMatcher compiles an ordered rule set into an Aho-Corasick
+automaton once, finds every keyword hit in a single pass over the name and
+then applies the same first-list-wins priority the chained checks had.
+
+Substrings match far too much on vendor names ('ey' in "Journey", 'bar' in
+"Lombard"), so the name classifiers use TokenMatcher, which matches whole
+words and phrases instead.
+"""
+import re
+
+_NO_MATCH = float('inf')
+
+
+class KeywordMatcher:
+    """Match text against an ordered list of (label, keywords) rules.
+
+    Rules are checked in the order given and, inside a rule, keywords are
+    checked in list order - exactly like a chain of ``for keyword in ...``
+    loops that return on the first hit.
+    """
+
+    def __init__(self, rules):
+        self.rules = [(label, tuple(keywords)) for label, keywords in rules]
+
+        # Every (label, keyword) pair gets a rank; a lower rank wins
+        self._entries = []
+        goto = [{}]
+        outputs = [[]]
+
+        for label, keywords in self.rules:
+            for keyword in keywords:
+                rank = len(self._entries)
+                self._entries.append((label, keyword))
+
+                state = 0
+                for ch in keyword:
+                    next_state = goto[state].get(ch)
+                    if next_state is None:
+                        next_state = len(goto)
+                        goto[state][ch] = next_state
+                        goto.append({})
+                        outputs.append([])
+                    state = next_state
+                outputs[state].append(rank)
+
+        # Breadth-first pass: fold failure links into a full transition table
+        # so scanning never backtracks, and merge each state's outputs with
+        # those of its failure state
+        delta = [None] * len(goto)
+        delta[0] = dict(goto[0])
+        fail = [0] * len(goto)
+        outputs[0] = ()
+        queue = list(goto[0].values())
+        head = 0
+        while head < len(queue):
+            state = queue[head]
+            head += 1
+            outputs[state] = tuple(outputs[state]) + outputs[fail[state]]
+            transitions = dict(delta[fail[state]])
+            transitions.update(goto[state])
+            delta[state] = transitions
+            for ch, child in goto[state].items():
+                fail[child] = delta[fail[state]].get(ch, 0)
+                queue.append(child)
+
+        self._delta = delta
+        self._outputs = outputs
+        self._best = [min(ranks) if ranks else _NO_MATCH for ranks in outputs]
+
+    def _best_rank(self, text):
+        delta = self._delta
+        best = self._best
+        state = 0
+        found = _NO_MATCH
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if best[state] < found:
+                found = best[state]
+                if found == 0:
+                    break
+        return found
+
+    def _ranks(self, text):
+        delta = self._delta
+        outputs = self._outputs
+        state = 0
+        ranks = set()
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                ranks.update(outputs[state])
+        return sorted(ranks)
+
+    def match(self, text):
+        """Return (label, keyword) of the winning rule, or None"""
+        rank = self._best_rank(text)
+        if rank == _NO_MATCH:
+            return None
+        return self._entries[rank]
+
+    def first(self, text, default=None):
+        """Return the label of the winning rule, or default"""
+        rank = self._best_rank(text)
+        if rank == _NO_MATCH:
+            return default
+        return self._entries[rank][0]
+
+    def labels(self, text):
+        """Return the set of labels with at least one keyword in text"""
+        return {self._entries[rank][0] for rank in self._ranks(text)}
+
+    def hits(self, text):
+        """Return every (label, keyword) found in text, in rule order"""
+        return [self._entries[rank] for rank in self._ranks(text)]
+
+
+
+_TOKEN = re.compile(r'[^\W_]+')
+
+# Marks a keyword whose last word may continue ('hotel*' also matches "Hoteli")
+PREFIX_MARK = '*'
+
+
+class _Node:
+    __slots__ = ('children', 'ranks', 'stems', 'stem_key', 'stem_buckets')
+
+    def __init__(self):
+        self.children = {}
+        self.ranks = []
+        # Prefix keywords ending here: {stem: ranks}, bucketed by their first
+        # stem_key characters so a word costs one lookup
+        self.stems = {}
+        self.stem_key = 0
+        self.stem_buckets = {}
+
+
+class TokenMatcher:
+    """Match whole words and phrases against an ordered list of (label, keywords) rules.
+
+    Same interface and first-list-wins priority as KeywordMatcher, but a
+    keyword only matches as a run of whole words, each also in its plural with 's':
+    'ey' matches "EY LLP" and not "Journey", 'tour' matches "Tours" and not
+    "Tourism".  A keyword ending in '*' lets its last word continue, so
+    'hotel*' matches "Hoteli" and "Hotelbeds".
+
+    Text is split into words once.  Each keyword is a path of words in a
+    trie, so a one-word keyword costs a single dict lookup per word of the
+    name and phrases such as 'amazon web services' only walk on when their
+    first word is there.
+    """
+
+    def __init__(self, rules):
+        self.rules = [(label, tuple(keywords)) for label, keywords in rules]
+
+        self._entries = []
+        self._root = _Node()
+        for label, keywords in self.rules:
+            for keyword in keywords:
+                rank = len(self._entries)
+                self._entries.append((label, keyword))
+                words = _TOKEN.findall(keyword)
+                if not words:
+                    continue
+                node = self._root
+                for word in words[:-1]:
+                    node = node.children.setdefault(word, _Node())
+                if keyword.rstrip().endswith(PREFIX_MARK):
+                    node.stems.setdefault(words[-1], []).append(rank)
+                else:
+                    node = node.children.setdefault(words[-1], _Node())
+                    node.ranks.append(rank)
+
+        pending = [self._root]
+        while pending:
+            node = pending.pop()
+            pending.extend(node.children.values())
+            # 'hotel' also matches "hotels", unless 'hotels' is a keyword word itself
+            for word, child in list(node.children.items()):
+                if not word.endswith('s'):
+                    node.children.setdefault(word + 's', child)
+            if node.stems:
+                node.stem_key = min(len(stem) for stem in node.stems)
+                for stem, ranks in node.stems.items():
+                    node.stem_buckets.setdefault(stem[:node.stem_key], []).append((stem, ranks))
+
+    def _scan(self, text, best_only):
+        """Ranks of the keywords found in text: the best one only, or all of them"""
+        words = _TOKEN.findall(text)
+        root = self._root
+        found = []
+        best = _NO_MATCH
+        for start, word in enumerate(words):
+            node = root
+            position = start
+            while True:
+                if node.stem_key:
+                    for stem, ranks in node.stem_buckets.get(word[:node.stem_key], ()):
+                        if word.startswith(stem):
+                            found.append(ranks)
+                node = node.children.get(word)
+                if node is None:
+                    break
+                if node.ranks:
+                    found.append(node.ranks)
+                position += 1
+                if position == len(words) or not (node.children or node.stems):
+                    break
+                word = words[position]
+            if best_only and found:
+                # Ranks are appended in rule order, so each list's first is its best
+                best = min(best, min(ranks[0] for ranks in found))
+                found.clear()
+        return best if best_only else found
+
+    def _best_rank(self, text):
+        return self._scan(text, True)
+
+    def _ranks(self, text):
+        ranks = set()
+        for found in self._scan(text, False):
+            ranks.update(found)
+        return sorted(ranks)
+
+    match = KeywordMatcher.match
+    first = KeywordMatcher.first
+    labels = KeywordMatcher.labels
+    hits = KeywordMatcher.hits
@@ -0,0 +1,269 @@
+#!/usr/bin/env python3
+"""Columnar on-disk cache of the parsed vendor ledger.
+
+Parsing the sheet XML is the largest fixed cost of every run.
+The first read of a workbook stores the parsed vendor table next to it, in a
+<workbook>.ledger directory of .npy arrays, and later runs memory-map those
+arrays instead of parsing.  Text columns are stored as int32 codes into a
+table of distinct values (-1 for blank); cost is float64 with NaN for blank.
+The arrays are written, and read back by cached_vendors(), a chunk of rows
+at a time, so a cold cache keeps read_vendors() streaming in flat memory.
+
+The cache is keyed by the workbook's mtime, size and SHA-256.  When mtime and
+size are unchanged the arrays are used as they are; otherwise the content is
+hashed, and only a workbook whose content really changed is parsed again.
+
+Usage:
+    python ledger_cache.py [WORKBOOK]    # build (or verify) the cache and time both paths
+"""
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+from itertools import zip_longest
+
+import numpy as np
+
+from ledger_reader import DEFAULT_WORKBOOK, VendorRecord, parse_vendors
+
+LEDGER_SUFFIX = '.ledger'
+
+# Bump when the stored layout or the parse changes so old caches are rebuilt
+# (2: parsed by the streaming xlsx_reader)
+LEDGER_CACHE_VERSION = 2
+
+# Rows encoded, and decoded again, per chunk
+CHUNK_ROWS = 16384
+
+TEXT_FIELDS = ('name', 'department', 'recommendation')
+
+LedgerColumns = namedtuple('LedgerColumns', ['row', 'name', 'department', 'cost', 'recommendation'])
+
+
+def ledger_path_for(workbook_path, sheet=None):
+    root, _ = os.path.splitext(workbook_path)
+    return root + (f'.{sheet}' if sheet else '') + LEDGER_SUFFIX
+
+
+def file_digest(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class _Encoder:
+    """int32 codes into a table of distinct values, assigned across chunks; None becomes -1"""
+
+    def __init__(self):
+        self.index = {}
+
+    def encode(self, values):
+        index = self.index
+        codes = np.empty(len(values), dtype=np.int32)
+        for i, value in enumerate(values):
+            if value is None or value == '':
+                codes[i] = -1
+            else:
+                codes[i] = index.setdefault(str(value), len(index))
+        return codes
+
+    def values(self):
+        return np.array(list(self.index), dtype=str)
+
+
+def _decode(codes, uniques):
+    """Object array of strings (None for -1) from codes and their value table"""
+    table = np.append(uniques.astype(object), None)
+    return table[codes]
+
+
+def _chunks(iterable, size=CHUNK_ROWS):
+    chunk = []
+    for item in iterable:
+        chunk.append(item)
+        if len(chunk) == size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _save_raw(raw_path, npy_path, dtype):
+    """Turn a file of raw dtype values into an .npy file, copying through memory maps"""
+    count = os.path.getsize(raw_path) // np.dtype(dtype).itemsize
+    out = np.lib.format.open_memmap(npy_path, mode='w+', dtype=dtype, shape=(count,))
+    if count:
+        source = np.memmap(raw_path, dtype=dtype, mode='r')
+        for start in range(0, count, CHUNK_ROWS):
+            out[start:start + CHUNK_ROWS] = source[start:start + CHUNK_ROWS]
+        del source
+    out.flush()
+    del out
+    os.remove(raw_path)
+
+
+def _write(directory, records, meta):
+    """Store records (any iterable) as columns, CHUNK_ROWS at a time; meta gains the row count"""
+    os.makedirs(os.path.dirname(os.path.abspath(directory)), exist_ok=True)
+    staging = tempfile.mkdtemp(dir=os.path.dirname(os.path.abspath(directory)), suffix='.tmp')
+    try:
+        # Columns are appended to raw files chunk by chunk, so memory stays
+        # flat however long the ledger is; only the distinct values are held
+        dtypes = {'row': np.int64, 'cost': np.float64, **{f'{field}.codes': np.int32 for field in TEXT_FIELDS}}
+        raw = {column: open(os.path.join(staging, f'{column}.raw'), 'wb') for column in dtypes}
+        encoders = {field: _Encoder() for field in TEXT_FIELDS}
+        rows = 0
+        try:
+            for chunk in _chunks(records):
+                rows += len(chunk)
+                raw['row'].write(np.array([r.row for r in chunk], dtype=np.int64).tobytes())
+                raw['cost'].write(np.array([np.nan if r.cost is None else r.cost for r in chunk],
+                                           dtype=np.float64).tobytes())
+                for field, encoder in encoders.items():
+                    raw[f'{field}.codes'].write(encoder.encode([getattr(r, field) for r in chunk]).tobytes())
+        finally:
+            for f in raw.values():
+                f.close()
+        for column, dtype in dtypes.items():
+            _save_raw(os.path.join(staging, f'{column}.raw'), os.path.join(staging, f'{column}.npy'), dtype)
+        for field, encoder in encoders.items():
+            np.save(os.path.join(staging, f'{field}.values.npy'), encoder.values())
+        meta['rows'] = rows
+        # Metadata goes in last: a directory without it is never trusted
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        if os.path.exists(directory):
+            retired = directory + '.old'
+            shutil.rmtree(retired, ignore_errors=True)
+            os.replace(directory, retired)
+            os.replace(staging, directory)
+            shutil.rmtree(retired, ignore_errors=True)
+        else:
+            os.replace(staging, directory)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _read_meta(directory):
+    try:
+        with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _load(directory):
+    def array(name):
+        return np.load(os.path.join(directory, name), mmap_mode='r')
+
+    columns = {'row': array('row.npy'), 'cost': array('cost.npy')}
+    for field in TEXT_FIELDS:
+        columns[field] = (array(f'{field}.codes.npy'), np.load(os.path.join(directory, f'{field}.values.npy')))
+    return columns
+
+
+def _current(workbook_path, directory):
+    """Return the cache metadata if it still describes the workbook, else None"""
+    meta = _read_meta(directory)
+    if meta is None or meta.get('version') != LEDGER_CACHE_VERSION:
+        return None
+    stat = os.stat(workbook_path)
+    if meta['mtime_ns'] == stat.st_mtime_ns and meta['size'] == stat.st_size:
+        return meta
+    if meta['size'] != stat.st_size or meta['sha256'] != file_digest(workbook_path):
+        return None
+    # Touched but not changed: remember the new mtime so the next run skips the hash
+    meta['mtime_ns'] = stat.st_mtime_ns
+    with open(os.path.join(directory, 'meta.json'), 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def load_encoded(workbook_path=DEFAULT_WORKBOOK, sheet=None):
+    """Columns of the ledger, parsing the workbook only when the cache is stale.
+
+    Returns a dict with 'row' and 'cost' arrays and, for each text field, a
+    (codes, values) pair.  Arrays are read-only memory maps.
+    """
+    directory = ledger_path_for(workbook_path, sheet)
+    if _current(workbook_path, directory) is None:
+        stat = os.stat(workbook_path)
+        _write(directory, parse_vendors(workbook_path, sheet), {
+            'version': LEDGER_CACHE_VERSION,
+            'sheet': sheet,
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'sha256': file_digest(workbook_path),
+        })
+    return _load(directory)
+
+
+def load_columns(workbook_path=DEFAULT_WORKBOOK, sheet=None):
+    """LedgerColumns of the ledger with text decoded to object arrays"""
+    encoded = load_encoded(workbook_path, sheet)
+    return LedgerColumns(
+        row=encoded['row'],
+        name=_decode(*encoded['name']),
+        department=_decode(*encoded['department']),
+        cost=encoded['cost'],
+        recommendation=_decode(*encoded['recommendation']),
+    )
+
+
+def cached_vendors(workbook_path=DEFAULT_WORKBOOK, sheet=None):
+    """Yield VendorRecords from the cache, as ledger_reader.parse_vendors would.
+
+    Columns are decoded CHUNK_ROWS at a time from the memory maps, so
+    memory stays flat however long the ledger is.
+    """
+    encoded = load_encoded(workbook_path, sheet)
+    tables = {field: np.append(encoded[field][1].astype(object), None) for field in TEXT_FIELDS}
+    for start in range(0, len(encoded['row']), CHUNK_ROWS):
+        stop = start + CHUNK_ROWS
+        names, departments, recommendations = (
+            tables[field][encoded[field][0][start:stop]].tolist() for field in TEXT_FIELDS)
+        costs = encoded['cost'][start:stop].tolist()
+        for row, name, department, cost, recommendation in zip(
+                encoded['row'][start:stop].tolist(), names, departments, costs, recommendations):
+            yield VendorRecord(row, name, department, None if cost != cost else cost, recommendation)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build the columnar ledger cache and compare load times')
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--sheet')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    for _ in parse_vendors(args.workbook, args.sheet):
+        pass
+    parse_seconds = time.perf_counter() - start
+
+    load_encoded(args.workbook, args.sheet)
+    start = time.perf_counter()
+    for _ in cached_vendors(args.workbook, args.sheet):
+        pass
+    cache_seconds = time.perf_counter() - start
+
+    sentinel = object()
+    pairs = zip_longest(parse_vendors(args.workbook, args.sheet), cached_vendors(args.workbook, args.sheet),
+                        fillvalue=sentinel)
+    count = 0
+    matches = True
+    for parsed, cached in pairs:
+        count += 1
+        if parsed != cached:
+            matches = False
+            break
+    status = '✓' if matches else '✗ cache differs from the workbook'
+    print(f"{status} {count} vendors cached in {ledger_path_for(args.workbook, args.sheet)}")
+    print(f"  workbook parse: {parse_seconds * 1000:8.1f} ms")
+    print(f"  cache load:     {cache_seconds * 1000:8.1f} ms")
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""Streaming, read-only access to the vendor ledger.
+
+Rows are streamed straight from the sheet XML by xlsx_reader, which skips
+building openpyxl cell and style objects.  Memory stays flat whatever the
+size of the sheet.
+
+read_vendors() goes through ledger_cache, so a workbook is only parsed again
+after it changes.
+"""
+from collections import namedtuple
+
+import xlsx_reader
+
+DEFAULT_WORKBOOK = '/home/user/Vendor-Analysis-Assessment/Vendor Analysis Assessment - Deeba.xlsx'
+
+VENDOR_HEADER = 'Vendor Name'
+DEPARTMENT_HEADER = 'Department'
+COST_HEADER = 'Last 12 months Cost (USD)'
+RECOMMENDATION_HEADER = 'Strategic Recommendation'
+
+# One light record per ledger row; row is the 1-based worksheet row number
+VendorRecord = namedtuple('VendorRecord', ['row', 'name', 'department', 'cost', 'recommendation'])
+
+
+def iter_rows(path=DEFAULT_WORKBOOK, min_row=1, sheet=None):
+    """Yield the raw value tuples of a sheet (the active one by default)"""
+    return xlsx_reader.iter_rows(path, sheet, min_row)
+
+
+def find_columns(header_row):
+    """Map header text to its 0-based column index"""
+    columns = {}
+    for idx, value in enumerate(header_row):
+        if isinstance(value, str) and value.strip() and value.strip() not in columns:
+            columns[value.strip()] = idx
+    return columns
+
+
+def _to_cost(value):
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.replace(',', '').strip())
+        except ValueError:
+            return None
+    return None
+
+
+def parse_vendors(path=DEFAULT_WORKBOOK, sheet=None):
+    """Yield a VendorRecord for every ledger row that has a vendor name"""
+    rows = iter_rows(path, sheet=sheet)
+    header = next(rows, None)
+    if header is None:
+        return
+
+    columns = find_columns(header)
+    if VENDOR_HEADER not in columns:
+        raise ValueError(f"No '{VENDOR_HEADER}' column in {path}")
+
+    name_idx = columns[VENDOR_HEADER]
+    dept_idx = columns.get(DEPARTMENT_HEADER)
+    cost_idx = columns.get(COST_HEADER)
+    rec_idx = columns.get(RECOMMENDATION_HEADER)
+
+    def cell(row, idx):
+        return row[idx] if idx is not None and idx < len(row) else None
+
+    for row_num, row in enumerate(rows, start=2):
+        name = cell(row, name_idx)
+        if not name:
+            continue
+        yield VendorRecord(
+            row_num,
+            str(name),
+            cell(row, dept_idx),
+            _to_cost(cell(row, cost_idx)),
+            cell(row, rec_idx),
+        )
+
+
+def read_vendors(path=DEFAULT_WORKBOOK, sheet=None, use_cache=True):
+    """Like parse_vendors(), served from the columnar ledger cache when it is current"""
+    if not use_cache:
+        return parse_vendors(path, sheet)
+    from ledger_cache import cached_vendors
+    return cached_vendors(path, sheet)
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""Nearest-neighbour fallback for vendors that no keyword rule matches.
+
+When no keyword matches, classify_vendor() falls back to 'G&A' and
+get_strategic_recommendation() to 'Consolidate', which covers a large share
+of every ledger.  The vendors that are labelled in the workbook already tell
+us a lot about the rest: "Hotel Laguna" is labelled, "Hotel Zonar" is not.
+
+NearestLabels indexes the labelled vendors as a sparse TF-IDF matrix of
+character n-grams of their vendor_key() less generic words (as
+vendor_clusters compares names), stored as one posting list per
+n-gram.  Unmatched vendors are vectorised the same way and scored against
+every labelled vendor in batches: each query n-gram adds its weight times
+the posting weights into a (queries x labelled vendors) block with one
+bincount, so thousands of queries cost a few vectorised operations.  The k
+nearest neighbours vote with their cosine similarity; the confidence of an
+assignment is the winning label's share of the vote times its best
+neighbour's similarity.
+
+Labels that are themselves a rule's fall-through default (a vendor no
+keyword matches, labelled 'G&A') are left out of the index, so the fallback
+does not learn the default it is meant to replace; so are labels a current
+rule contradicts, which older rules wrote.  A vendor is never its own
+neighbour: index entries sharing its vendor_key() are left out of its
+scores, or a stale label in the workbook would come straight back at
+similarity 1.0.  Assignments also need a close best neighbour
+(MIN_SIMILARITY), as a few shared n-grams ("office", "garden") are noise.
+
+Requires numpy.
+
+Usage:
+    python nearest_vendors.py [WORKBOOK] [--field department|recommendation] [--k 5]
+"""
+import argparse
+import math
+import time
+from collections import namedtuple
+
+import numpy as np
+
+from vendor_clusters import cluster_text
+from vendor_names import normalize_name, vendor_key
+
+# Character n-gram lengths indexed
+NGRAM_SIZES = (2, 3, 4)
+
+# Neighbours that vote on each assignment
+DEFAULT_K = 5
+
+# Assignments below this confidence keep the rule's default
+MIN_CONFIDENCE = 0.4
+
+# ...and so do those whose best neighbour is less similar than this
+MIN_SIMILARITY = 0.65
+
+# Ledger fields the fallback can fill
+FALLBACK_FIELDS = ('department', 'recommendation')
+
+# Query x labelled-vendor scores computed per block
+QUERY_BLOCK_CELLS = 4_000_000
+
+Assignment = namedtuple('Assignment', ['label', 'confidence', 'neighbour', 'similarity'])
+
+
+def _ngrams(name, sizes=NGRAM_SIZES):
+    padded = f' {cluster_text(vendor_key(name))} '
+    return [padded[start:start + size] for size in sizes for start in range(len(padded) - size + 1)]
+
+
+class NearestLabels:
+    """TF-IDF index of labelled vendor names; assigns labels to new names by kNN"""
+
+    def __init__(self, names, labels, sizes=NGRAM_SIZES):
+        self.sizes = sizes
+        self.names = list(names)
+        self.labels = list(labels)
+        # Index entries per vendor key, left out of that vendor's own neighbours
+        self._entries_by_key = {}
+        for entry, name in enumerate(self.names):
+            self._entries_by_key.setdefault(vendor_key(name), []).append(entry)
+        self.label_values = sorted(set(self.labels))
+        self._label_codes = np.array([self.label_values.index(label) for label in self.labels], dtype=np.intp)
+
+        self._vocabulary = {}
+        doc_ids, gram_ids, counts = self._count(self.names, grow=True)
+        documents = len(self.names)
+        df = np.bincount(gram_ids, minlength=len(self._vocabulary))
+        self._idf = np.log((1 + documents) / (1 + df)) + 1
+        # Weight of an n-gram no labelled vendor has: it only lowers similarity
+        self._unseen_idf = math.log(1 + documents) + 1
+        weights = self._normalise(doc_ids, (1 + np.log(counts)) * self._idf[gram_ids], documents)
+
+        # Posting lists: CSC layout, labelled vendors grouped by n-gram
+        order = np.argsort(gram_ids, kind='stable')
+        self._postings_doc = doc_ids[order]
+        self._postings_weight = weights[order]
+        self._postings_start = np.zeros(len(self._vocabulary) + 1, dtype=np.int64)
+        np.cumsum(df, out=self._postings_start[1:])
+
+    def _count(self, names, grow=False):
+        """(row, n-gram id, count) triplets, by row; unseen n-grams get negative ids unless grow"""
+        vocabulary = self._vocabulary
+        grams_by_name = [_ngrams(name, self.sizes) for name in names]
+        grams = [gram for name_grams in grams_by_name for gram in name_grams]
+        if grow:
+            ids = [vocabulary.setdefault(gram, len(vocabulary)) for gram in grams]
+        else:
+            # Distinct negative ids keep unseen n-grams apart for the norm
+            unseen = {}
+            ids = [vocabulary.get(gram) for gram in grams]
+            ids = [gram_id if gram_id is not None else unseen.setdefault(gram, -1 - len(unseen))
+                   for gram_id, gram in zip(ids, grams)]
+
+        rows = np.repeat(np.arange(len(names), dtype=np.int64), [len(g) for g in grams_by_name])
+        ids = np.array(ids, dtype=np.int64)
+        offset = -ids.min() if len(ids) and ids.min() < 0 else 0
+        span = offset + len(vocabulary) + 1
+        pairs, counts = np.unique(rows * span + ids + offset, return_counts=True)
+        return pairs // span, pairs % span - offset, counts.astype(np.float64)
+
+    @staticmethod
+    def _normalise(rows, weights, size):
+        norms = np.sqrt(np.bincount(rows, weights=weights * weights, minlength=size))
+        return weights / np.where(norms > 0, norms, 1)[rows]
+
+    def _vectorise(self, names):
+        """Sparse TF-IDF rows of names, as (row, n-gram id, weight) over known n-grams"""
+        rows, grams, counts = self._count(names)
+        seen = grams >= 0
+        idf = np.where(seen, self._idf[np.where(seen, grams, 0)], self._unseen_idf)
+        weights = self._normalise(rows, (1 + np.log(counts)) * idf, len(names))
+        return rows[seen], grams[seen], weights[seen]
+
+    def nearest(self, names, k=DEFAULT_K):
+        """(indices, similarities): the k most similar labelled vendors per name, best first.
+
+        Labelled vendors with the name's own vendor_key() are never among
+        its neighbours; slots left without a neighbour have similarity 0.
+        """
+        # Each distinct name is scored once
+        codes = {}
+        rows_of_names = np.array([codes.setdefault(name, len(codes)) for name in names], dtype=np.intp)
+        indices, similarities = self._nearest_distinct(list(codes), k)
+        return indices[rows_of_names], similarities[rows_of_names]
+
+    def _nearest_distinct(self, names, k):
+        documents = len(self.names)
+        k = min(k, documents)
+        indices = np.zeros((len(names), k), dtype=np.intp)
+        similarities = np.zeros((len(names), k))
+        if not names or not k:
+            return indices, similarities
+
+        rows, grams, weights = self._vectorise(names)
+        block = max(1, QUERY_BLOCK_CELLS // documents)
+        bounds = np.searchsorted(rows, np.arange(0, len(names) + block, block))
+        for start, lo, hi in zip(range(0, len(names), block), bounds[:-1], bounds[1:]):
+            size = min(block, len(names) - start)
+            block_rows, block_grams, block_weights = rows[lo:hi] - start, grams[lo:hi], weights[lo:hi]
+            # Expand each query n-gram into its posting list
+            starts = self._postings_start[block_grams]
+            lengths = self._postings_start[block_grams + 1] - starts
+            entry = np.repeat(starts - np.cumsum(lengths) + lengths, lengths) + np.arange(lengths.sum())
+            scores = np.bincount(
+                np.repeat(block_rows, lengths) * documents + self._postings_doc[entry],
+                weights=np.repeat(block_weights, lengths) * self._postings_weight[entry],
+                minlength=size * documents,
+            ).reshape(size, documents)
+            # Leave-one-out: a vendor's own index entries are not its neighbours
+            own = [(row, entry) for row, name in enumerate(names[start:start + size])
+                   for entry in self._entries_by_key.get(vendor_key(name), ())]
+            if own:
+                own_rows, own_entries = zip(*own)
+                scores[list(own_rows), list(own_entries)] = -1.0
+
+            top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+            top_scores = np.take_along_axis(scores, top, axis=1)
+            order = np.argsort(-top_scores, axis=1, kind='stable')
+            indices[start:start + size] = np.take_along_axis(top, order, axis=1)
+            similarities[start:start + size] = np.maximum(np.take_along_axis(top_scores, order, axis=1), 0.0)
+        return indices, similarities
+
+    def assign(self, names, k=DEFAULT_K):
+        """An Assignment per name (label None when no labelled vendor shares an n-gram)"""
+        indices, similarities = self.nearest(names, k)
+        votes = np.zeros((len(indices), len(self.label_values)))
+        np.add.at(votes, (np.arange(len(indices))[:, None], self._label_codes[indices]), similarities)
+        totals = votes.sum(axis=1)
+        winners = votes.argmax(axis=1)
+
+        assignments = []
+        for i, winner in enumerate(winners.tolist()):
+            if totals[i] <= 0:
+                assignments.append(Assignment(None, 0.0, None, 0.0))
+                continue
+            # Neighbours are best first, so the first with the winning label is its closest
+            voters = self._label_codes[indices[i]] == winner
+            best = int(np.argmax(voters & (similarities[i] > 0)))
+            share = votes[i, winner] / totals[i]
+            assignments.append(Assignment(
+                self.label_values[winner], float(share * similarities[i, best]),
+                self.names[indices[i, best]], float(similarities[i, best])))
+        return assignments
+
+
+def training_set(names, labels, rule_set, default):
+    """(names, labels) worth learning from: labelled rows the current rules do not contradict.
+
+    A label is kept when a rule matches the vendor and produces it, or when
+    no rule matches and it is not the fall-through default.
+    """
+    kept_names, kept_labels = [], []
+    for name, label in zip(names, labels):
+        if not name or label is None or label == '':
+            continue
+        ruled = rule_set.first(normalize_name(name))
+        if label != ruled if ruled is not None else label == default:
+            continue
+        kept_names.append(name)
+        kept_labels.append(label)
+    return kept_names, kept_labels
+
+
+def reassigns(assignment, default, min_confidence=MIN_CONFIDENCE, min_similarity=MIN_SIMILARITY):
+    """Whether an assignment is confident enough to replace the default label"""
+    return (assignment.label not in (None, default) and assignment.confidence >= min_confidence
+            and assignment.similarity >= min_similarity)
+
+
+def fill_unmatched(names, values, rule_set, index, default, k=DEFAULT_K, min_confidence=MIN_CONFIDENCE,
+                   min_similarity=MIN_SIMILARITY):
+    """values, with each default that no rule produced replaced by a confident kNN label.
+
+    Returns (values, {name: Assignment}) for the vendors that were reassigned.
+    """
+    unmatched = sorted({name for name, value in zip(names, values)
+                        if value == default and rule_set.match(normalize_name(name)) is None})
+    reassigned = {name: assignment for name, assignment in zip(unmatched, index.assign(unmatched, k))
+                  if reassigns(assignment, default, min_confidence, min_similarity)}
+    filled = [reassigned[name].label if name in reassigned else value for name, value in zip(names, values)]
+    return filled, reassigned
+
+
+def fallback_index(workbook_path, field):
+    """NearestLabels over a workbook's 'department' or 'recommendation' labels.
+
+    Returns (index, rule_set, default), or None when the workbook has no
+    usable labels for the field.
+    """
+    from add_strategic_recommendations import STRATEGIC_MATCHER
+    from classify_vendors import DEPARTMENT_MATCHER
+    from ledger_cache import load_columns
+
+    rule_set, default = {
+        'department': (DEPARTMENT_MATCHER, 'G&A'),
+        'recommendation': (STRATEGIC_MATCHER, 'Consolidate'),
+    }[field]
+    columns = load_columns(workbook_path)
+    names, labels = training_set(columns.name.tolist(), getattr(columns, field).tolist(), rule_set, default)
+    if not names:
+        return None
+    return NearestLabels(names, labels), rule_set, default
+
+
+if __name__ == '__main__':
+    import rule_engine
+    from ledger_reader import DEFAULT_WORKBOOK
+
+    parser = argparse.ArgumentParser(description='Label vendors that hit no keyword rule by nearest neighbours')
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--field', choices=FALLBACK_FIELDS, default='department')
+    parser.add_argument('--k', type=int, default=DEFAULT_K)
+    parser.add_argument('--min-confidence', type=float, default=MIN_CONFIDENCE)
+    parser.add_argument('--min-similarity', type=float, default=MIN_SIMILARITY)
+    args = parser.parse_args()
+
+    rule_engine.configure(args.workbook)
+    start = time.perf_counter()
+    fallback = fallback_index(args.workbook, args.field)
+    if fallback is None:
+        raise SystemExit(f"No {args.field} labels to learn from in {args.workbook}")
+    index, rule_set, default = fallback
+    built = time.perf_counter()
+
+    from ledger_reader import read_vendors
+    names = sorted({record.name for record in read_vendors(args.workbook)
+                    if rule_set.match(normalize_name(record.name)) is None})
+    assignments = index.assign(names, args.k)
+    done = time.perf_counter()
+
+    print(f"| Vendor Name | {args.field.title()} | Confidence | Nearest labelled vendor |")
+    print("|---|---|---|---|")
+    for name, assignment in sorted(zip(names, assignments), key=lambda item: -item[1].confidence):
+        assigned = reassigns(assignment, default, args.min_confidence, args.min_similarity)
+        label = assignment.label if assigned else f"{default} (kept)"
+        print(f"| {name} | {label} | {assignment.confidence:.2f} | "
+              f"{assignment.neighbour} ({assignment.similarity:.2f}) |")
+    confident = sum(reassigns(a, default, args.min_confidence, args.min_similarity) for a in assignments)
+    print(f"\nIndexed {len(index.names)} labelled vendors in {(built - start) * 1000:.0f} ms; "
+          f"assigned {len(names)} unmatched vendors in {(done - built) * 1000:.0f} ms, "
+          f"{confident} given a label other than {default!r} above confidence {args.min_confidence} "
+          f"and similarity {args.min_similarity}")
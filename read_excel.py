@@ -1,10 +1,6 @@
 #!/usr/bin/env python3
-from openpyxl import load_workbook
+from ledger_reader import DEFAULT_WORKBOOK, iter_rows
 
-# Load the workbook
-wb = load_workbook('/home/user/Vendor-Analysis-Assessment/Vendor Analysis Assessment - Deeba.xlsx')
-ws = wb.active
-
-# Print all rows
-for row in ws.iter_rows(values_only=True):
+# Print all rows (streamed from the workbook in read-only mode)
+for row in iter_rows(DEFAULT_WORKBOOK):
     print(row)
@@ -0,0 +1,111 @@
+#!/usr/bin/env python3
+"""Sidecar cache of per-vendor results, persisted next to the workbook.
+
+Entries are keyed by a hash of the normalised vendor name and grouped per
+field (department, description, recommendation).  Each field also records a
+hash of the rule set that produced it; when that hash changes - a keyword
+list was edited - every entry of the field is dropped, so stale results are
+never reused.
+"""
+import hashlib
+import json
+import os
+import tempfile
+from functools import partial
+
+from vendor_names import NORMALIZATION_VERSION, normalize_name
+
+CACHE_SUFFIX = '.cache.json'
+
+
+def rules_fingerprint(*rule_sets):
+    """Hash any mix of (nested) lists, tuples, dicts and strings describing rules"""
+    payload = repr((NORMALIZATION_VERSION,) + rule_sets).encode('utf-8')
+    return hashlib.sha256(payload).hexdigest()
+
+
+def name_hash(vendor_name):
+    """Stable short hash of the canonical vendor name"""
+    return hashlib.blake2b(normalize_name(vendor_name).encode('utf-8'), digest_size=8).hexdigest()
+
+
+def cached(compute, cache):
+    """compute itself, or compute behind cache.get_or_compute() when a cache is given"""
+    return compute if cache is None else partial(cache.get_or_compute, compute=compute)
+
+
+def cache_path_for(workbook_path):
+    root, _ = os.path.splitext(workbook_path)
+    return root + CACHE_SUFFIX
+
+
+def _read(path):
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class ResultCache:
+    """Cached results of one field for one workbook"""
+
+    def __init__(self, path, field, fingerprint):
+        self.path = path
+        self.field = field
+        self.fingerprint = fingerprint
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+
+        section = _read(path).get(field, {})
+        if section.get('rules') == fingerprint:
+            self._results = section.get('results', {})
+        else:
+            # Rules changed (or first run): start this field from scratch
+            self._results = {}
+            self._dirty = bool(section)
+
+    @classmethod
+    def for_workbook(cls, workbook_path, field, fingerprint):
+        return cls(cache_path_for(workbook_path), field, fingerprint)
+
+    def get(self, vendor_name):
+        return self._results.get(name_hash(vendor_name))
+
+    def put(self, vendor_name, value):
+        key = name_hash(vendor_name)
+        if self._results.get(key) != value:
+            self._results[key] = value
+            self._dirty = True
+
+    def get_or_compute(self, vendor_name, compute):
+        """Return the cached value, evaluating compute(vendor_name) only on a miss"""
+        key = name_hash(vendor_name)
+        value = self._results.get(key)
+        if value is None:
+            self.misses += 1
+            value = compute(vendor_name)
+            self._results[key] = value
+            self._dirty = True
+        else:
+            self.hits += 1
+        return value
+
+    def save(self):
+        """Write this field back, keeping the other fields in the file"""
+        if not self._dirty:
+            return
+        data = _read(self.path)
+        data[self.field] = {'rules': self.fingerprint, 'results': self._results}
+
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, sort_keys=True)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        self._dirty = False
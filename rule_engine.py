@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Keyword rule sets that analysts can override without editing code.
+
+Each script registers its built-in keyword lists as a named RuleSet.  Before
+a run, configure(workbook) looks for rule tables in the workbook's "Config"
+sheet and in a sidecar CSV next to it (<workbook>.rules.csv); any rule set
+named there replaces the built-in one for that run.  Tables are compiled once
+into the rule set's matcher (a KeywordMatcher, or a TokenMatcher for rule
+sets matched on whole words), so evaluating a vendor is a single scan.
+
+A rule table has the columns "Rule Set", "Outcome" and "Keyword", plus an
+optional "Priority".  Outcomes are checked in priority order (then in order of
+first appearance) and keywords in row order, matching the first-list-wins
+behaviour of the built-in lists.  The sidecar CSV wins over the Config sheet.
+Rule sets matched on whole words (`show` lists which) take keywords as words
+or phrases; a trailing '*' lets the last word continue ('hotel*').
+
+Usage:
+    python rule_engine.py export rules.csv    # write the built-in rules as a starting table
+    python rule_engine.py show WORKBOOK       # list the rule sets active for a workbook
+"""
+import csv
+import os
+import sys
+
+from keyword_matcher import KeywordMatcher, TokenMatcher
+from vendor_names import fold_diacritics
+from xlsx_reader import iter_rows, sheet_names
+
+CONFIG_SHEET = 'Config'
+RULES_SUFFIX = '.rules.csv'
+
+RULE_SET_HEADER = 'Rule Set'
+OUTCOME_HEADER = 'Outcome'
+KEYWORD_HEADER = 'Keyword'
+PRIORITY_HEADER = 'Priority'
+
+
+class RuleSet:
+    """A named, replaceable KeywordMatcher (or TokenMatcher)"""
+
+    def __init__(self, name, rules, matcher_class=KeywordMatcher):
+        self.name = name
+        self.matcher_class = matcher_class
+        self._default = matcher_class(rules)
+        self.matcher = self._default
+
+    @property
+    def rules(self):
+        return self.matcher.rules
+
+    @property
+    def is_default(self):
+        return self.matcher is self._default
+
+    def load(self, rules):
+        rules = [(label, tuple(keywords)) for label, keywords in rules]
+        if rules != self.matcher.rules:
+            self.matcher = self.matcher_class(rules)
+
+    def reset(self):
+        self.matcher = self._default
+
+    def trace(self, recorder):
+        """Report every match() / first() result to recorder.rule_hit(); None stops tracing.
+
+        Tracing replaces the two methods on this instance only, so untraced
+        rule sets run the plain methods with no extra work.
+        """
+        self.__dict__.pop('match', None)
+        self.__dict__.pop('first', None)
+        if recorder is None:
+            return
+
+        def match(text):
+            hit = self.matcher.match(text)
+            recorder.rule_hit(self.name, hit)
+            return hit
+
+        def first(text, default=None):
+            hit = match(text)
+            return hit[0] if hit else default
+
+        self.match = match
+        self.first = first
+
+    def match(self, text):
+        return self.matcher.match(text)
+
+    def first(self, text, default=None):
+        return self.matcher.first(text, default)
+
+    def labels(self, text):
+        return self.matcher.labels(text)
+
+    def hits(self, text):
+        return self.matcher.hits(text)
+
+
+_REGISTRY = {}
+_RECORDER = None
+
+
+def register(name, rules, matcher_class=KeywordMatcher):
+    """Register built-in rules under name and return the live RuleSet.
+
+    matcher_class is KeywordMatcher for substring keywords or TokenMatcher
+    for whole-word keywords; tables that override the rule set use the same.
+    """
+    if name in _REGISTRY:
+        raise ValueError(f"Rule set '{name}' is already registered")
+    rule_set = _REGISTRY[name] = RuleSet(name, rules, matcher_class)
+    if _RECORDER is not None:
+        rule_set.trace(_RECORDER)
+    return rule_set
+
+
+def trace(recorder):
+    """Trace every registered (and later registered) rule set; None stops tracing"""
+    global _RECORDER
+    _RECORDER = recorder
+    for rule_set in _REGISTRY.values():
+        rule_set.trace(recorder)
+
+
+def rule_sets():
+    return dict(_REGISTRY)
+
+
+def compile_table(rows):
+    """Group (rule_set, outcome, keyword, priority) rows into ordered rules per rule set"""
+    tables = {}
+    for position, (rule_set, outcome, keyword, priority) in enumerate(rows):
+        groups = tables.setdefault(rule_set, {})
+        key = (priority, outcome)
+        if key not in groups:
+            groups[key] = (position, [])
+        groups[key][1].append(keyword)
+
+    compiled = {}
+    for rule_set, groups in tables.items():
+        ordered = sorted(groups.items(), key=lambda item: (item[0][0], item[1][0]))
+        compiled[rule_set] = [(outcome, keywords) for (_, outcome), (_, keywords) in ordered]
+    return compiled
+
+
+def _table_rows(rows):
+    """Yield table rows from an iterable of value tuples that contains a header row"""
+    columns = None
+    for values in rows:
+        texts = [str(v).strip() if v is not None else '' for v in values]
+        if columns is None:
+            if RULE_SET_HEADER in texts and OUTCOME_HEADER in texts and KEYWORD_HEADER in texts:
+                columns = {text: idx for idx, text in enumerate(texts) if text}
+            continue
+
+        def value(header):
+            idx = columns.get(header)
+            return values[idx] if idx is not None and idx < len(values) else None
+
+        rule_set, outcome, keyword = value(RULE_SET_HEADER), value(OUTCOME_HEADER), value(KEYWORD_HEADER)
+        if not rule_set and not outcome and not keyword:
+            continue
+        if not (rule_set and outcome and keyword):
+            raise ValueError(f"Incomplete rule row: {values!r}")
+        priority = value(PRIORITY_HEADER)
+        # Keywords are matched against canonical names, so fold them the same
+        # way; surrounding spaces are significant to substring rule sets (e.g. 'grad ')
+        yield (str(rule_set).strip(), str(outcome).strip(), fold_diacritics(str(keyword).lower()),
+               float(priority) if priority not in (None, '') else 0.0)
+
+
+def read_config_sheet(workbook_path):
+    """Rule tables from the workbook's Config sheet ({} when it has none)"""
+    if CONFIG_SHEET not in sheet_names(workbook_path):
+        return {}
+    return compile_table(_table_rows(iter_rows(workbook_path, CONFIG_SHEET)))
+
+
+def read_rules_csv(path):
+    """Rule tables from a CSV file"""
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        return compile_table(_table_rows(csv.reader(f)))
+
+
+def rules_path_for(workbook_path):
+    root, _ = os.path.splitext(workbook_path)
+    return root + RULES_SUFFIX
+
+
+def load_tables(workbook_path):
+    """Config-sheet tables overlaid with the sidecar CSV, if present"""
+    tables = read_config_sheet(workbook_path) if os.path.exists(workbook_path) else {}
+    sidecar = rules_path_for(workbook_path)
+    if os.path.exists(sidecar):
+        tables.update(read_rules_csv(sidecar))
+    return tables
+
+
+def configure(workbook_path):
+    """Activate the rules for a workbook: built-ins, overridden by its tables.
+
+    Tables for rule sets that no loaded script registered are ignored, since
+    one rules file serves every script.  Returns the names of the registered
+    rule sets that were overridden.
+    """
+    tables = load_tables(workbook_path)
+    overridden = []
+    for name, rule_set in _REGISTRY.items():
+        if name in tables:
+            rule_set.load(tables[name])
+            overridden.append(name)
+        else:
+            rule_set.reset()
+    return overridden
+
+
+def export_rules(path, names=None):
+    """Write registered rule sets as a CSV table analysts can edit"""
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow([RULE_SET_HEADER, PRIORITY_HEADER, OUTCOME_HEADER, KEYWORD_HEADER])
+        for name, rule_set in _REGISTRY.items():
+            if names and name not in names:
+                continue
+            for priority, (outcome, keywords) in enumerate(rule_set.rules):
+                for keyword in keywords:
+                    writer.writerow([name, priority, outcome, keyword])
+
+
+def _load_all_scripts():
+    # Importing the scripts registers their built-in rule sets
+    import importlib
+    import add_strategic_recommendations  # noqa: F401
+    import classify_vendors  # noqa: F401
+    import fx_rates  # noqa: F401
+    import generate_recommendations  # noqa: F401
+    importlib.import_module('generate_recommendations-2')
+
+
+def main(argv):
+    if len(argv) != 2 or argv[0] not in ('export', 'show'):
+        print(__doc__.split('Usage:')[1])
+        return 2
+
+    _load_all_scripts()
+    command, target = argv
+    if command == 'export':
+        export_rules(target)
+        print(f"✓ Wrote {len(_REGISTRY)} rule sets to {target}")
+    else:
+        overridden = configure(target)
+        for name, rule_set in _REGISTRY.items():
+            source = 'workbook' if name in overridden else 'built-in'
+            keywords = sum(len(keywords) for _, keywords in rule_set.rules)
+            matching = 'words' if rule_set.matcher_class is TokenMatcher else 'substrings'
+            print(f"  {name:<28} {source:<9} {matching:<10} {len(rule_set.rules)} outcomes, {keywords} keywords")
+    return 0
+
+
+if __name__ == '__main__':
+    # The scripts register into the importable module, not into __main__
+    import rule_engine
+    sys.exit(rule_engine.main(sys.argv[1:]))
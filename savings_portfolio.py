@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+"""Savings portfolio for the "Top 3 Opportunities" sheet.
+
+Every vendor in the classified ledger is one candidate action - its
+Strategic Recommendation (Terminate, Consolidate or Optimize) - worth its
+12-month spend times a savings rate for its department and action.  Acting
+on a vendor also costs disruption points (renegotiating a contract is less
+work than migrating users off a tool), and the portfolio is the set of
+actions with the largest total savings whose points fit a disruption
+budget.
+
+That is a 0/1 knapsack, but the weights come from a handful of per-action
+point values, and vendors of equal weight only compete on savings:
+an optimal portfolio always takes the best k of each weight.  The solver
+therefore runs the knapsack DP over weight classes rather than vendors,
+adding a class's best-k prefix sums to the budget array one k at a time, so
+100k vendors cost a few hundred vectorised operations and the result is
+exact.  That is O(budget^2 / weight) work, so above DP_MAX_BUDGET points
+the solver takes vendors greedily by savings per point instead, which is
+at most one vendor's savings short of the optimum; a budget covering every
+candidate simply takes them all.
+
+The chosen actions are grouped by (department, action) into opportunities;
+the largest fill the Opportunity, Explanation and Estimated Annual Savings
+columns of the "Top 3 Opportunities" sheet, patched into the workbook's XML
+like the recommendation column (see xlsx_patch).
+
+Requires numpy and pandas.
+
+Usage:
+    python savings_portfolio.py [WORKBOOK] [--budget 40] [--top 3] [--rate Marketing:Optimize=0.2] [--dry-run]
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import rule_engine
+import xlsx_reader
+from ledger_reader import DEFAULT_WORKBOOK, find_columns
+from spend_analytics import RECOMMENDATIONS, SAVINGS_RATES, load_ledger
+
+OPPORTUNITIES_SHEET = 'Top 3 Opportunities'
+OPPORTUNITY_HEADER = 'Opportunity'
+EXPLANATION_HEADER = 'Explanation'
+SAVINGS_HEADER = 'Estimated Annual Savings (USD)'
+
+# Savings rate per (department, action) where it differs from SAVINGS_RATES
+DEPARTMENT_SAVINGS_RATES = {
+    ('Engineering', 'Optimize'): 0.20,
+    ('Marketing', 'Consolidate'): 0.30,
+    ('Legal', 'Consolidate'): 0.15,
+    ('Finance', 'Consolidate'): 0.15,
+}
+
+# Disruption points of acting on one vendor: cancelling a non-critical
+# service is quick, renegotiating takes a contract cycle, consolidating
+# moves users and data to another vendor
+DISRUPTION_POINTS = {'Terminate': 1, 'Optimize': 2, 'Consolidate': 3}
+
+DEFAULT_BUDGET = 40
+
+# Largest budget solved exactly; the DP takes about half a second at this
+# budget for 100k vendors and grows with its square
+DP_MAX_BUDGET = 10000
+
+# Opportunities written to the sheet
+DEFAULT_TOP = 3
+
+# Vendors named in an opportunity's explanation
+NAMED_VENDORS = 3
+
+ACTION_TITLES = {
+    'Terminate': 'Vendor Termination',
+    'Consolidate': 'Vendor Consolidation',
+    'Optimize': 'Contract Optimization',
+}
+ACTION_VERBS = {
+    'Terminate': 'Terminate',
+    'Consolidate': 'Consolidate',
+    'Optimize': 'Renegotiate or right-size',
+}
+
+Opportunity = namedtuple('Opportunity', ['department', 'action', 'vendors', 'spend', 'savings', 'disruption'])
+Portfolio = namedtuple('Portfolio', ['opportunities', 'savings', 'disruption', 'budget', 'candidates'])
+
+
+def choose(values, weights, budget=None):
+    """Boolean mask of the items with the largest total value whose weights fit budget.
+
+    weights are non-negative integers; items without positive value are
+    never chosen, and budget None chooses every one that has.  Budgets above
+    DP_MAX_BUDGET are filled greedily (see choose_greedy).
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.int64)
+    chosen = values > 0
+    if budget is None or weights[chosen].sum() <= budget:
+        return chosen
+    if budget > DP_MAX_BUDGET:
+        return choose_greedy(values, weights, budget)
+    candidates = np.flatnonzero(chosen)
+    chosen[:] = False
+    chosen[candidates[weights[candidates] == 0]] = True
+
+    # Per weight class: its best members by value and their prefix sums
+    classes = []
+    for weight in np.unique(weights[candidates]).tolist():
+        if weight == 0 or weight > budget:
+            continue
+        members = candidates[weights[candidates] == weight]
+        members = members[np.argsort(-values[members], kind='stable')][:budget // weight]
+        classes.append((weight, members, np.r_[0.0, np.cumsum(values[members])]))
+
+    # best[b]: the largest value of weight at most b from the classes so far;
+    # take[b]: how many of the current class that value uses
+    best = np.zeros(budget + 1)
+    takes = []
+    for weight, members, prefix in classes:
+        extended = best.copy()
+        take = np.zeros(budget + 1, dtype=np.intp)
+        for k in range(1, len(members) + 1):
+            shift = k * weight
+            candidate = best[:budget + 1 - shift] + prefix[k]
+            better = candidate > extended[shift:]
+            extended[shift:][better] = candidate[better]
+            take[shift:][better] = k
+        best = extended
+        takes.append(take)
+
+    remaining = budget
+    for (weight, members, _), take in zip(reversed(classes), reversed(takes)):
+        k = int(take[remaining])
+        chosen[members[:k]] = True
+        remaining -= k * weight
+    return chosen
+
+
+def choose_greedy(values, weights, budget):
+    """Like choose(), taking items by value per unit of weight while they fit.
+
+    The items taken before the first one that does not fit are the start
+    of the fractional (LP) optimum, so the total is at most that item's
+    value short of the best portfolio.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    weights = np.asarray(weights, dtype=np.int64)
+    chosen = values > 0
+    candidates = np.flatnonzero(chosen)
+    chosen[:] = False
+    # Zero-weight items come first: their ratio is infinite
+    with np.errstate(divide='ignore'):
+        ratio = values[candidates] / weights[candidates]
+    candidates = candidates[np.argsort(-ratio, kind='stable')]
+    fits = np.cumsum(weights[candidates]) <= budget
+    taken = candidates[fits] if fits.all() else candidates[:np.argmin(fits)]
+    chosen[taken] = True
+    remaining = budget - int(weights[taken].sum())
+    # The first item that does not fit leaves room for lighter ones after it
+    for item in candidates[len(taken):][weights[candidates[len(taken):]] <= remaining].tolist():
+        if weights[item] <= remaining:
+            chosen[item] = True
+            remaining -= int(weights[item])
+            if remaining == 0:
+                break
+    return chosen
+
+
+def rate_table(departments, actions=RECOMMENDATIONS, rates=None, base_rates=SAVINGS_RATES):
+    """(departments x actions) array of savings rates; 0 for actions without one"""
+    rates = {**DEPARTMENT_SAVINGS_RATES, **(rates or {})}
+    return np.array([[rates.get((department, action), base_rates.get(action, 0.0)) for action in actions]
+                     for department in departments], dtype=np.float64)
+
+
+def vendor_actions(df):
+    """One row per vendor: its name, total cost, department and recommendation"""
+    codes, names = pd.factorize(df['name'])
+    _, first = np.unique(codes, return_index=True)
+    return pd.DataFrame({
+        'name': names,
+        'cost': np.bincount(codes, weights=df['cost'].to_numpy(), minlength=len(names)),
+        'department': df['department'].iloc[first].reset_index(drop=True),
+        'recommendation': df['recommendation'].iloc[first].reset_index(drop=True),
+    })
+
+
+def optimise(df, budget=DEFAULT_BUDGET, rates=None, points=DISRUPTION_POINTS):
+    """Portfolio of ledger actions with the largest savings within the disruption budget"""
+    vendors = vendor_actions(df)
+    departments = vendors['department'].cat.categories
+    # Labels a Config sheet adds beyond RECOMMENDATIONS have no points and are not acted on
+    actions = list(vendors['recommendation'].cat.categories)
+    department_codes = vendors['department'].cat.codes.to_numpy()
+    action_codes = vendors['recommendation'].cat.codes.to_numpy()
+    action_points = np.array([points.get(action, -1) for action in actions], dtype=np.int64)
+    acted = (department_codes >= 0) & (action_codes >= 0)
+    acted[acted] = action_points[action_codes[acted]] >= 0
+
+    savings = np.zeros(len(vendors))
+    savings[acted] = (vendors['cost'].to_numpy()[acted]
+                      * rate_table(departments, actions, rates)[department_codes[acted], action_codes[acted]])
+    weights = np.zeros(len(vendors), dtype=np.int64)
+    weights[acted] = action_points[action_codes[acted]]
+    chosen = choose(savings, weights, budget) & acted
+
+    # Group the chosen actions into opportunities, best vendors first
+    picked = np.flatnonzero(chosen)
+    picked = picked[np.argsort(-savings[picked], kind='stable')]
+    groups = department_codes[picked].astype(np.int64) * len(actions) + action_codes[picked]
+    opportunities = []
+    for group in pd.unique(groups):
+        members = picked[groups == group]
+        opportunities.append(Opportunity(
+            department=departments[group // len(actions)],
+            action=actions[group % len(actions)],
+            vendors=vendors['name'].to_numpy()[members].tolist(),
+            spend=float(vendors['cost'].to_numpy()[members].sum()),
+            savings=float(savings[members].sum()),
+            disruption=int(weights[members].sum()),
+        ))
+    opportunities.sort(key=lambda opportunity: -opportunity.savings)
+    return Portfolio(opportunities, float(savings[chosen].sum()), int(weights[chosen].sum()),
+                     budget, int((savings > 0).sum()))
+
+
+def describe(opportunity, named=NAMED_VENDORS):
+    """(title, explanation) of an opportunity for the sheet"""
+    title = f"{opportunity.department} {ACTION_TITLES[opportunity.action]}"
+    verb, count = ACTION_VERBS[opportunity.action], len(opportunity.vendors)
+    if count == 1:
+        explanation = (f"{verb} {opportunity.vendors[0]}, a {opportunity.department} vendor "
+                       f"with ${opportunity.spend:,.0f} of annual spend.")
+    else:
+        vendors = opportunity.vendors[:named]
+        if count > named:
+            listed = ', '.join(vendors) + ' and others'
+        else:
+            listed = ', '.join(vendors[:-1]) + ' and ' + vendors[-1]
+        explanation = (f"{verb} {count} {opportunity.department} vendors, including {listed}, "
+                       f"with ${opportunity.spend:,.0f} of combined annual spend.")
+    points = opportunity.disruption
+    explanation += (f" Estimated saving of {opportunity.savings / opportunity.spend:.0%} "
+                    f"for {points} disruption point{'s' if points != 1 else ''}.")
+    return title, explanation
+
+
+def _sheet_columns(workbook_path):
+    """1-based (label, opportunity, explanation, savings) columns of the opportunities sheet"""
+    rows = xlsx_reader.iter_rows(workbook_path, sheet=OPPORTUNITIES_SHEET)
+    columns = find_columns(next(rows, ()))
+    rows.close()
+    opportunity, explanation, savings = (columns.get(header, default) + 1 for header, default in (
+        (OPPORTUNITY_HEADER, 1), (EXPLANATION_HEADER, 2), (SAVINGS_HEADER, 3)))
+    # The unheaded column before the opportunity holds the "Opportunity N" labels
+    return opportunity - 1, opportunity, explanation, savings
+
+
+def sheet_cells(opportunities, top=DEFAULT_TOP):
+    """{row: (label, title, explanation, savings)} for the sheet's first top rows below the header"""
+    cells = {}
+    for row in range(2, top + 2):
+        if row - 2 < len(opportunities):
+            opportunity = opportunities[row - 2]
+            cells[row] = (f"Opportunity {row - 1}", *describe(opportunity), int(round(opportunity.savings)))
+        else:
+            cells[row] = (f"Opportunity {row - 1}", None, None, None)
+    return cells
+
+
+def write_opportunities(workbook_path, opportunities, top=DEFAULT_TOP):
+    """Patch the top opportunities into the sheet, keeping its formatting; returns the cells changed"""
+    from xlsx_patch import KEEP_STYLE, patch_column
+
+    columns = _sheet_columns(workbook_path)
+    cells = sheet_cells(opportunities, top)
+    changed = 0
+    for position, column in enumerate(columns):
+        if column < 1:
+            continue
+        changed += patch_column(workbook_path, workbook_path, column,
+                                {row: (values[position], KEEP_STYLE) for row, values in cells.items()},
+                                sheet=OPPORTUNITIES_SHEET)
+    return changed
+
+
+def save_opportunities(workbook_path, opportunities, top=DEFAULT_TOP):
+    """Same as write_opportunities(), through a full openpyxl load and save"""
+    from openpyxl import load_workbook
+
+    columns = _sheet_columns(workbook_path)
+    wb = load_workbook(workbook_path)
+    ws = wb[OPPORTUNITIES_SHEET]
+    changed = 0
+    for row, values in sheet_cells(opportunities, top).items():
+        for column, value in zip(columns, values):
+            if column < 1:
+                continue
+            cell = ws.cell(row=row, column=column)
+            if cell.value != value:
+                cell.value = value
+                changed += 1
+    wb.save(workbook_path)
+    return changed
+
+
+def _parse_rate(text):
+    """'Department:Action=rate' as ((department, action), rate)"""
+    try:
+        key, rate = text.rsplit('=', 1)
+        department, action = key.rsplit(':', 1)
+        rate = float(rate)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected Department:Action=rate, got {text!r}")
+    if action not in RECOMMENDATIONS:
+        raise argparse.ArgumentTypeError(f"action must be one of {', '.join(RECOMMENDATIONS)}, got {action!r}")
+    return (department, action), rate
+
+
+if __name__ == '__main__':
+    from xlsx_patch import PatchError
+
+    parser = argparse.ArgumentParser(
+        description=f"Choose the savings portfolio and fill the '{OPPORTUNITIES_SHEET}' sheet")
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--budget', type=int, default=DEFAULT_BUDGET,
+                        help='disruption points available (Terminate 1, Optimize 2, Consolidate 3 per vendor)')
+    parser.add_argument('--unlimited', action='store_true', help='act on every vendor with savings')
+    parser.add_argument('--top', type=int, default=DEFAULT_TOP, help='opportunities written to the sheet')
+    parser.add_argument('--rate', type=_parse_rate, action='append', default=[], metavar='DEPARTMENT:ACTION=RATE',
+                        help='savings rate for a department and action (repeatable)')
+    parser.add_argument('--dry-run', action='store_true', help='print the portfolio without writing the sheet')
+    parser.add_argument('--full-save', action='store_true',
+                        help='load and re-save the whole workbook instead of patching the sheet')
+    args = parser.parse_args()
+
+    rule_engine.configure(args.workbook)
+    start = time.perf_counter()
+    df = load_ledger(args.workbook)
+    loaded = time.perf_counter()
+    portfolio = optimise(df, None if args.unlimited else args.budget, dict(args.rate))
+    done = time.perf_counter()
+
+    print("| Opportunity | Vendors | Spend (USD) | Savings (USD) | Disruption |")
+    print("|---|---|---|---|---|")
+    for opportunity in portfolio.opportunities:
+        print(f"| {describe(opportunity)[0]} | {len(opportunity.vendors)} | {opportunity.spend:,.0f} | "
+              f"{opportunity.savings:,.0f} | {opportunity.disruption} |")
+    budget = 'unlimited' if portfolio.budget is None else portfolio.budget
+    print(f"\nSavings {portfolio.savings:,.0f} USD for {portfolio.disruption} of {budget} disruption points "
+          f"({sum(len(o.vendors) for o in portfolio.opportunities)} of {portfolio.candidates} candidate vendors)")
+    print(f"Loaded {len(df)} rows in {loaded - start:.2f}s, optimised in {(done - loaded) * 1000:.0f} ms")
+
+    if not args.dry_run:
+        changed = None
+        if not args.full_save:
+            try:
+                changed = write_opportunities(args.workbook, portfolio.opportunities, args.top)
+            except PatchError as e:
+                print(f"Cannot patch the workbook ({e}); saving it in full")
+        if changed is None:
+            changed = save_opportunities(args.workbook, portfolio.opportunities, args.top)
+        print(f"Updated {changed} cells on the '{OPPORTUNITIES_SHEET}' sheet")
@@ -0,0 +1,423 @@
+#!/usr/bin/env python3
+"""Rolling 12-month vendor spend, kept up to date from monthly transaction feeds.
+
+The "Last 12 months Cost (USD)" column is a snapshot.  Instead of rebuilding
+it from every extract each month, each monthly feed is ingested once into a
+persistent store next to the workbook (<workbook>.spend, a directory of .npy
+arrays like the ledger cache) and the column is refreshed from the store.
+
+The store keeps one row per vendor (keyed by normalize_name()) and one
+column per month of the window, in integer cents so that adding and removing
+months is exact.  Columns form a ring indexed by month number mod 12, and a
+running total per vendor is kept beside them.  Ingesting a month newer than
+the window subtracts and clears the months that fall out of it, then adds the
+feed's amounts to its month's column and to the totals: the work grows with
+the feed and the number of vendors, never with the history.  Each feed file
+is recorded by its SHA-256, so ingesting the same extract twice adds nothing;
+rows older than the window are skipped.
+
+A feed is a CSV or XLSX extract with the columns "Vendor Name" and "Amount",
+and optionally "Currency" and "Date" (or "Period", YYYY-MM).  Amounts are
+converted with fx_rates when a rate file is given or found next to the
+workbook (<workbook>.fx.csv); otherwise they are taken as USD.  So are the
+amounts of a feed without a Currency column whose vendors' currency cannot
+be inferred.  Rows that cannot be converted (a stated currency, or one
+without a rate) are left out and their vendors flagged, not added with no
+spend.
+
+Refreshing the workbook needs a store that covers the whole window: until
+a feed has been ingested for each of its months, the totals are partial and
+the refresh is refused.  Once it does, every ledger row gets the store's
+total, 0 for vendors with no spend in the window, except vendors flagged as
+unconverted, whose cells are left as they are.
+
+Usage:
+    python spend_store.py ingest WORKBOOK FEED [FEED ...] [--period 2024-07] [--rates RATES.csv] [--refresh]
+    python spend_store.py refresh WORKBOOK     # write the rolling totals into the vendor sheet
+    python spend_store.py show WORKBOOK [--top 20]
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import tempfile
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+import rule_engine
+import xlsx_reader
+from fx_rates import (BASE_CURRENCY, CURRENCY_HEADER, PERIOD_HEADER, FxTable, currencies_for, currency_cache,
+                      period_key, rates_path_for)
+from ledger_cache import file_digest, load_columns
+from ledger_reader import COST_HEADER, VENDOR_HEADER, _to_cost, find_columns
+from vendor_names import normalize_name
+
+STORE_SUFFIX = '.spend'
+
+# Bump when the stored layout changes so old stores are refused, not misread
+SPEND_STORE_VERSION = 1
+
+WINDOW_MONTHS = 12
+
+AMOUNT_HEADER = 'Amount'
+DATE_HEADER = 'Date'
+
+Feed = namedtuple('Feed', ['names', 'amounts', 'currencies', 'periods'])
+IngestResult = namedtuple('IngestResult', ['rows', 'added', 'unconverted', 'stale', 'periods', 'flagged'])
+
+
+def store_path_for(workbook_path):
+    root, _ = os.path.splitext(workbook_path)
+    return root + STORE_SUFFIX
+
+
+def month_number(period):
+    """Months since year 0 of a 'YYYY-MM' period"""
+    year, month = period.split('-')[:2]
+    return int(year) * 12 + int(month) - 1
+
+
+def period_of(number):
+    return f'{number // 12:04d}-{number % 12 + 1:02d}'
+
+
+def read_feed(path):
+    """Feed of a CSV or XLSX transaction extract; currencies and periods are None when absent"""
+    if path.lower().endswith('.csv'):
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            rows = list(csv.reader(f))
+    else:
+        rows = list(xlsx_reader.iter_rows(path))
+    if not rows:
+        return Feed([], np.empty(0), None, None)
+
+    columns = find_columns(rows[0])
+    if VENDOR_HEADER not in columns or AMOUNT_HEADER not in columns:
+        raise ValueError(f"{path} needs '{VENDOR_HEADER}' and '{AMOUNT_HEADER}' columns")
+    name_idx, amount_idx = columns[VENDOR_HEADER], columns[AMOUNT_HEADER]
+    currency_idx = columns.get(CURRENCY_HEADER)
+    period_idx = columns.get(DATE_HEADER, columns.get(PERIOD_HEADER))
+
+    def cell(row, idx):
+        return row[idx] if idx is not None and idx < len(row) else None
+
+    def period(line, row):
+        try:
+            return period_key(cell(row, period_idx))
+        except ValueError as e:
+            raise ValueError(f"{path}, row {line}: {e}") from None
+
+    body = [(line, row) for line, row in enumerate(rows[1:], start=2) if cell(row, name_idx)]
+    amounts = [_to_cost(cell(row, amount_idx)) for _, row in body]
+    return Feed(
+        names=[str(cell(row, name_idx)) for _, row in body],
+        amounts=np.array([np.nan if amount is None else amount for amount in amounts], dtype=np.float64),
+        currencies=None if currency_idx is None else [cell(row, currency_idx) for _, row in body],
+        periods=None if period_idx is None else [period(line, row) for line, row in body],
+    )
+
+
+class SpendStore:
+    """Per-vendor spend in cents for each month of a rolling window, with running totals"""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.keys = []
+        self.names = []
+        self._index = {}
+        # (WINDOW_MONTHS, vendors): row month % WINDOW_MONTHS holds that month
+        self.cents = np.zeros((WINDOW_MONTHS, 0), dtype=np.int64)
+        self.totals = np.zeros(0, dtype=np.int64)
+        self.latest = None
+        self.feeds = {}
+
+    @classmethod
+    def open(cls, directory):
+        """The store in directory, or an empty one if there is none yet"""
+        store = cls(directory)
+        try:
+            with open(os.path.join(directory, 'meta.json'), encoding='utf-8') as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            return store
+        if meta.get('version') != SPEND_STORE_VERSION:
+            raise ValueError(f"{directory} was written by another version of spend_store")
+        store.keys = np.load(os.path.join(directory, 'keys.npy')).tolist()
+        store.names = np.load(os.path.join(directory, 'names.npy')).tolist()
+        store._index = {key: i for i, key in enumerate(store.keys)}
+        store.cents = np.load(os.path.join(directory, 'cents.npy'))
+        store.totals = np.load(os.path.join(directory, 'totals.npy'))
+        store.latest = None if meta['latest'] is None else month_number(meta['latest'])
+        store.feeds = meta['feeds']
+        return store
+
+    @property
+    def window(self):
+        """(first, last) period of the window, or None while empty"""
+        if self.latest is None:
+            return None
+        return period_of(self.latest - WINDOW_MONTHS + 1), period_of(self.latest)
+
+    def vendor_ids(self, names):
+        """Store row of each name, adding vendors not seen before"""
+        codes, uniques = pd.factorize(np.asarray(names, dtype=object))
+        ids = np.empty(len(uniques), dtype=np.intp)
+        for i, name in enumerate(uniques):
+            key = normalize_name(name)
+            vendor = self._index.get(key)
+            if vendor is None:
+                vendor = self._index[key] = len(self.keys)
+                self.keys.append(key)
+                self.names.append(name)
+            ids[i] = vendor
+        grown = len(self.keys) - len(self.totals)
+        if grown:
+            self.cents = np.hstack([self.cents, np.zeros((WINDOW_MONTHS, grown), dtype=np.int64)])
+            self.totals = np.concatenate([self.totals, np.zeros(grown, dtype=np.int64)])
+        return ids[codes]
+
+    def advance(self, month):
+        """Move the window to end at month, dropping the months that leave it"""
+        if self.latest is not None and month <= self.latest:
+            return
+        if self.latest is None or month - self.latest >= WINDOW_MONTHS:
+            self.cents[:] = 0
+            self.totals[:] = 0
+        else:
+            for leaving in range(self.latest + 1, month + 1):
+                slot = leaving % WINDOW_MONTHS
+                self.totals -= self.cents[slot]
+                self.cents[slot] = 0
+        self.latest = month
+
+    def add(self, ids, months, cents):
+        """Add amounts (cents) to vendors' months; returns the rows older than the window"""
+        if not len(months):
+            return 0
+        self.advance(int(months.max()))
+        current = months > self.latest - WINDOW_MONTHS
+        ids, months, cents = ids[current], months[current], cents[current]
+        np.add.at(self.cents, (months % WINDOW_MONTHS, ids), cents)
+        np.add.at(self.totals, ids, cents)
+        return int((~current).sum())
+
+    def missing_months(self):
+        """Periods of the window that no ingested feed covers (all of them while empty)"""
+        if self.latest is None:
+            return [None] * WINDOW_MONTHS
+        ingested = {month_number(period) for feed in self.feeds.values() for period in feed['periods']}
+        return [period_of(month) for month in range(self.latest - WINDOW_MONTHS + 1, self.latest + 1)
+                if month not in ingested]
+
+    def flagged_keys(self):
+        """normalize_name() keys of vendors with feed rows in the window that could not be converted"""
+        first = -1 if self.latest is None else self.latest - WINDOW_MONTHS + 1
+        return {normalize_name(name) for feed in self.feeds.values()
+                if any(month_number(period) >= first for period in feed['periods'])
+                for name in feed.get('unconverted', ())}
+
+    def vendor(self, name):
+        """Store row of a vendor name, or None if the store has never seen it"""
+        return self._index.get(normalize_name(name))
+
+    def total(self, name):
+        """Rolling total in USD of a vendor name, or None if the store has never seen it"""
+        vendor = self.vendor(name)
+        return None if vendor is None else self.totals[vendor] / 100
+
+    def save(self):
+        """Write the store atomically: a staging directory replaces the old one"""
+        parent = os.path.dirname(os.path.abspath(self.directory))
+        os.makedirs(parent, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=parent, suffix='.tmp')
+        try:
+            np.save(os.path.join(staging, 'keys.npy'), np.array(self.keys, dtype=str))
+            np.save(os.path.join(staging, 'names.npy'), np.array(self.names, dtype=str))
+            np.save(os.path.join(staging, 'cents.npy'), self.cents)
+            np.save(os.path.join(staging, 'totals.npy'), self.totals)
+            # Metadata goes in last: a directory without it is never trusted
+            with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+                json.dump({
+                    'version': SPEND_STORE_VERSION,
+                    'latest': None if self.latest is None else period_of(self.latest),
+                    'feeds': self.feeds,
+                }, f)
+
+            if os.path.exists(self.directory):
+                retired = self.directory + '.old'
+                shutil.rmtree(retired, ignore_errors=True)
+                os.replace(self.directory, retired)
+                os.replace(staging, self.directory)
+                shutil.rmtree(retired, ignore_errors=True)
+            else:
+                os.replace(staging, self.directory)
+        except BaseException:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+
+
+def ingest(store, feed_path, period=None, table=None, cache=None):
+    """Add one feed to the store; returns an IngestResult, or None if it was ingested before.
+
+    period is used for rows without a Date or Period.  With an FxTable,
+    amounts are converted to USD.  When the feed has no Currency column,
+    vendors whose currency cannot be inferred are taken as USD; other rows
+    that cannot be converted are left out, and their vendors are flagged
+    rather than added to the store.
+    """
+    digest = file_digest(feed_path)
+    if digest in store.feeds:
+        return None
+    feed = read_feed(feed_path)
+    periods = feed.periods if feed.periods is not None else [period] * len(feed.names)
+    periods = [row_period or period for row_period in periods]
+
+    amounts = feed.amounts
+    if table is not None:
+        currencies = currencies_for(feed.names, feed.currencies, cache)
+        if feed.currencies is None:
+            currencies = [currency or BASE_CURRENCY for currency in currencies]
+        amounts = table.convert(amounts, currencies, periods).usd
+    period_codes, period_values = pd.factorize(np.asarray(periods, dtype=object))
+    if (period_codes < 0).any():
+        raise ValueError(f"{feed_path} has rows without a Date or Period; give --period")
+    months = np.array([month_number(value) for value in period_values], dtype=np.int64)[period_codes]
+
+    converted = ~np.isnan(amounts)
+    names = np.asarray(feed.names, dtype=object)
+    # Only vendors with converted rows join the store
+    ids = store.vendor_ids(names[converted])
+    cents = np.rint(amounts[converted] * 100).astype(np.int64)
+    stale = store.add(ids, months[converted], cents)
+    flagged = sorted(set(names[~converted].tolist()))
+    store.feeds[digest] = {
+        'file': os.path.basename(feed_path),
+        'rows': len(feed.names),
+        'periods': sorted(set(period_values.tolist())) or ([period] if period else []),
+        'unconverted': flagged,
+        'ingested': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    return IngestResult(len(feed.names), int(converted.sum()) - stale, int((~converted).sum()), stale,
+                        store.feeds[digest]['periods'], flagged)
+
+
+def refresh_workbook(workbook_path, store):
+    """Write the store's rolling totals into the ledger's cost column.
+
+    Raises ValueError unless a feed has been ingested for every month of
+    the window.  Each ledger row gets its vendor's total (a vendor listed
+    twice gets it on its first row and 0 on the others), 0 if the store
+    has no spend for it; rows of vendors flagged as unconverted are left as
+    they are.  Vendors with spend in the window but no row are appended.
+    Returns (cells updated, vendors appended, rows left as they were).
+    """
+    from xlsx_patch import KEEP_STYLE, patch_column
+
+    missing = store.missing_months()
+    if missing:
+        if store.latest is None:
+            raise ValueError("The spend store is empty; ingest the last 12 months of feeds first")
+        raise ValueError(f"The spend store is missing {len(missing)} of the last {WINDOW_MONTHS} months "
+                         f"({', '.join(missing)}); ingest them before refreshing")
+
+    header = list(next(xlsx_reader.iter_rows(workbook_path), ()))
+    columns = find_columns(header)
+    vendor_column = columns.get(VENDOR_HEADER, 0) + 1
+    cost_column = columns.get(COST_HEADER)
+    cells = {}
+    if cost_column is None:
+        cost_column = len(header)
+        cells[1] = (COST_HEADER, None)
+    ledger = load_columns(workbook_path)
+
+    flagged = store.flagged_keys()
+    listed = set()
+    left = 0
+    for row, name in zip(ledger.row.tolist(), ledger.name.tolist()):
+        vendor = store.vendor(name)
+        if normalize_name(name) in flagged:
+            # Partly converted spend would understate the vendor: keep its cell, and its row
+            left += 1
+            if vendor is not None:
+                listed.add(vendor)
+            continue
+        if vendor is None:
+            cells[row] = (0, KEEP_STYLE)
+            continue
+        cells[row] = (0 if vendor in listed else store.totals[vendor].item() / 100, KEEP_STYLE)
+        listed.add(vendor)
+
+    last_row = max(ledger.row.tolist(), default=1)
+    appended = {}
+    for vendor in np.flatnonzero(store.totals).tolist():
+        if vendor not in listed:
+            last_row += 1
+            appended[last_row] = (store.names[vendor], KEEP_STYLE)
+            cells[last_row] = (store.totals[vendor].item() / 100, KEEP_STYLE)
+    if appended:
+        patch_column(workbook_path, workbook_path, vendor_column, appended)
+    return patch_column(workbook_path, workbook_path, cost_column + 1, cells), len(appended), left
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Keep rolling 12-month vendor spend from monthly feeds')
+    parser.add_argument('command', choices=['ingest', 'refresh', 'show'])
+    parser.add_argument('workbook')
+    parser.add_argument('feeds', nargs='*', help='monthly transaction extracts to ingest, oldest first')
+    parser.add_argument('--period', type=period_key, help='YYYY-MM of feed rows without a Date or Period column')
+    parser.add_argument('--rates', help='FX rate CSV for non-USD amounts (default: <workbook>.fx.csv if present)')
+    parser.add_argument('--refresh', action='store_true', help='refresh the vendor sheet after ingesting')
+    parser.add_argument('--top', type=int, default=20, help='vendors listed by show')
+    args = parser.parse_args()
+    if args.command == 'ingest' and not args.feeds:
+        parser.error('ingest needs at least one feed')
+
+    store = SpendStore.open(store_path_for(args.workbook))
+
+    if args.command == 'ingest':
+        rates_path = args.rates or rates_path_for(args.workbook)
+        table = FxTable.read(rates_path) if os.path.exists(rates_path) else None
+        rule_engine.configure(args.workbook)
+        cache = currency_cache(args.workbook) if table is not None else None
+        for feed_path in args.feeds:
+            start = time.perf_counter()
+            result = ingest(store, feed_path, args.period, table, cache)
+            elapsed = time.perf_counter() - start
+            if result is None:
+                print(f"{feed_path}: already ingested, skipped")
+                continue
+            print(f"{feed_path}: {result.added} of {result.rows} rows added for {', '.join(result.periods)} "
+                  f"in {elapsed * 1000:.0f} ms"
+                  + (f"; {result.unconverted} not converted" if result.unconverted else "")
+                  + (f"; {result.stale} older than the window" if result.stale else ""))
+            for name in result.flagged:
+                print(f"  not converted (no currency or FX rate): {name}")
+        store.save()
+        if cache is not None:
+            cache.save()
+
+    if args.command == 'refresh' or args.refresh:
+        start = time.perf_counter()
+        try:
+            updated, appended, left = refresh_workbook(args.workbook, store)
+        except ValueError as e:
+            print(f"Not refreshed: {e}")
+        else:
+            print(f"Refreshed '{COST_HEADER}': {updated} cells updated, {appended} vendors appended "
+                  f"in {(time.perf_counter() - start) * 1000:.0f} ms"
+                  + (f"; {left} rows of unconverted vendors left as they were" if left else ""))
+
+    if store.window is None:
+        print("The spend store is empty")
+    else:
+        first, last = store.window
+        print(f"\n{len(store.keys)} vendors, {first} to {last}: {store.totals.sum() / 100:,.2f} USD")
+        if args.command == 'show':
+            print("| Vendor | Last 12 months (USD) |")
+            print("|---|---|")
+            for vendor in np.argsort(-store.totals, kind='stable')[:args.top].tolist():
+                print(f"| {store.names[vendor]} | {store.totals[vendor] / 100:,.2f} |")
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Near-duplicate vendor clustering for consolidation candidates.
+
+The ledger bills the same or sibling companies under several names ("Navan
+(Tripactions Inc)" and "Navan, Inc", "Acclime Corporate Services" and
+"Acclime Usa, Inc", two "Specijalisticka Ordinacija Medicine Rada ..."
+practices).  Those groups are consolidation candidates whatever the keyword
+rules say about each name.
+
+Names are reduced to vendor_key() and stripped of generic words ("services",
+"international", country names) so the distinctive part drives similarity.
+Each key becomes a set of character shingles and a MinHash signature, and
+locality-sensitive hashing over signature bands proposes candidate pairs, so
+the work grows with the number of names rather than with its square.  Pairs
+whose estimated Jaccard similarity reaches the threshold are joined into
+clusters.
+
+Requires numpy and pandas.
+
+Usage:
+    python vendor_clusters.py [WORKBOOK] [--threshold 0.5] [--top 20]
+"""
+import argparse
+import time
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from ledger_cache import load_columns
+from ledger_reader import DEFAULT_WORKBOOK
+from vendor_names import normalize_name, vendor_key
+
+# Character shingle length
+SHINGLE_SIZE = 3
+
+# MinHash signature length, split into LSH bands of BAND_ROWS rows.  With 32
+# bands of 4 rows, pairs at Jaccard 0.5 become candidates 87% of the time and
+# pairs at 0.6 99% of the time
+NUM_PERM = 128
+BAND_ROWS = 4
+
+# Estimated Jaccard similarity at which two keys are joined
+DEFAULT_THRESHOLD = 0.5
+
+# Words that say what kind of company a vendor is, not which one
+GENERIC_WORDS = frozenset([
+    'services', 'service', 'solutions', 'international', 'global', 'group', 'holdings',
+    'corporate', 'company', 'co', 'and', 'the', 'of', 'retail', 'distribution', 'technologies',
+    'private', 'limited', 'chartered', 'charted', 'accountants', 'catering',
+    'uk', 'usa', 'us', 'amer', 'aus', 'australia', 'europe', 'emea', 'ireland', 'india',
+    'singapore', 'croatia', 'hrvatska', 'germany', 'london', 'zagreb', 'split',
+])
+
+# Largest prime below 2**31: shingle hashes are (a * id + b) mod MERSENNE_PRIME
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Keys hashed per block, bounding the (num_perm x shingles) working array
+SIGNATURE_BLOCK = 4096
+
+Cluster = namedtuple('Cluster', ['vendors', 'rows', 'cost', 'member_costs'])
+
+
+def cluster_text(key):
+    """The part of a vendor key that identifies the vendor"""
+    words = [word for word in key.split() if word not in GENERIC_WORDS]
+    return ' '.join(words) if words else key
+
+
+def _shingle_ids(texts, size=SHINGLE_SIZE):
+    """Flat shingle ids of every text, the offset where each text's ids start and the vocabulary size"""
+    shingles = []
+    counts = np.empty(len(texts), dtype=np.int64)
+    for i, text in enumerate(texts):
+        padded = f' {text} '
+        text_shingles = [padded[start:start + size] for start in range(max(len(padded) - size + 1, 1))]
+        shingles.extend(text_shingles)
+        counts[i] = len(text_shingles)
+    ids, vocabulary = pd.factorize(np.array(shingles, dtype=object))
+    offsets = np.cumsum(counts) - counts
+    return ids.astype(np.uint64), offsets, len(vocabulary)
+
+
+def minhash_signatures(texts, num_perm=NUM_PERM, seed=0):
+    """(len(texts), num_perm) uint32 MinHash signatures of the texts' shingle sets"""
+    ids, offsets, vocabulary_size = _shingle_ids(texts)
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    b = rng.integers(0, MERSENNE_PRIME, num_perm, dtype=np.uint64)
+    # Every distinct shingle is hashed once per permutation: (vocabulary, num_perm)
+    hashed = ((np.arange(vocabulary_size, dtype=np.uint64)[:, None] * a + b) % MERSENNE_PRIME).astype(np.uint32)
+
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    bounds = np.append(offsets, len(ids))
+    for start in range(0, len(texts), SIGNATURE_BLOCK):
+        stop = min(start + SIGNATURE_BLOCK, len(texts))
+        block = hashed[ids[bounds[start]:bounds[stop]]]
+        signatures[start:stop] = np.minimum.reduceat(block, offsets[start:stop] - bounds[start], axis=0)
+    return signatures
+
+
+def candidate_pairs(signatures, band_rows=BAND_ROWS):
+    """Index pairs (i, j), i < j, sharing at least one identical signature band.
+
+    Within a bucket every member is paired with the bucket's first (lowest
+    index) member only, which keeps large buckets linear.
+    """
+    # Bands are bucketed by a 64-bit mix of their rows; a rare collision only
+    # adds a candidate that the similarity check then rejects
+    mix = np.random.default_rng(band_rows).integers(1, 1 << 63, band_rows, dtype=np.uint64) | np.uint64(1)
+    pairs = []
+    for start in range(0, signatures.shape[1] - band_rows + 1, band_rows):
+        buckets = (signatures[:, start:start + band_rows].astype(np.uint64) * mix).sum(axis=1)
+        order = np.argsort(buckets, kind='stable')
+        sorted_buckets = buckets[order]
+        first = np.r_[True, sorted_buckets[1:] != sorted_buckets[:-1]]
+        leaders = order[np.maximum.accumulate(np.where(first, np.arange(len(order)), 0))]
+        shared = ~first
+        pairs.append(np.column_stack([leaders[shared], order[shared]]))
+    if not pairs:
+        return np.empty((0, 2), dtype=np.intp)
+    # Drop pairs found in several bands
+    pairs = np.concatenate(pairs)
+    codes = np.unique(pairs[:, 0].astype(np.int64) * len(signatures) + pairs[:, 1])
+    return np.column_stack([codes // len(signatures), codes % len(signatures)])
+
+
+def cluster_labels(texts, threshold=DEFAULT_THRESHOLD, num_perm=NUM_PERM, band_rows=BAND_ROWS, seed=0):
+    """Cluster id per text: the index of the text at its cluster's centre.
+
+    Texts are taken in order; each joins the first earlier centre whose
+    estimated Jaccard similarity to it reaches threshold, or becomes a
+    centre itself.  Unlike joining every similar pair, this cannot chain
+    "A B" - "B C" - "C D" into one cluster, and the earliest texts (pass
+    the most important first) anchor the clusters.
+    """
+    signatures = minhash_signatures(texts, num_perm, seed)
+    pairs = candidate_pairs(signatures, band_rows)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    pairs = pairs[similarity >= threshold]
+    pairs = pairs[np.lexsort((pairs[:, 0], pairs[:, 1]))]
+
+    labels = list(range(len(texts)))
+    for earlier, later in pairs.tolist():
+        # Pairs come by later text, then earlier: the first centre found wins
+        if labels[later] == later and labels[earlier] == earlier:
+            labels[later] = earlier
+    return np.array(labels, dtype=np.int64)
+
+
+def consolidation_candidates(names, costs, threshold=DEFAULT_THRESHOLD, seed=0):
+    """Clusters of two or more differently spelled vendors, largest combined cost first"""
+    names = np.asarray(names, dtype=object)
+    costs = np.nan_to_num(np.asarray(costs, dtype=np.float64))
+    present = pd.notna(names) & (names != '')
+    names, costs = names[present], costs[present]
+
+    # Spellings that normalise alike are one vendor, shown as first written
+    spelling_codes, spellings = pd.factorize(np.array([normalize_name(name) for name in names], dtype=object))
+    display = pd.Series(names).groupby(spelling_codes).first().to_numpy()
+    spelling_cost = np.bincount(spelling_codes, weights=costs, minlength=len(spellings))
+    spelling_rows = np.bincount(spelling_codes, minlength=len(spellings))
+
+    # Vendors with the same key are one point; the costliest keys become centres
+    key_codes, keys = pd.factorize(np.array([vendor_key(name) for name in display], dtype=object))
+    key_cost = np.bincount(key_codes, weights=spelling_cost, minlength=len(keys))
+    by_cost = np.argsort(-key_cost, kind='stable')
+    centres = cluster_labels([cluster_text(keys[k]) for k in by_cost], threshold, seed=seed)
+    labels = np.empty(len(keys), dtype=np.int64)
+    labels[by_cost] = by_cost[centres]
+    labels = labels[key_codes]
+
+    clusters = []
+    order = np.argsort(labels, kind='stable')
+    starts = np.flatnonzero(np.r_[True, labels[order][1:] != labels[order][:-1]])
+    for members in np.split(order, starts[1:]):
+        if len(members) < 2:
+            continue
+        members = members[np.argsort(-spelling_cost[members], kind='stable')]
+        clusters.append(Cluster(
+            vendors=[display[m] for m in members],
+            rows=int(spelling_rows[members].sum()),
+            cost=float(spelling_cost[members].sum()),
+            member_costs=spelling_cost[members].tolist(),
+        ))
+    clusters.sort(key=lambda cluster: -cluster.cost)
+    return clusters
+
+
+def print_clusters(clusters, top=None):
+    shown = clusters[:top] if top else clusters
+    print(f"{len(clusters)} vendor clusters are consolidation candidates"
+          + (f" (top {len(shown)} by cost):" if len(shown) < len(clusters) else ":"))
+    print("| Cost (USD) | Rows | Vendors |")
+    print("|---|---|---|")
+    for cluster in shown:
+        vendors = '; '.join(f"{vendor} ({cost:,.0f})" for vendor, cost in zip(cluster.vendors, cluster.member_costs))
+        print(f"| {cluster.cost:,.0f} | {cluster.rows} | {vendors} |")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate vendors as consolidation candidates')
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD,
+                        help='estimated Jaccard similarity of name shingles that joins two vendors')
+    parser.add_argument('--top', type=int, help='show only the largest clusters')
+    args = parser.parse_args()
+
+    columns = load_columns(args.workbook)
+    start = time.perf_counter()
+    clusters = consolidation_candidates(columns.name, columns.cost, args.threshold)
+    elapsed = time.perf_counter() - start
+
+    print_clusters(clusters, args.top)
+    print(f"\nClustered {len(columns.name)} rows in {elapsed * 1000:.0f} ms")
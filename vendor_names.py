@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""Vendor name normalisation used by every classifier and lookup.
+
+Names reach us with encoding damage: UTF-8 read as Windows-1252 and then
+title-cased ("Garaå¾A Firule"), and OOXML ``_xHHHH_`` escapes
+("Sveuä_x008d_iliå¡te").  normalize_name() repairs those, folds case and
+diacritics and trims stray whitespace and punctuation, giving the canonical
+form the keyword rules are written against.  It is memoised because the
+same names repeat heavily across a ledger.
+
+The ledger also spells the same company several ways ("Navan, Inc",
+"Navan (Tripactions Inc)").  vendor_key() additionally folds punctuation,
+drops parenthesised notes and strips trailing legal-form suffixes so those
+spellings share one lookup key.
+
+Ledgers repeat the same vendors many times over; map_unique() runs a
+classifier once per distinct canonical name and scatters the results back to
+the rows.
+"""
+import re
+import unicodedata
+from functools import lru_cache
+
+# Distinct names kept by the normalisation cache
+NORMALIZE_CACHE_SIZE = 65536
+
+# Bump when normalize_name() output changes so cached results are rebuilt
+NORMALIZATION_VERSION = 1
+
+_PARENTHESISED = re.compile(r'\([^)]*\)')
+_NON_WORD = re.compile(r'[\W_]+')
+_OOXML_ESCAPE = re.compile(r'_x([0-9A-Fa-f]{4})_')
+_WHITESPACE = re.compile(r'\s+')
+
+# Characters that stand for UTF-8 continuation bytes (0x80-0xBF) once the
+# bytes have been decoded as Windows-1252, or as Latin-1 where 1252 has a gap
+_CONTINUATION = {}
+for _byte in range(0x80, 0xC0):
+    try:
+        _CONTINUATION[bytes([_byte]).decode('cp1252')] = _byte
+    except UnicodeDecodeError:
+        pass
+    _CONTINUATION.setdefault(chr(_byte), _byte)
+del _byte
+
+_MOJIBAKE = re.compile('[\u00c0-\u00ff][%s]{1,3}' % re.escape(''.join(_CONTINUATION)))
+
+# 'Š' is C5 A0; the A0 (no-break space) often arrives as a plain space
+_MOJIBAKE_S_CARON = re.compile('[\u00c5\u00e5] (?=\\w)')
+
+# Letters that carry no combining mark to drop under NFKD
+_LETTER_FOLDS = str.maketrans({
+    'đ': 'd', 'ð': 'd', 'ł': 'l', 'ø': 'o', 'ß': 'ss', 'æ': 'ae', 'œ': 'oe', 'ı': 'i',
+    '\u2018': "'", '\u2019': "'", '\u201c': '"', '\u201d': '"',
+    '\u2013': '-', '\u2014': '-', '\u00a0': ' ',
+})
+
+# Stray punctuation trimmed from the ends; periods and brackets are kept
+# because keywords such as 'd.o.o.' and 'navan (tripactions inc)' need them
+_EDGE_PUNCTUATION = ' ,;:*"\'-_/|'
+
+# Legal-form suffixes as token sequences, after punctuation folding
+# ("d.o.o." becomes "d o o", "a/s" becomes "a s")
+LEGAL_SUFFIXES = [
+    ('j', 'd', 'o', 'o'), ('d', 'o', 'o'), ('d', 'd'), ('s', 'r', 'o'),
+    ('a', 's'), ('p', 'c'), ('pte',), ('pty',), ('pvt',), ('private',),
+    ('ltd',), ('limited',), ('llc',), ('llp',), ('inc',), ('plc',),
+    ('corp',), ('corporation',), ('co',), ('gmbh',), ('ag',), ('oy',),
+    ('bvba',), ('bv',), ('sa',),
+]
+
+# The suffixes ending in each token, in LEGAL_SUFFIXES order
+_SUFFIXES_BY_LAST = {}
+for _suffix in LEGAL_SUFFIXES:
+    _SUFFIXES_BY_LAST.setdefault(_suffix[-1], []).append(_suffix)
+del _suffix
+
+
+def unescape_ooxml(text):
+    """Replace OOXML _xHHHH_ escapes with the characters they encode"""
+    return _OOXML_ESCAPE.sub(lambda m: chr(int(m.group(1), 16)), text)
+
+
+def _repair_sequence(match):
+    text = match.group(0)
+    lead = text[0]
+    # Title-casing may have lowered the lead byte's character (Ä -> ä)
+    lead_bytes = [ord(lead)]
+    if ord(lead.upper()) <= 0xFF and lead.upper() != lead:
+        lead_bytes.append(ord(lead.upper()))
+    for length in range(len(text), 1, -1):
+        tail = bytes(_CONTINUATION[ch] for ch in text[1:length])
+        for lead_byte in lead_bytes:
+            try:
+                return (bytes([lead_byte]) + tail).decode('utf-8') + text[length:]
+            except UnicodeDecodeError:
+                continue
+    return text
+
+
+def repair_mojibake(text):
+    """Undo UTF-8 text that was decoded as Windows-1252 (e.g. 'å¡' -> 'š')"""
+    text = _MOJIBAKE.sub(_repair_sequence, text)
+    return _MOJIBAKE_S_CARON.sub('\u0160', text)
+
+
+def fold_diacritics(text):
+    """Strip accents and map letters like 'đ' to their ASCII base"""
+    if text.isascii() and text.isprintable():
+        return text
+    decomposed = unicodedata.normalize('NFKD', text.translate(_LETTER_FOLDS))
+    return ''.join(ch for ch in decomposed
+                   if not unicodedata.combining(ch) and unicodedata.category(ch) != 'Cc')
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_name(name):
+    """Return the canonical, lowercase form of a vendor name"""
+    text = repair_mojibake(unescape_ooxml(str(name)))
+    text = fold_diacritics(text.lower())
+    return _WHITESPACE.sub(' ', text).strip(_EDGE_PUNCTUATION)
+
+
+def factorize_names(names):
+    """Collapse names that normalise alike.
+
+    Returns (codes, representatives): names[i] normalises like
+    representatives[codes[i]], the first spelling seen of that vendor.
+    """
+    by_spelling = {}
+    by_canonical = {}
+    representatives = []
+    codes = []
+    for name in names:
+        code = by_spelling.get(name)
+        if code is None:
+            canonical = normalize_name(name)
+            code = by_canonical.get(canonical)
+            if code is None:
+                code = by_canonical[canonical] = len(representatives)
+                representatives.append(name)
+            by_spelling[name] = code
+        codes.append(code)
+    return codes, representatives
+
+
+def map_unique(func, names):
+    """[func(name) for name in names], calling func once per distinct vendor.
+
+    Only valid for functions that depend on the name solely through
+    normalize_name(), as every classifier does.
+    """
+    from instrumentation import active
+
+    codes, representatives = factorize_names(names)
+    recorder = active()
+    if recorder is None:
+        results = [func(name) for name in representatives]
+    else:
+        # Traces count each distinct vendor once per row it stands for
+        rows = [0] * len(representatives)
+        for code in codes:
+            rows[code] += 1
+        results = []
+        for name, count in zip(representatives, rows):
+            with recorder.weighted(count):
+                results.append(func(name))
+    return [results[code] for code in codes]
+
+
+def fold_name(name):
+    """Lowercase and collapse punctuation/whitespace runs to single spaces"""
+    return _NON_WORD.sub(' ', name.lower()).strip()
+
+
+def _strip_suffixes(tokens):
+    stripped = True
+    while stripped and len(tokens) > 1:
+        stripped = False
+        for suffix in _SUFFIXES_BY_LAST.get(tokens[-1], ()):
+            n = len(suffix)
+            if len(tokens) > n and tuple(tokens[-n:]) == suffix:
+                tokens = tokens[:-n]
+                stripped = True
+                break
+    return tokens
+
+
+def vendor_key(name):
+    """Return the normalised lookup key for a vendor name"""
+    lowered = normalize_name(name)
+    without_notes = _PARENTHESISED.sub(' ', lowered)
+    tokens = fold_name(without_notes).split()
+    if not tokens:
+        # Names that are only a note, e.g. "(blank)"
+        tokens = fold_name(lowered).split()
+    return ' '.join(_strip_suffixes(tokens))
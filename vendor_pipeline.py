@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""Single-pass pipeline: department, description and recommendations in one run.
+
+Running classify_vendors.py, generate_descriptions.py,
+generate_recommendations-2.py and add_strategic_recommendations.py one after
+another parses the same workbook four times.  This entry point loads the
+ledger once, runs every stage on each vendor record and writes all derived
+columns in a single save.
+
+Usage:
+    python vendor_pipeline.py [WORKBOOK] [--output OUTPUT] [--no-cache] [--instrument JSON]
+    python vendor_pipeline.py [WORKBOOK] --pipelined --output OUTPUT [--workers N] ...
+    python vendor_pipeline.py [WORKBOOK] --fallback ...
+
+--pipelined runs reading, rule evaluation and writing as concurrent stages
+joined by bounded queues (see run_pipelined).  It streams into a new
+workbook that lacks the source's column widths, freeze panes and filters,
+so it needs an --output other than the source.  --fallback gives vendors that
+no department or strategic rule matches the label of their nearest labelled
+neighbours in the workbook, when confident (see nearest_vendors).
+"""
+import argparse
+import contextlib
+import importlib
+import os
+import queue
+import tempfile
+import threading
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from copy import copy
+
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.utils import get_column_letter
+
+import add_strategic_recommendations as strategic
+import classify_vendors
+import generate_descriptions
+import nearest_vendors
+import rule_engine
+import xlsx_reader
+from instrumentation import recording
+from ledger_reader import DEFAULT_WORKBOOK, DEPARTMENT_HEADER, RECOMMENDATION_HEADER, VENDOR_HEADER, find_columns
+from result_cache import cached
+from vendor_names import factorize_names, map_unique
+
+suggestions = importlib.import_module('generate_recommendations-2')
+
+# One stage per derived column: the field name, how to find its column by
+# header, the per-vendor function and the sidecar cache it uses
+Stage = namedtuple('Stage', ['field', 'headers', 'compute', 'cache'])
+
+STAGES = [
+    Stage('department', (DEPARTMENT_HEADER,),
+          classify_vendors.classify_vendor, classify_vendors.department_cache),
+    Stage('description', ('Description', '1-line Description'),
+          generate_descriptions.get_vendor_description, generate_descriptions.description_cache),
+    Stage('suggestion', ('Suggestions',),
+          suggestions.suggest, suggestions.suggestion_cache),
+    Stage('recommendation', (RECOMMENDATION_HEADER,),
+          strategic.get_strategic_recommendation, strategic.recommendation_cache),
+]
+STAGES_BY_FIELD = {stage.field: stage for stage in STAGES}
+
+# Pipelined mode: rows per chunk, and chunks each queue may hold
+PIPELINE_CHUNK_ROWS = 2000
+PIPELINE_QUEUE_CHUNKS = 4
+
+
+def find_stage_column(columns, headers):
+    """0-based index of the first header equal to, or starting with, one of headers"""
+    for header in headers:
+        if header in columns:
+            return columns[header]
+    for header in headers:
+        for text, idx in columns.items():
+            if text.startswith(header):
+                return idx
+    return None
+
+
+def plan_columns(column_headers, stages=STAGES):
+    """Resolve each stage's 0-based output column from the header row.
+
+    Stages without a column are skipped, except the strategic recommendation,
+    whose column is appended.  Returns ([(stage, idx)], appended_idx), where
+    appended_idx is None when no column had to be added.
+    """
+    columns = find_columns(column_headers)
+    plan = []
+    appended = None
+    for stage in stages:
+        idx = find_stage_column(columns, stage.headers)
+        if idx is None:
+            if stage.field != 'recommendation':
+                print(f"No column for {stage.field}; skipping that stage")
+                continue
+            idx = appended = len(column_headers)
+        plan.append((stage, idx))
+    return plan, appended
+
+
+def run_pipeline(source_file, output_file, use_cache=True, stages=STAGES, fallback=False):
+    """Fill every stage's column in one load and one save.
+
+    Returns (per-field counts of cells whose value changed, recommendation
+    counts, whether the workbook was saved); recommendation cells that only
+    needed restyling are reported separately, and an unchanged workbook
+    updated in place is not rewritten.
+
+    With fallback, rule defaults in the nearest_vendors.FALLBACK_FIELDS are
+    replaced by confident nearest-neighbour labels learnt from the workbook.
+    """
+    rule_engine.configure(source_file)
+    wb = load_workbook(source_file)
+    ws = wb.active
+
+    column_headers = [cell.value for cell in ws[1]]
+    vendor_col = find_columns(column_headers).get(VENDOR_HEADER, 0) + 1
+
+    stage_plan, created_idx = plan_columns(column_headers, stages)
+    created = created_idx is not None
+    if created:
+        header_cell = ws.cell(row=1, column=created_idx + 1, value=RECOMMENDATION_HEADER)
+        header_cell.font = strategic.HEADER_FONT
+        header_cell.fill = strategic.HEADER_FILL
+        header_cell.alignment = strategic.HEADER_ALIGNMENT
+        ws.column_dimensions[get_column_letter(created_idx + 1)].width = 25
+
+    stage_columns = []
+    for stage, idx in stage_plan:
+        cache = stage.cache(source_file) if use_cache else None
+        stage_columns.append((stage, idx + 1, cached(stage.compute, cache), cache))
+
+    # Learnt before any cell is overwritten, from the labels the workbook has now
+    fallbacks = {}
+    if fallback:
+        for stage, _ in stage_plan:
+            if stage.field in nearest_vendors.FALLBACK_FIELDS:
+                fallbacks[stage.field] = nearest_vendors.fallback_index(source_file, stage.field)
+
+    style_names = strategic.register_recommendation_styles(wb)
+    changed = {stage.field: 0 for stage, _, _, _ in stage_columns}
+    restyled = 0
+    recommendations_count = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+
+    vendor_rows = [(row[0].row, row[0].value)
+                   for row in ws.iter_rows(min_row=2, min_col=vendor_col, max_col=vendor_col) if row[0].value]
+    names = [vendor_name for _, vendor_name in vendor_rows]
+
+    for stage, col, compute, _ in stage_columns:
+        # Each distinct vendor is evaluated once, then scattered back to its rows
+        values = map_unique(compute, names)
+        if fallbacks.get(stage.field) is not None:
+            index, rule_set, default = fallbacks[stage.field]
+            values, reassigned = nearest_vendors.fill_unmatched(names, values, rule_set, index, default)
+            print(f"{len(reassigned)} vendors without a matching rule given a nearest-neighbour {stage.field}")
+        for (row_num, _), value in zip(vendor_rows, values):
+            cell = ws.cell(row=row_num, column=col)
+            if stage.field == 'recommendation':
+                recommendations_count[value] += 1
+                if cell.value != value:
+                    changed[stage.field] += 1
+                elif cell.style != style_names[value]:
+                    restyled += 1
+                else:
+                    continue
+                cell.value = value
+                cell.style = style_names[value]
+            elif cell.value != value:
+                cell.value = value
+                changed[stage.field] += 1
+
+    if restyled:
+        print(f"{restyled} recommendation cells restyled")
+    saved = bool(created or any(changed.values()) or restyled
+                 or os.path.abspath(output_file) != os.path.abspath(source_file))
+    if saved:
+        wb.save(output_file)
+    for _, _, _, cache in stage_columns:
+        if cache is not None:
+            cache.save()
+    return changed, recommendations_count, saved
+
+
+def _init_worker(source_file):
+    # Workers evaluate rules under the same tables as the parent process
+    rule_engine.configure(source_file)
+
+
+def _evaluate_chunk(names_by_field):
+    """Worker side: {field: [compute(name) for name in names]}"""
+    return {field: [STAGES_BY_FIELD[field].compute(name) for name in names]
+            for field, names in names_by_field.items()}
+
+
+class _Stop:
+    """Queue sentinel; carries the exception that ended the producer, if any"""
+
+    def __init__(self, error=None):
+        self.error = error
+
+
+def _read_sheets(source_file, read_queue, chunk_rows):
+    """Reader thread: ('sheet', title, is_ledger) then ('rows', [row, ...]) messages"""
+    error = None
+    try:
+        src = load_workbook(source_file, read_only=True)
+        try:
+            for src_ws in src.worksheets:
+                read_queue.put(('sheet', src_ws.title, src_ws.title == src.active.title))
+                chunk = []
+                for row in src_ws.iter_rows():
+                    chunk.append(row)
+                    if len(chunk) == chunk_rows:
+                        read_queue.put(('rows', chunk))
+                        chunk = []
+                if chunk:
+                    read_queue.put(('rows', chunk))
+        finally:
+            src.close()
+    except BaseException as exc:
+        error = exc
+    read_queue.put(_Stop(error))
+
+
+def run_pipelined(source_file, output_file, use_cache=True, stages=STAGES, workers=None,
+                  chunk_rows=PIPELINE_CHUNK_ROWS, queue_chunks=PIPELINE_QUEUE_CHUNKS):
+    """Like run_pipeline(), with reading, rule evaluation and writing overlapped.
+
+    A reader thread streams the workbook in chunks of chunk_rows rows; the
+    calling thread collapses each chunk's vendors, looks them up in the
+    sidecar caches and sends the misses to a process pool; a writer thread
+    waits for each chunk's results in submission order and streams the rows
+    into a write-only workbook.  Both queues hold at most queue_chunks
+    chunks, so memory is bounded by chunk size, not ledger size, and the
+    output is in row order whatever order the workers finish in.
+
+    The output is written like add_strategic_recommendations'
+    stream_recommendations(): styles are carried over, column widths and
+    merged cells are not.  It is saved to a temporary file that then
+    replaces output_file, so a failed save leaves output_file as it was.
+    """
+    rule_engine.configure(source_file)
+    header = next(xlsx_reader.iter_rows(source_file), ())
+    vendor_idx = find_columns(header).get(VENDOR_HEADER, 0)
+    stage_plan, appended_idx = plan_columns(list(header), stages)
+    caches = {stage.field: stage.cache(source_file) if use_cache else None for stage, _ in stage_plan}
+
+    changed = {stage.field: 0 for stage, _ in stage_plan}
+    recommendations_count = {'Terminate': 0, 'Consolidate': 0, 'Optimize': 0}
+    read_queue = queue.Queue(maxsize=queue_chunks)
+    write_queue = queue.Queue(maxsize=queue_chunks)
+    out = Workbook(write_only=True)
+    style_names = strategic.register_recommendation_styles(out)
+    writer_errors = []
+
+    def resolve(future, reps, misses):
+        """Per stage, the value of every representative name, from cache or the workers"""
+        computed = future.result()
+        resolved = {}
+        for stage, _ in stage_plan:
+            cache = caches[stage.field]
+            values = dict(zip(misses[stage.field], computed[stage.field]))
+            if cache is not None:
+                for name, value in values.items():
+                    cache.put(name, value)
+                resolved[stage.field] = [values[rep] if rep in values else cache.get(rep) for rep in reps]
+            else:
+                resolved[stage.field] = [values[rep] for rep in reps]
+        return resolved
+
+    def write_ledger_chunk(ws, style_cache, rows, codes, reps, misses, future):
+        resolved = resolve(future, reps, misses)
+        code_iter = iter(codes)
+        for row in rows:
+            vendor_name = row[vendor_idx].value if vendor_idx < len(row) else None
+            if not vendor_name:
+                ws.append(strategic._copy_row(ws, row, style_cache))
+                continue
+            code = next(code_iter)
+            row_out = strategic._copy_row(ws, row, style_cache)
+            for stage, idx in stage_plan:
+                value = resolved[stage.field][code]
+                while len(row_out) <= idx:
+                    row_out.append(WriteOnlyCell(ws))
+                old = row[idx].value if idx < len(row) else None
+                if stage.field == 'recommendation':
+                    recommendations_count[value] += 1
+                    cell = WriteOnlyCell(ws, value=value)
+                    cell.style = style_names[value]
+                    row_out[idx] = cell
+                else:
+                    row_out[idx].value = value
+                changed[stage.field] += old != value
+            ws.append(row_out)
+
+    def write():
+        ws = style_cache = None
+        ledger = header_written = False
+        while True:
+            message = write_queue.get()
+            if isinstance(message, _Stop):
+                return
+            if writer_errors:
+                continue  # keep draining so the producer never blocks
+            try:
+                if message[0] == 'sheet':
+                    _, title, ledger = message
+                    ws = out.create_sheet(title)
+                    style_cache = {}
+                    header_written = False
+                    continue
+                rows = message[1]
+                if ledger and not header_written:
+                    header_out = strategic._copy_row(ws, rows[0], style_cache)
+                    if appended_idx is not None:
+                        while len(header_out) < appended_idx:
+                            header_out.append(WriteOnlyCell(ws))
+                        header_cell = WriteOnlyCell(ws, value=RECOMMENDATION_HEADER)
+                        header_cell._style = copy(strategic._style_template(
+                            ws, strategic.HEADER_FONT, strategic.HEADER_FILL, strategic.HEADER_ALIGNMENT)._style)
+                        header_out.append(header_cell)
+                        ws.column_dimensions[get_column_letter(appended_idx + 1)].width = 25
+                    ws.append(header_out)
+                    header_written = True
+                    message = message[:1] + (rows[1:],) + message[2:]
+                if ledger:
+                    write_ledger_chunk(ws, style_cache, *message[1:])
+                else:
+                    for row in rows:
+                        ws.append(strategic._copy_row(ws, row, style_cache))
+            except BaseException as exc:
+                writer_errors.append(exc)
+
+    reader = threading.Thread(target=_read_sheets, args=(source_file, read_queue, chunk_rows), daemon=True)
+    writer = threading.Thread(target=write, daemon=True)
+    reader.start()
+    writer.start()
+
+    stop = None
+    try:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                 initargs=(source_file,)) as pool:
+            ledger = first_chunk = False
+            while stop is None:
+                message = read_queue.get()
+                if isinstance(message, _Stop):
+                    stop = message
+                    break
+                if message[0] == 'sheet':
+                    ledger = first_chunk = message[2]
+                    write_queue.put(message)
+                    continue
+                if not ledger:
+                    write_queue.put(message)
+                    continue
+
+                rows = message[1]
+                body = rows[1:] if first_chunk else rows
+                first_chunk = False
+                names = [row[vendor_idx].value for row in body
+                         if vendor_idx < len(row) and row[vendor_idx].value]
+                codes, reps = factorize_names(names)
+                misses = {}
+                for stage, _ in stage_plan:
+                    cache = caches[stage.field]
+                    misses[stage.field] = reps if cache is None else [rep for rep in reps if cache.get(rep) is None]
+                future = pool.submit(_evaluate_chunk, misses)
+                write_queue.put(('rows', rows, codes, reps, misses, future))
+    finally:
+        write_queue.put(_Stop())
+        writer.join()
+        reader.join(timeout=1)
+
+    if stop.error is not None:
+        raise stop.error
+    if writer_errors:
+        raise writer_errors[0]
+
+    handle, staging = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(output_file)), suffix='.tmp')
+    os.close(handle)
+    try:
+        out.save(staging)
+        os.replace(staging, output_file)
+    except BaseException:
+        os.remove(staging)
+        raise
+    for cache in caches.values():
+        if cache is not None:
+            cache.save()
+    return changed, recommendations_count, True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Derive department, description and recommendations in one pass')
+    parser.add_argument('workbook', nargs='?', default=DEFAULT_WORKBOOK)
+    parser.add_argument('--output', help='save to OUTPUT instead of updating the workbook in place')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='re-evaluate every vendor instead of reusing cached results')
+    parser.add_argument('--instrument', metavar='JSON',
+                        help='record matched rules, keyword hits and timings to this file')
+    parser.add_argument('--pipelined', action='store_true',
+                        help='overlap reading, rule evaluation and writing (streams into a new workbook at --output)')
+    parser.add_argument('--workers', type=int, help='rule evaluation processes in --pipelined mode')
+    parser.add_argument('--fallback', action='store_true',
+                        help='label vendors no rule matches from their nearest labelled neighbours')
+    args = parser.parse_args()
+    if args.pipelined and args.fallback:
+        parser.error('--fallback needs the whole ledger up front and is not available with --pipelined')
+    if args.pipelined and (not args.output or os.path.abspath(args.output) == os.path.abspath(args.workbook)):
+        parser.error('--pipelined writes a new workbook without column widths, freeze panes or filters; '
+                     'give an --output other than the source')
+    if args.pipelined and args.instrument:
+        parser.error('--instrument cannot record rules evaluated in --pipelined worker processes')
+
+    output_file = args.output or args.workbook
+    with recording(args.instrument) if args.instrument else contextlib.nullcontext():
+        if args.pipelined:
+            changed, recommendations_count, saved = run_pipelined(args.workbook, output_file,
+                                                                  use_cache=not args.no_cache,
+                                                                  workers=args.workers)
+        else:
+            # A cache hit skips the classifiers, so recording runs every vendor
+            changed, recommendations_count, saved = run_pipeline(args.workbook, output_file,
+                                                                 use_cache=not (args.no_cache or args.instrument),
+                                                                 fallback=args.fallback)
+
+    print("Cells updated:")
+    for field, count in changed.items():
+        print(f"  {field:<15} {count}")
+    strategic.print_summary(output_file, recommendations_count, saved)
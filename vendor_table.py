@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Compact in-memory vendor table.
+
+Department and recommendation come from tiny vocabularies, yet as strings in
+tuples every row costs a tuple, a float object and an int object.  VendorTable
+keeps one typed array per column instead: an index into a table of interned
+distinct names, int8 category codes, float64 costs and int32 row numbers -
+about 18 bytes per row.  Aggregates are integer bincounts over the code
+arrays.
+"""
+import sys
+from array import array
+
+import numpy as np
+
+from ledger_reader import VendorRecord
+
+DEPARTMENTS = ('Legal', 'Finance', 'Marketing', 'Engineering', 'Support', 'G&A')
+RECOMMENDATIONS = ('Terminate', 'Consolidate', 'Optimize')
+
+# Code stored for a blank category
+MISSING = -1
+
+
+class Vocabulary:
+    """Category labels and their small-int codes; unseen labels are appended"""
+
+    __slots__ = ('labels', '_codes')
+
+    def __init__(self, labels=()):
+        self.labels = []
+        self._codes = {}
+        for label in labels:
+            self.code(label)
+
+    def code(self, label):
+        if label is None or label == '':
+            return MISSING
+        code = self._codes.get(label)
+        if code is None:
+            if len(self.labels) == 127:
+                raise ValueError(f"Too many categories to store {label!r} as an int8 code")
+            code = self._codes[label] = len(self.labels)
+            self.labels.append(label)
+        return code
+
+    def label(self, code):
+        return None if code == MISSING else self.labels[code]
+
+    def __len__(self):
+        return len(self.labels)
+
+
+class VendorTable:
+    """Column-per-array vendor records"""
+
+    __slots__ = ('names', 'departments', 'recommendations',
+                 'name_codes', 'department_codes', 'recommendation_codes', 'costs', 'rows', '_name_index')
+
+    def __init__(self, departments=DEPARTMENTS, recommendations=RECOMMENDATIONS):
+        self.names = []
+        self._name_index = {}
+        self.departments = Vocabulary(departments)
+        self.recommendations = Vocabulary(recommendations)
+        self.name_codes = array('i')
+        self.department_codes = array('b')
+        self.recommendation_codes = array('b')
+        self.costs = array('d')
+        self.rows = array('i')
+
+    @classmethod
+    def from_records(cls, records):
+        """Build a table from VendorRecords (or anything with the same fields)"""
+        table = cls()
+        for record in records:
+            table.append(record.name, record.department, record.cost, record.recommendation, record.row)
+        return table
+
+    def append(self, name, department=None, cost=None, recommendation=None, row=0):
+        code = self._name_index.get(name)
+        if code is None:
+            code = self._name_index[name] = len(self.names)
+            self.names.append(sys.intern(str(name)))
+        self.name_codes.append(code)
+        self.department_codes.append(self.departments.code(department))
+        self.recommendation_codes.append(self.recommendations.code(recommendation))
+        self.costs.append(float('nan') if cost is None else cost)
+        self.rows.append(row)
+
+    def set_departments(self, departments):
+        """Replace the department column with one label per row"""
+        self.department_codes = array('b', map(self.departments.code, departments))
+
+    def set_recommendations(self, recommendations):
+        """Replace the recommendation column with one label per row"""
+        self.recommendation_codes = array('b', map(self.recommendations.code, recommendations))
+
+    def derive(self, field, compute):
+        """Fill 'department' or 'recommendation' with compute(name), once per distinct name"""
+        vocabulary, _ = self._codes(field)
+        per_name = np.array([vocabulary.code(compute(name)) for name in self.names], dtype=np.int8)
+        codes = array('b', per_name[np.frombuffer(self.name_codes, dtype=np.int32)].tobytes())
+        if field == 'department':
+            self.department_codes = codes
+        else:
+            self.recommendation_codes = codes
+
+    def __len__(self):
+        return len(self.name_codes)
+
+    def name(self, i):
+        return self.names[self.name_codes[i]]
+
+    def department(self, i):
+        return self.departments.label(self.department_codes[i])
+
+    def recommendation(self, i):
+        return self.recommendations.label(self.recommendation_codes[i])
+
+    def cost(self, i):
+        cost = self.costs[i]
+        return None if cost != cost else cost
+
+    def record(self, i):
+        return VendorRecord(self.rows[i], self.name(i), self.department(i), self.cost(i), self.recommendation(i))
+
+    def __iter__(self):
+        return (self.record(i) for i in range(len(self)))
+
+    def nbytes(self):
+        """Bytes held by the per-row arrays (the shared name table excluded)"""
+        return sum(column.itemsize * len(column) for column in (
+            self.name_codes, self.department_codes, self.recommendation_codes, self.costs, self.rows))
+
+    def _codes(self, field):
+        vocabulary = self.departments if field == 'department' else self.recommendations
+        codes = self.department_codes if field == 'department' else self.recommendation_codes
+        return vocabulary, np.frombuffer(codes, dtype=np.int8)
+
+    def count_by(self, field):
+        """{label: rows} for 'department' or 'recommendation'"""
+        vocabulary, codes = self._codes(field)
+        counts = np.bincount(codes[codes != MISSING], minlength=len(vocabulary))
+        return dict(zip(vocabulary.labels, counts.tolist()))
+
+    def spend_by(self, field):
+        """{label: total cost} for 'department' or 'recommendation'; blank costs count as 0"""
+        vocabulary, codes = self._codes(field)
+        costs = np.nan_to_num(np.frombuffer(self.costs, dtype=np.float64))
+        known = codes != MISSING
+        totals = np.bincount(codes[known], weights=costs[known], minlength=len(vocabulary))
+        return dict(zip(vocabulary.labels, totals.tolist()))
+
+    def spend_matrix(self):
+        """{(department, recommendation): total cost} over rows with both set"""
+        departments = np.frombuffer(self.department_codes, dtype=np.int8).astype(np.intp)
+        recommendations = np.frombuffer(self.recommendation_codes, dtype=np.int8).astype(np.intp)
+        costs = np.nan_to_num(np.frombuffer(self.costs, dtype=np.float64))
+        known = (departments != MISSING) & (recommendations != MISSING)
+        width = len(self.recommendations)
+        cells = np.bincount(departments[known] * width + recommendations[known], weights=costs[known],
+                            minlength=len(self.departments) * width).tolist()
+        return {(department, recommendation): cells[d * width + r]
+                for d, department in enumerate(self.departments.labels)
+                for r, recommendation in enumerate(self.recommendations.labels)}
@@ -0,0 +1,586 @@
+#!/usr/bin/env python3
+"""Surgical single-column writes into an existing XLSX file.
+
+openpyxl's load-and-save round trip re-serialises every sheet, style and
+shared string to change one column.  patch_column() instead rewrites only
+the parts a column write touches:
+
+    the worksheet     the target column's <c> elements are spliced into
+                      their rows (plus <dimension> and <cols> if needed)
+    sharedStrings     new strings are appended, existing ones reused (or
+                      written inline when the workbook has no table)
+    styles            missing fonts, fills and xfs are appended
+
+Every other zip member is copied as its compressed bytes, without being
+inflated.  Edits are collected as byte-range replacements, so the work
+beyond one regex scan of the sheet grows with the number of changed cells.
+The result goes to a temporary file in the output's directory and is renamed
+over the output, so a failed write never leaves a half-written workbook.
+
+Layouts the patcher does not handle (no stylesheet, ZIP64, formula
+cells in the target column with a calculation chain, ...) raise PatchError;
+callers fall back to a full openpyxl save.
+
+Usage:
+    python xlsx_patch.py WORKBOOK COLUMN ROW=VALUE ...    # e.g. P 2=Terminate 3=Optimize
+"""
+import argparse
+import contextlib
+import numbers
+import os
+import re
+import shutil
+import struct
+import tempfile
+import time
+import zipfile
+import zlib
+from collections import namedtuple
+from xml.sax.saxutils import escape, unescape
+
+from openpyxl.utils import get_column_letter
+from openpyxl.xml.functions import tostring
+
+from xlsx_reader import _cast_number, _sheets, column_index
+
+# A cell style to resolve into the stylesheet: openpyxl Font, PatternFill and
+# Alignment objects (any may be None), and a named style to attach it to
+CellStyle = namedtuple('CellStyle', ['font', 'fill', 'alignment', 'name'])
+
+# Style of a cell that keeps whatever format it has (new cells get the default)
+KEEP_STYLE = 'keep'
+
+_LOCAL_HEADER = struct.Struct('<4s2B4HL2L2H')
+_CENTRAL_HEADER = struct.Struct('<4s4B4HL2L5H2L')
+_END_OF_CENTRAL = struct.Struct('<4s4H2LH')
+_ZIP64_LIMIT = 0xFFFFFFFF
+# General-purpose flags: encrypted, data descriptor follows, UTF-8 names
+_ENCRYPTED, _DATA_DESCRIPTOR, _UTF8 = 0x1, 0x8, 0x800
+
+_ROW = re.compile(rb'<row\b([^>]*?)(?:/>|>(.*?)</row>)', re.S)
+_CELL = re.compile(rb'<c\b([^>]*?)(?:/>|>(.*?)</c>)', re.S)
+_COL = re.compile(rb'<col\b[^>]*?/>')
+_SHARED_ITEM = re.compile(rb'<si>(.*?)</si>|<si/>', re.S)
+_PLAIN_TEXT = re.compile(rb'<t(?: xml:space="preserve")?>([^<]*)</t>|<t/>')
+_TEXT = re.compile(rb'<t\b[^>]*>([^<]*)</t>')
+_VALUE = re.compile(rb'<v>([^<]*)</v>')
+
+_SECTION_ITEMS = {
+    'fonts': re.compile(rb'<font\b[^>]*?(?:/>|>.*?</font>)', re.S),
+    'fills': re.compile(rb'<fill\b[^>]*?(?:/>|>.*?</fill>)', re.S),
+    'cellStyleXfs': re.compile(rb'<xf\b[^>]*?(?:/>|>.*?</xf>)', re.S),
+    'cellXfs': re.compile(rb'<xf\b[^>]*?(?:/>|>.*?</xf>)', re.S),
+    'cellStyles': re.compile(rb'<cellStyle\b[^>]*?(?:/>|>.*?</cellStyle>)', re.S),
+}
+
+# Marks a cell whose current value the patcher cannot read; it is always rewritten
+_UNKNOWN = object()
+
+
+class PatchError(Exception):
+    """The workbook uses a layout the patcher does not handle"""
+
+
+_ATTRIBUTES = {}
+
+
+def _attr(tag, name):
+    """Value of attribute name in a start tag's bytes, or None"""
+    pattern = _ATTRIBUTES.get(name)
+    if pattern is None:
+        pattern = _ATTRIBUTES[name] = re.compile(rb'(?:^|\s)' + name + rb'="([^"]*)"')
+    match = pattern.search(tag)
+    return match.group(1).decode() if match else None
+
+
+def _set_attr(tag, name, value):
+    """tag with attribute name set to value (added before the tag's end if missing)"""
+    value = str(value).encode()
+    pattern = re.compile(rb'((?:^|\s)' + name + rb'=")[^"]*(")')
+    if pattern.search(tag):
+        return pattern.sub(lambda m: m.group(1) + value + m.group(2), tag, count=1)
+    end = len(tag) - (2 if tag.endswith(b'/>') else 1)
+    return tag[:end].rstrip() + b' ' + name + b'="' + value + b'"' + tag[end:]
+
+
+def _splice(data, edits):
+    """data with each (start, end, replacement) edit applied; edits must not overlap"""
+    parts = []
+    position = 0
+    for start, end, replacement in sorted(edits, key=lambda edit: edit[:2]):
+        parts.append(data[position:start])
+        parts.append(replacement)
+        position = end
+    parts.append(data[position:])
+    return b''.join(parts)
+
+
+def _xml(element):
+    return tostring(element.to_tree()).replace(b' />', b'/>')
+
+
+class _SharedStrings:
+    """The shared string table, appended to without being re-serialised.
+
+    Workbooks without one (openpyxl's write-only mode writes none) get their
+    strings written inline instead.
+    """
+
+    def __init__(self, xml):
+        self.xml = xml
+        self.texts = []
+        self._plain = {}
+        for match in _SHARED_ITEM.finditer(xml or b''):
+            body = match.group(1) or b''
+            plain = _PLAIN_TEXT.fullmatch(body)
+            if plain:
+                text = unescape((plain.group(1) or b'').decode())
+                self._plain.setdefault(text, len(self.texts))
+            else:
+                # Rich text: readable for comparison, never reused for new cells
+                text = unescape(''.join(part.decode() for part in _TEXT.findall(body)))
+            self.texts.append(text)
+        self._added = []
+        self.references = 0
+
+    def index(self, text):
+        index = self._plain.get(text)
+        if index is None:
+            index = self._plain[text] = len(self.texts)
+            self.texts.append(text)
+            space = ' xml:space="preserve"' if text != text.strip() else ''
+            self._added.append(f'<si><t{space}>{escape(text)}</t></si>'.encode())
+        return index
+
+    def serialise(self):
+        """The patched table, or None when nothing changed"""
+        if self.xml is None or not self._added and not self.references:
+            return None
+        start = self.xml.find(b'<sst')
+        end = self.xml.find(b'>', start)
+        close = self.xml.rfind(b'</sst>')
+        if start < 0 or close < 0:
+            raise PatchError('sharedStrings.xml has no <sst> element to append to')
+        tag = self.xml[start:end + 1]
+        count = _attr(tag, b'count')
+        if count is not None:
+            tag = _set_attr(tag, b'count', max(int(count) + self.references, 0))
+        if _attr(tag, b'uniqueCount') is not None:
+            tag = _set_attr(tag, b'uniqueCount', len(self.texts))
+        return _splice(self.xml, [(start, end + 1, tag), (close, close, b''.join(self._added))])
+
+
+class _Stylesheet:
+    """styles.xml sections, resolving CellStyles to cellXfs indexes"""
+
+    def __init__(self, xml):
+        self.xml = xml
+        self._sections = {}
+        for section, item in _SECTION_ITEMS.items():
+            match = re.search(rb'<%s\b[^>]*>(.*?)</%s>' % (section.encode(), section.encode()), xml, re.S)
+            if match is None:
+                raise PatchError(f'styles.xml has no <{section}> section')
+            self._sections[section] = (match, item.findall(match.group(1)), [])
+        self._resolved = {}
+
+    def _items(self, section):
+        _, items, added = self._sections[section]
+        return items + added
+
+    def _append(self, section, item):
+        _, items, added = self._sections[section]
+        added.append(item)
+        return len(items) + len(added) - 1
+
+    def _format(self, style):
+        """(xf attributes, xf children) of a style, appending its font and fill"""
+        attributes = b'numFmtId="0" fontId="%d" fillId="%d" borderId="0"'
+        applied = b''
+        font_id = fill_id = 0
+        if style.font is not None:
+            font_id = self._append('fonts', _xml(style.font))
+            applied += b' applyFont="1"'
+        if style.fill is not None:
+            fill_id = self._append('fills', _xml(style.fill))
+            applied += b' applyFill="1"'
+        children = b''
+        if style.alignment is not None:
+            applied += b' applyAlignment="1"'
+            children = _xml(style.alignment)
+        return attributes % (font_id, fill_id) + applied, children
+
+    def _named_xf(self, name):
+        """cellStyleXfs index of the named style, or None"""
+        for item in self._items('cellStyles'):
+            if _attr(item, b'name') == name:
+                return int(_attr(item, b'xfId'))
+        return None
+
+    def resolve(self, style):
+        """cellXfs index for style (None is the default format), adding it if needed"""
+        if style is None:
+            return 0
+        if style is KEEP_STYLE:
+            return None
+        # Keyed by identity: hashing openpyxl style objects is slow, and the
+        # caller's cells keep every style alive while it is patched
+        xf = self._resolved.get(id(style))
+        if xf is not None:
+            return xf
+        if style.name is None:
+            attributes, children = self._format(style)
+            xf = self._append('cellXfs', b'<xf %s xfId="0">%s</xf>' % (attributes, children))
+        else:
+            named = self._named_xf(style.name)
+            if named is None:
+                attributes, children = self._format(style)
+                named = self._append('cellStyleXfs', b'<xf %s>%s</xf>' % (attributes, children))
+                self._append('cellStyles', b'<cellStyle name="%s" xfId="%d"/>'
+                             % (escape(style.name, {'"': '&quot;'}).encode(), named))
+            # The first cell format on the named style's formatting is used as is
+            base = self._items('cellStyleXfs')[named]
+            keys = (b'numFmtId', b'fontId', b'fillId', b'borderId')
+            for index, item in enumerate(self._items('cellXfs')):
+                if (_attr(item, b'xfId') == str(named)
+                        and all(_attr(item, key) == _attr(base, key) for key in keys)):
+                    xf = index
+                    break
+            else:
+                end = base.index(b'>') - (1 if base[base.index(b'>') - 1:].startswith(b'/') else 0)
+                xf = self._append('cellXfs', base[:end] + b' xfId="%d"' % named + base[end:])
+        self._resolved[id(style)] = xf
+        return xf
+
+    def serialise(self):
+        """The patched stylesheet, or None when nothing was added"""
+        edits = []
+        for section, (match, items, added) in self._sections.items():
+            if not added:
+                continue
+            tag_end = self.xml.index(b'>', match.start())
+            tag = self.xml[match.start():tag_end + 1]
+            edits.append((match.start(), tag_end + 1, _set_attr(tag, b'count', len(items) + len(added))))
+            edits.append((match.end(1), match.end(1), b''.join(added)))
+        return _splice(self.xml, edits) if edits else None
+
+
+def _cell_value(attributes, body, strings):
+    """The value a <c> element holds, or _UNKNOWN"""
+    if body is None:
+        return None
+    if b'<f' in body:
+        return _UNKNOWN
+    kind = _attr(attributes, b't')
+    if kind == 'inlineStr':
+        return unescape(''.join(part.decode() for part in _TEXT.findall(body)))
+    value = _VALUE.search(body)
+    if value is None:
+        return None
+    value = value.group(1).decode()
+    if kind is None or kind == 'n':
+        return _cast_number(value)
+    if kind == 's':
+        return strings.texts[int(value)]
+    if kind == 'str':
+        return unescape(value)
+    if kind == 'b':
+        return value == '1'
+    return _UNKNOWN
+
+
+def _cell_xml(ref, value, style_id, strings):
+    style = b' s="%d"' % style_id if style_id else b''
+    if value is None:
+        return b'<c r="%s"%s/>' % (ref, style)
+    if isinstance(value, str) and strings.xml is None:
+        space = ' xml:space="preserve"' if value != value.strip() else ''
+        return b'<c r="%s"%s t="inlineStr"><is><t%s>%s</t></is></c>' % (ref, style, space.encode(),
+                                                                        escape(value).encode())
+    if isinstance(value, str):
+        strings.references += 1
+        return b'<c r="%s"%s t="s"><v>%d</v></c>' % (ref, style, strings.index(value))
+    if isinstance(value, bool):
+        return b'<c r="%s"%s t="b"><v>%d</v></c>' % (ref, style, value)
+    number = str(int(value)) if isinstance(value, numbers.Integral) else repr(float(value))
+    return b'<c r="%s"%s><v>%s</v></c>' % (ref, style, number.encode())
+
+
+def _patch_row(row_match, column, letters, value, style_id, strings, formulas_chained):
+    """(start, end, replacement) rewriting one row's cell in column, or None if unchanged"""
+    row_attributes, body = row_match.group(1), row_match.group(2) or b''
+    row_number = _attr(row_attributes, b'r').encode()
+    ref = letters + row_number
+    body_start = row_match.start(2) if row_match.group(2) is not None else None
+
+    # Cells nearly always lead with their reference, so look for it directly
+    found = body.find(b'<c r="' + ref + b'"')
+    cells = [_CELL.match(body, found)] if found >= 0 else _CELL.finditer(body)
+    insert_at = len(body)
+    for cell in cells:
+        cell_ref = _attr(cell.group(1), b'r')
+        if cell_ref is None:
+            raise PatchError(f'row {row_number.decode()} has cells without references')
+        cell_column = column_index(cell_ref.rstrip('0123456789'))
+        if cell_column < column:
+            continue
+        if cell_column > column:
+            insert_at = cell.start()
+            break
+        current = _cell_value(cell.group(1), cell.group(2), strings)
+        if current is _UNKNOWN and b'<f' in (cell.group(2) or b'') and formulas_chained:
+            raise PatchError(f'{cell_ref} holds a formula listed in the calculation chain')
+        current_style = int(_attr(cell.group(1), b's') or 0)
+        if style_id is None:
+            style_id = current_style
+        if current == value and type(current) is type(value) and current_style == style_id:
+            return None
+        if _attr(cell.group(1), b't') == 's':
+            strings.references -= 1
+        return (body_start + cell.start(), body_start + cell.end(),
+                _cell_xml(ref, value, style_id, strings))
+
+    cell = _cell_xml(ref, value, style_id, strings)
+    spans = _attr(row_attributes, b'spans')
+    if spans is not None and ':' in spans and int(spans.partition(':')[2]) < column:
+        start_tag = b'<row' + _set_attr(row_attributes, b'spans', f'{spans.partition(":")[0]}:{column}') + b'>'
+        return row_match.start(), row_match.end(), start_tag + body[:insert_at] + cell + body[insert_at:] + b'</row>'
+    if body_start is None:
+        return row_match.start(), row_match.end(), b'<row' + row_attributes + b'>' + cell + b'</row>'
+    return body_start + insert_at, body_start + insert_at, cell
+
+
+def _dimension_edit(xml, column, last_row):
+    """Edit widening <dimension> to cover the column and last_row, or None"""
+    match = re.search(rb'<dimension\b[^>]*?/>', xml)
+    if match is None:
+        return None
+    ref = _attr(match.group(0), b'ref') or 'A1'
+    first, _, last = ref.partition(':')
+    last = last or first
+    last_letters = last.rstrip('0123456789')
+    last_number = int(last[len(last_letters):] or 1)
+    new_last = get_column_letter(max(column, column_index(last_letters))) + str(max(last_row, last_number))
+    if new_last == last:
+        return None
+    return match.start(), match.end(), _set_attr(match.group(0), b'ref', f'{first}:{new_last}')
+
+
+def _width_edit(xml, column, width):
+    """Edit giving the column width, or None if it already has it"""
+    width_text = f'{width:g}'
+    cols = re.search(rb'<cols>(.*?)</cols>', xml, re.S)
+    new_col = b'<col min="%d" max="%d" width="%s" customWidth="1"/>' % (column, column, width_text.encode())
+    if cols is None:
+        start = xml.find(b'<sheetData')
+        return start, start, b'<cols>' + new_col + b'</cols>'
+
+    offset = cols.start(1)
+    for col in _COL.finditer(cols.group(1)):
+        tag = col.group(0)
+        low, high = int(_attr(tag, b'min')), int(_attr(tag, b'max'))
+        if high < column:
+            continue
+        if low > column:
+            return offset + col.start(), offset + col.start(), new_col
+        if low == high == column:
+            if _attr(tag, b'width') is not None and float(_attr(tag, b'width')) == width:
+                return None
+            return offset + col.start(), offset + col.end(), _set_attr(_set_attr(tag, b'width', width_text),
+                                                                      b'customWidth', 1)
+        # Split a range of columns around the target column
+        parts = []
+        if low < column:
+            parts.append(_set_attr(tag, b'max', column - 1))
+        parts.append(_set_attr(_set_attr(_set_attr(_set_attr(tag, b'min', column), b'max', column),
+                                         b'width', width_text), b'customWidth', 1))
+        if high > column:
+            parts.append(_set_attr(tag, b'min', column + 1))
+        return offset + col.start(), offset + col.end(), b''.join(parts)
+    return cols.end(1), cols.end(1), new_col
+
+
+def _patch_sheet(xml, column, cells, strings, styles, width, formulas_chained):
+    """(patched sheet XML or None, cells rewritten)"""
+    letters = get_column_letter(column).encode()
+    data_start = xml.find(b'<sheetData>')
+    data_end = xml.find(b'</sheetData>')
+    if data_start < 0 or data_end < 0:
+        raise PatchError('the worksheet has no <sheetData> rows')
+    data_start += len(b'<sheetData>')
+
+    pending = sorted(cells.items())
+    edits = []
+    changed = 0
+
+    def new_row(row_number, value, style_id):
+        cell = _cell_xml(letters + str(row_number).encode(), value, style_id, strings)
+        return b'<row r="%d">%s</row>' % (row_number, cell)
+
+    position = 0
+    for row_match in _ROW.finditer(xml, data_start, data_end):
+        row_number = _attr(row_match.group(1), b'r')
+        if row_number is None:
+            raise PatchError('the worksheet has rows without numbers')
+        row_number = int(row_number)
+        # Rows with cells to write that the sheet does not have yet
+        inserted = []
+        while position < len(pending) and pending[position][0] < row_number:
+            number, (value, style) = pending[position]
+            inserted.append(new_row(number, value, styles.resolve(style)))
+            position += 1
+        if inserted:
+            edits.append((row_match.start(), row_match.start(), b''.join(inserted)))
+            changed += len(inserted)
+        if position < len(pending) and pending[position][0] == row_number:
+            value, style = pending[position][1]
+            position += 1
+            edit = _patch_row(row_match, column, letters, value, styles.resolve(style), strings, formulas_chained)
+            if edit is not None:
+                edits.append(edit)
+                changed += 1
+    if position < len(pending):
+        edits.append((data_end, data_end, b''.join(
+            new_row(number, value, styles.resolve(style)) for number, (value, style) in pending[position:])))
+        changed += len(pending) - position
+
+    if width is not None:
+        edit = _width_edit(xml, column, width)
+        if edit is not None:
+            edits.append(edit)
+    if changed and pending:
+        edit = _dimension_edit(xml, column, pending[-1][0])
+        if edit is not None:
+            edits.append(edit)
+    return (_splice(xml, edits) if edits else None), changed
+
+
+def _dos_time(date_time):
+    year, month, day, hour, minute, second = date_time
+    return (hour << 11) | (minute << 5) | (second // 2), ((year - 1980) << 9) | (month << 5) | day
+
+
+def _write_zip(source, target, infos, replaced, comment):
+    """Write the members of source to target, replacing the bodies named in replaced"""
+    entries = []
+    with open(source, 'rb') as src, open(target, 'wb') as out:
+        for info in infos:
+            src.seek(info.header_offset)
+            header = _LOCAL_HEADER.unpack(src.read(_LOCAL_HEADER.size))
+            if header[0] != b'PK\x03\x04':
+                raise PatchError(f'{info.filename} has a corrupt local header')
+            name = src.read(header[10])
+            extra = src.read(header[11])
+            flags = info.flag_bits & ~_DATA_DESCRIPTOR
+            compress_type, extract_version = info.compress_type, info.extract_version
+            crc, compressed_size, size = info.CRC, info.compress_size, info.file_size
+
+            body = replaced.get(info.filename)
+            if body is None:
+                data = src.read(info.compress_size)
+            else:
+                compressor = zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zlib.DEFLATED, -zlib.MAX_WBITS)
+                data = compressor.compress(body) + compressor.flush()
+                flags &= _UTF8
+                compress_type, extract_version = zipfile.ZIP_DEFLATED, max(extract_version, 20)
+                crc, compressed_size, size = zlib.crc32(body), len(data), len(body)
+                if max(compressed_size, size) >= _ZIP64_LIMIT:
+                    raise PatchError(f'{info.filename} would need ZIP64')
+
+            offset = out.tell()
+            dos_time, dos_date = _dos_time(info.date_time)
+            out.write(_LOCAL_HEADER.pack(b'PK\x03\x04', extract_version, info.reserved, flags, compress_type,
+                                         dos_time, dos_date, crc, compressed_size, size, len(name), len(extra)))
+            out.write(name)
+            out.write(extra)
+            out.write(data)
+            entries.append(_CENTRAL_HEADER.pack(
+                b'PK\x01\x02', info.create_version, info.create_system, extract_version, info.reserved,
+                flags, compress_type, dos_time, dos_date, crc, compressed_size, size,
+                len(name), len(info.extra), len(info.comment), 0, info.internal_attr, info.external_attr,
+                offset) + name + info.extra + info.comment)
+
+        directory_offset = out.tell()
+        if directory_offset >= _ZIP64_LIMIT:
+            raise PatchError('the patched workbook would need ZIP64')
+        for entry in entries:
+            out.write(entry)
+        out.write(_END_OF_CENTRAL.pack(b'PK\x05\x06', 0, 0, len(entries), len(entries),
+                                       out.tell() - directory_offset, directory_offset, len(comment)))
+        out.write(comment)
+
+
+def patch_column(source, output, column, cells, sheet=None, width=None):
+    """Write cells into one column of a sheet (the active one by default).
+
+    column is 1-based; cells maps row numbers to (value, CellStyle) pairs,
+    values being strings, numbers, booleans or None, a None style meaning
+    the default format and KEEP_STYLE the cell's current one.  Cells that
+    already hold the value and style are left alone.  width, if given, is
+    set on the column.  Returns the number of cells rewritten.  When
+    nothing changes and output is source, the file is not touched.
+    """
+    with zipfile.ZipFile(source) as zf:
+        infos = zf.infolist()
+        comment = zf.comment
+        if len(infos) >= 0xFFFF or any(max(info.file_size, info.compress_size, info.header_offset) >= _ZIP64_LIMIT
+                                        for info in infos):
+            raise PatchError('ZIP64 workbooks are not patched')
+        if any(info.flag_bits & _ENCRYPTED for info in infos):
+            raise PatchError('encrypted members are not patched')
+        names = set(zf.namelist())
+        if 'xl/styles.xml' not in names:
+            raise PatchError('the workbook has no stylesheet')
+
+        sheets, active = _sheets(zf)
+        if sheet is None:
+            member = sheets[min(active, len(sheets) - 1)][1]
+        else:
+            member = dict(sheets).get(sheet)
+            if member is None:
+                raise KeyError(f"Worksheet {sheet} does not exist.")
+
+        strings = _SharedStrings(zf.read('xl/sharedStrings.xml') if 'xl/sharedStrings.xml' in names else None)
+        styles = _Stylesheet(zf.read('xl/styles.xml'))
+        sheet_xml, changed = _patch_sheet(zf.read(member), column, cells, strings, styles, width,
+                                          'xl/calcChain.xml' in names)
+
+    replaced = {}
+    for name, body in ((member, sheet_xml), ('xl/sharedStrings.xml', strings.serialise()),
+                       ('xl/styles.xml', styles.serialise())):
+        if body is not None:
+            replaced[name] = body
+    if not replaced and os.path.abspath(output) == os.path.abspath(source):
+        return 0
+
+    directory = os.path.dirname(os.path.abspath(output))
+    handle, staging = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    os.close(handle)
+    try:
+        _write_zip(source, staging, infos, replaced, comment)
+        if os.path.exists(output):
+            shutil.copymode(output, staging)
+        os.replace(staging, output)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.remove(staging)
+        raise
+    return changed
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Write cells into one column of a workbook in place')
+    parser.add_argument('workbook')
+    parser.add_argument('column', help="column letters, e.g. 'P'")
+    parser.add_argument('cells', nargs='+', metavar='ROW=VALUE')
+    parser.add_argument('--sheet')
+    parser.add_argument('--output', help='write here instead of over the workbook')
+    args = parser.parse_args()
+
+    cells = {}
+    for cell in args.cells:
+        row, _, value = cell.partition('=')
+        cells[int(row)] = (value, None)
+    start = time.perf_counter()
+    changed = patch_column(args.workbook, args.output or args.workbook, column_index(args.column.upper()),
+                           cells, args.sheet)
+    print(f"Rewrote {changed} cells in {(time.perf_counter() - start) * 1000:.1f} ms")
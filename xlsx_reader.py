@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""Fast, values-only XLSX reader for bulk reads.
+
+Read-only jobs only need cell values, yet openpyxl's read-only mode still
+builds a dict and a cell object per cell.  This reader streams the sheet XML
+straight out of the zip with ElementTree.iterparse, resolves shared strings
+against a table parsed once per workbook, and yields plain tuples - the same
+tuples ``ws.iter_rows(values_only=True)`` gives on a workbook opened with
+``read_only=True, data_only=True``: rows padded to the sheet dimension (or to
+their last cell), missing rows filled in, numbers as int or float, formulas
+as their cached value.
+
+Differences from openpyxl: date-formatted numbers are returned as Excel
+serial numbers, and rich text is flattened to plain strings.
+
+Usage:
+    python xlsx_reader.py [WORKBOOK ...]    # check against openpyxl and compare timings
+"""
+import argparse
+import posixpath
+import time
+import zipfile
+from xml.etree.ElementTree import iterparse
+
+MAIN_NS = '{http://schemas.openxmlformats.org/spreadsheetml/2006/main}'
+REL_NS = '{http://schemas.openxmlformats.org/officeDocument/2006/relationships}'
+PACKAGE_REL_NS = '{http://schemas.openxmlformats.org/package/2006/relationships}'
+
+_ROW = MAIN_NS + 'row'
+_CELL = MAIN_NS + 'c'
+_VALUE = MAIN_NS + 'v'
+_TEXT = MAIN_NS + 't'
+_RUN = MAIN_NS + 'r'
+_INLINE = MAIN_NS + 'is'
+_SHARED_ITEM = MAIN_NS + 'si'
+_SHEET_DATA = MAIN_NS + 'sheetData'
+_DIMENSION = MAIN_NS + 'dimension'
+
+_DIGITS = '0123456789'
+_COLUMN_INDEX = {}
+
+
+def column_index(letters):
+    """1-based column number of column letters ('A' -> 1, 'AB' -> 28)"""
+    index = _COLUMN_INDEX.get(letters)
+    if index is None:
+        index = 0
+        for ch in letters:
+            index = index * 26 + ord(ch) - 64
+        _COLUMN_INDEX[letters] = index
+    return index
+
+
+def _string_item(element):
+    """Text of a shared or inline string item; phonetic runs are skipped"""
+    text = element.find(_TEXT)
+    if text is not None:
+        return text.text or ''
+    return ''.join(run.findtext(_TEXT) or '' for run in element.iter(_RUN))
+
+
+def _cast_number(value):
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+def _sheets(zf):
+    """Ordered (name, member path) of the workbook's sheets and the active sheet's index"""
+    targets = {}
+    with zf.open('xl/_rels/workbook.xml.rels') as f:
+        for _, rel in iterparse(f):
+            if rel.tag == PACKAGE_REL_NS + 'Relationship':
+                target = rel.get('Target')
+                if target.startswith('/'):
+                    target = target[1:]
+                else:
+                    target = posixpath.normpath(posixpath.join('xl', target))
+                targets[rel.get('Id')] = target
+
+    sheets = []
+    active = 0
+    with zf.open('xl/workbook.xml') as f:
+        for _, element in iterparse(f):
+            if element.tag == MAIN_NS + 'sheet':
+                sheets.append((element.get('name'), targets[element.get(REL_NS + 'id')]))
+            elif element.tag == MAIN_NS + 'workbookView':
+                active = int(element.get('activeTab', 0))
+    return sheets, active
+
+
+def _shared_strings(zf):
+    try:
+        f = zf.open('xl/sharedStrings.xml')
+    except KeyError:
+        return ()
+    strings = []
+    with f:
+        for _, element in iterparse(f):
+            if element.tag == _SHARED_ITEM:
+                strings.append(_string_item(element))
+                element.clear()
+    return strings
+
+
+def sheet_names(path):
+    with zipfile.ZipFile(path) as zf:
+        return [name for name, _ in _sheets(zf)[0]]
+
+
+def iter_rows(path, sheet=None, min_row=1, columns=None):
+    """Yield the value tuples of a sheet (the active one by default).
+
+    columns, if given, is a sequence of 0-based column indexes; each row is
+    then a tuple of just those values, in that order.
+    """
+    with zipfile.ZipFile(path) as zf:
+        sheets, active = _sheets(zf)
+        if sheet is None:
+            member = sheets[min(active, len(sheets) - 1)][1]
+        else:
+            member = dict(sheets).get(sheet)
+            if member is None:
+                raise KeyError(f"Worksheet {sheet} does not exist.")
+        strings = _shared_strings(zf)
+        with zf.open(member) as f:
+            yield from _parse_sheet(f, strings, min_row, columns)
+
+
+def _parse_sheet(f, strings, min_row=1, columns=None):
+    # Wanted 1-based column -> position in the output tuple
+    wanted = None
+    if columns is not None:
+        wanted = {index + 1: position for position, index in enumerate(columns)}
+        empty_row = (None,) * len(columns)
+
+    column_numbers = _COLUMN_INDEX
+    cast_number = _cast_number
+    max_col = None
+    sheet_data = None
+    expected = 1
+
+    for event, element in iterparse(f, events=('start', 'end')):
+        tag = element.tag
+        if event == 'start':
+            if tag == _SHEET_DATA:
+                sheet_data = element
+            elif tag == _DIMENSION:
+                last = element.get('ref', '').rpartition(':')[2]
+                max_col = column_index(last.rstrip(_DIGITS)) if last else None
+            continue
+        if tag != _ROW:
+            continue
+
+        r = element.get('r')
+        index = int(r) if r else expected
+        if index < min_row:
+            expected = index + 1
+            element.clear()
+            continue
+
+        row = [None] * len(wanted) if wanted is not None else []
+        column = 0
+        for cell in element:
+            ref = cell.get('r')
+            if ref:
+                letters = ref.rstrip(_DIGITS)
+                column = column_numbers.get(letters) or column_index(letters)
+            else:
+                column += 1
+            if wanted is not None and column not in wanted:
+                continue
+
+            kind = cell.get('t')
+            value = None
+            if kind == 'inlineStr':
+                inline = cell.find(_INLINE)
+                if inline is not None:
+                    value = _string_item(inline)
+            else:
+                for child in cell:
+                    if child.tag == _VALUE:
+                        value = child.text or None
+                        break
+                if value is not None:
+                    if kind is None or kind == 'n':
+                        value = cast_number(value)
+                    elif kind == 's':
+                        value = strings[int(value)]
+                    elif kind == 'b':
+                        value = value == '1'
+
+            if wanted is not None:
+                row[wanted[column]] = value
+            else:
+                if column > len(row) + 1:
+                    row.extend([None] * (column - 1 - len(row)))
+                row.append(value)
+        element.clear()
+        if sheet_data is not None:
+            # Drop parsed rows so memory stays flat on large sheets
+            sheet_data.clear()
+
+        if wanted is None:
+            empty_row = (None,) * max_col if max_col else ()
+            if max_col:
+                # Pad to the sheet dimension; cells beyond it are dropped
+                row = (row + [None] * (max_col - len(row)))[:max_col]
+        for _ in range(max(expected, min_row), index):
+            yield empty_row
+        expected = index + 1
+        yield tuple(row)
+
+
+if __name__ == '__main__':
+    from openpyxl import load_workbook
+
+    parser = argparse.ArgumentParser(description='Compare the fast XLSX reader with openpyxl read-only mode')
+    parser.add_argument('workbooks', nargs='*', default=['Vendor Analysis Assessment - Deeba.xlsx'])
+    parser.add_argument('--repeat', type=int, default=5, help='best of this many runs')
+    args = parser.parse_args()
+
+    def best_of(read):
+        timings = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            rows = read()
+            timings.append(time.perf_counter() - start)
+        return rows, min(timings)
+
+    def openpyxl_rows(path):
+        wb = load_workbook(path, read_only=True, data_only=True)
+        try:
+            return list(wb.active.iter_rows(values_only=True))
+        finally:
+            wb.close()
+
+    print("| Workbook | Rows | openpyxl (ms) | xlsx_reader (ms) | Speed-up | Identical |")
+    print("|---|---|---|---|---|---|")
+    for path in args.workbooks:
+        expected, slow = best_of(lambda: openpyxl_rows(path))
+        actual, fast = best_of(lambda: list(iter_rows(path)))
+        print(f"| {path} | {len(actual)} | {slow * 1000:.1f} | {fast * 1000:.1f} | "
+              f"{slow / fast:.1f}x | {'yes' if actual == expected else 'NO'} |")